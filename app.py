@@ -1,187 +1,580 @@
-from fastapi import FastAPI
-from pydantic import BaseModel
-import pandas as pd
-import gradio as gr
-import uvicorn
+from fastapi import FastAPI, Depends, Header, HTTPException, Query, Request
+from fastapi.exception_handlers import request_validation_exception_handler
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, Field, ValidationError
+from typing import List, Literal, Optional
+from datetime import date, datetime
+import asyncio
+import os
+import time
 from sqlalchemy.orm import Session
-from datetime import datetime
+from contextlib import asynccontextmanager
 
 # === Import des modules internes ===
-from src.preprocessing import data_engineering
-from src.scaling import data_scaling
-from src.prediction import predict
-from src.interface import build_interface
-from database.create_db import (
-    SessionLocal,
-    EmployeeInputDB,
-    PredictionResultDB,
-    FeatureDB,
-    RequestLogDB,
-    ApiResponseDB,
+from src.artifacts import generation as generation_artefacts, get_bundle, reload_bundle, warm_up
+from src.explanation import EXPLANATION_TOP_K, echauffer as echauffer_explications, expliquer, resumer
+from src.feature_codec import feature_columns
+from src.preprocessing_schema import CategorieInconnue, construire_schema, vocabulaires
+from src.service import score_employees_detail
+from src.shadow import comparaison, shadow_scorer
+from src.cache import prediction_cache
+from src.batching import micro_batcher
+from src.health import health_state, log_health_check
+from src.metrics import (
+    INPUT_REJECTIONS,
+    MetricsMiddleware,
+    PREDICTION_ERRORS,
+    STAGE_DURATION,
+    register_collector,
+    render as render_metrics,
+)
+from database.create_db import DB_MODE, SessionLocal, get_db, init_db, pool_stats
+from database.history import ROLLUP_INTERVAL_S, historique, mettre_a_jour_synthese, taux_attrition
+from database.persistence import (
+    AUDIT_SINK,
+    PERSISTENCE_MODE,
+    audit_writer,
+    build_audit_records,
+    persist_records,
 )
 
-# --- Initialisation de la base ---
-from database.create_db import Base, engine
+# Interface Gradio montée sur "/" (false : API seule, gradio n'est jamais importé)
+UI_ENABLED = os.getenv("UI_ENABLED", "true").lower() in ("1", "true", "yes")
+# Appels de l'interface : "inprocess" (service appelé directement) ou "http" (API_BASE_URL)
+UI_INVOCATION = os.getenv("UI_INVOCATION", "inprocess")
 
-print("Initialisation des tables si absentes...")
-Base.metadata.create_all(bind=engine)
-print("Tables prêtes.")
+# Jeton requis pour les endpoints d'administration (désactivés si absent)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+# Intervalle (s) de vérification des rechargements faits par un autre worker (0 = jamais)
+RELOAD_POLL_INTERVAL_S = float(os.getenv("RELOAD_POLL_INTERVAL_S", "1"))
 
 
 # === Schéma de validation Pydantic ===
+# Catégories : vocabulaires appris (colonnes de scaler_ou_non) ; bornes : celles du formulaire
+# de l'interface. Une saisie hors schéma est rejetée (422) avant tout accès à la base ou au modèle.
+VOCABULAIRES = vocabulaires(construire_schema())
+
+
+def choix(variable):
+    """Type Literal des valeurs acceptées pour une variable catégorielle."""
+    return Literal[tuple(VOCABULAIRES[variable])]
+
+
 class EmployeeInput(BaseModel):
-    age: int
-    genre: str
-    revenu_mensuel: float
-    statut_marital: str
-    departement: str
-    poste: str
-    niveau_hierarchique_poste: int
-    nombre_experiences_precedentes: int
-    annee_experience_totale: int
-    annees_dans_l_entreprise: int
-    annees_dans_le_poste_actuel: int
-    satisfaction_employee_environnement: float
-    note_evaluation_precedente: float
-    satisfaction_employee_nature_travail: float
-    satisfaction_employee_equipe: float
-    satisfaction_employee_equilibre_pro_perso: float
-    note_evaluation_actuelle: float
-    heure_supplementaires: str
-    augmentation_salaire_precedente_pourcent: float
-    nombre_participation_pee: int
-    nb_formations_suivies: int
-    distance_domicile_travail: float
-    niveau_education: int
-    domaine_etude: str
-    frequence_deplacement: str
-    annees_depuis_la_derniere_promotion: int
-    annes_sous_responsable_actuel: int
+    age: int = Field(ge=18, le=60)
+    genre: choix("genre")
+    revenu_mensuel: float = Field(ge=1000, le=20000)
+    statut_marital: choix("statut_marital")
+    departement: choix("departement")
+    poste: choix("poste")
+    niveau_hierarchique_poste: int = Field(ge=1, le=5)
+    nombre_experiences_precedentes: int = Field(ge=1, le=9)
+    annee_experience_totale: int = Field(ge=0, le=40)
+    annees_dans_l_entreprise: int = Field(ge=0, le=40)
+    annees_dans_le_poste_actuel: int = Field(ge=0, le=18)
+    satisfaction_employee_environnement: float = Field(ge=1, le=4)
+    note_evaluation_precedente: float = Field(ge=1, le=4)
+    satisfaction_employee_nature_travail: float = Field(ge=1, le=4)
+    satisfaction_employee_equipe: float = Field(ge=1, le=4)
+    satisfaction_employee_equilibre_pro_perso: float = Field(ge=1, le=4)
+    note_evaluation_actuelle: float = Field(ge=3, le=4)
+    heure_supplementaires: choix("heure_supplementaires")
+    augmentation_salaire_precedente_pourcent: float = Field(ge=0.11, le=0.25)
+    nombre_participation_pee: int = Field(ge=0, le=3)
+    nb_formations_suivies: int = Field(ge=0, le=6)
+    distance_domicile_travail: float = Field(ge=1, le=29)
+    niveau_education: int = Field(ge=1, le=5)
+    domaine_etude: choix("domaine_etude")
+    frequence_deplacement: choix("frequence_deplacement")
+    annees_depuis_la_derniere_promotion: int = Field(ge=0, le=15)
+    annes_sous_responsable_actuel: int = Field(ge=0, le=17)
+
+
+def champ_en_erreur(erreurs):
+    """Nom du premier champ en erreur d'une validation Pydantic ("" si aucun)."""
+    if not erreurs:
+        return ""
+    return next((partie for partie in reversed(erreurs[0]["loc"]) if isinstance(partie, str)), "")
+
+
+# === Démarrage : tables, artefacts et échauffement du modèle ===
+def echauffer():
+    """
+    Charge les artefacts et calcule une prédiction factice ; /ready passe ensuite à 200.
+    Un échec est journalisé aussitôt : /ready reste à 503 et l'arrêt n'est pas interrompu.
+    """
+    try:
+        bundle = warm_up()
+        echauffer_explications(bundle)
+    except Exception as e:
+        print(f"Échauffement impossible, l'instance reste non disponible : {e!r}")
+        return
+    print(f"Artefacts chargés et échauffés (version {bundle.version}).")
+
+
+def charger_candidat():
+    """
+    Charge le modèle candidat (CANDIDATE_MODELS_DIR), indépendamment de la disponibilité :
+    un échec désactive seulement l'évaluation shadow.
+    """
+    try:
+        candidat = shadow_scorer.load()
+    except Exception as e:
+        print(f"Modèle candidat non chargé, évaluation shadow désactivée : {e!r}")
+        return
+    print(f"Modèle candidat chargé (version {candidat.version}, fraction {shadow_scorer.fraction}).")
+
+
+def recharger_artefacts(annoncer=True):
+    """Recharge les artefacts (voir reload_bundle) puis échauffe le calcul des explications."""
+    bundle = reload_bundle(annoncer=annoncer)
+    try:
+        echauffer_explications(bundle)
+    except Exception as e:
+        print(f"Calcul des explications non échauffé : {e}")
+    return bundle
+
+
+def suivre_rechargements():
+    """
+    Reproduit dans ce worker les rechargements (artefacts, candidat) demandés à un autre worker
+    du lanceur : /admin/reload n'est reçu que par un seul processus.
+    """
+    if generation_artefacts.a_suivre():
+        try:
+            bundle = recharger_artefacts(annoncer=False)
+            print(f"Artefacts rechargés à la demande d'un autre worker (version {bundle.version}).")
+        except Exception as e:
+            print(f"Rechargement des artefacts impossible dans ce worker : {e!r}")
+    if shadow_scorer.generation.a_suivre():
+        charger_candidat()
+
+
+async def surveiller_rechargements():
+    """Vérifie toutes les RELOAD_POLL_INTERVAL_S secondes les rechargements des autres workers."""
+    while True:
+        await asyncio.sleep(RELOAD_POLL_INTERVAL_S)
+        await asyncio.to_thread(suivre_rechargements)
+
+
+async def actualiser_synthese():
+    """Met à jour la synthèse attrition_daily toutes les ROLLUP_INTERVAL_S secondes."""
+    while True:
+        try:
+            await asyncio.to_thread(mettre_a_jour_synthese)
+        except Exception as e:
+            print(f"Synthèse attrition_daily non mise à jour : {e}")
+        await asyncio.sleep(ROLLUP_INTERVAL_S)
+
+
+# === Cycle de vie : démarrage et écriture différée de l'audit ===
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Rien de tout cela n'a lieu à l'import : le serveur écoute dès que les tables existent,
+    # /health répond pendant l'échauffement et /ready attend qu'il soit terminé.
+    # Avec le lanceur multi-workers, les deux étapes sont déjà faites dans le parent.
+    await asyncio.to_thread(init_db)
+    echauffement = asyncio.create_task(asyncio.to_thread(echauffer))
+    candidat = asyncio.create_task(asyncio.to_thread(charger_candidat)) if shadow_scorer.configured else None
+    synthese = asyncio.create_task(actualiser_synthese()) if ROLLUP_INTERVAL_S > 0 else None
+    rechargements = asyncio.create_task(surveiller_rechargements()) if RELOAD_POLL_INTERVAL_S > 0 else None
+    if PERSISTENCE_MODE == "async":
+        audit_writer.start()
+    try:
+        yield
+    finally:
+        for tache in (synthese, rechargements):
+            if tache is not None:
+                tache.cancel()
+        try:
+            await echauffement
+            if candidat is not None:
+                await candidat
+        finally:
+            # Vide la file d'audit et termine les évaluations du candidat avant l'arrêt, quoi qu'il arrive
+            audit_writer.stop()
+            if AUDIT_SINK == "file":
+                from database.audit_file import audit_file_writer
+                audit_file_writer.stop()
+            shadow_scorer.stop()
+            if DB_MODE == "async":
+                from database.async_db import async_engine
+                await async_engine.dispose()
 
 
 # === Création de l’application FastAPI ===
 app = FastAPI(
     title="Employee Turnover Prediction API",
     description="API de prédiction du départ des employés avec journalisation complète et sécurité renforcée.",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
-# === Endpoint de santé ===
+# === Rejet des saisies invalides ===
+@app.exception_handler(RequestValidationError)
+async def rejeter_saisie(request: Request, exc: RequestValidationError):
+    """Réponse 422 standard de FastAPI, comptée par endpoint et premier champ en erreur."""
+    INPUT_REJECTIONS.inc(endpoint=request.url.path, field=champ_en_erreur(exc.errors()))
+    return await request_validation_exception_handler(request, exc)
+
+
+# === Sondes de vivacité et de disponibilité ===
 @app.get("/health")
-def health_check():
-    """Vérifie si l’API fonctionne et journalise la requête."""
-    db = SessionLocal()
+async def health_check():
+    """
+    Sonde de vivacité : aucune entrée/sortie, hors journalisation échantillonnée
+    (une sonde sur HEALTH_LOG_EVERY, écrite hors de la boucle d'événements).
+    """
+    if health_state.record_health_check():
+        await asyncio.to_thread(log_health_check)
+
+    return {"status": "OK", "message": "API opérationnelle"}
+
+
+@app.get("/ready")
+async def readiness_check():
+    """Sonde de disponibilité : artefacts chargés et échauffés, base joignable (résultat mis en cache)."""
+    etat = await asyncio.to_thread(health_state.readiness)
+    return JSONResponse(status_code=200 if etat["ready"] else 503, content=etat)
+
+
+# === Mesure des étapes ===
+def mesurer_validation(request: Request):
+    """
+    Enregistre la durée de l'étape "validation" (lecture du corps et validation Pydantic,
+    depuis l'arrivée de la requête) et retourne l'instant d'arrivée.
+    """
+    debut = getattr(request.state, "debut", None) or time.perf_counter()
+    STAGE_DURATION.observe(time.perf_counter() - debut, stage="validation")
+    return debut
+
+
+def duree_ms(debut):
+    return round((time.perf_counter() - debut) * 1000, 3)
+
+
+def erreur_categorie(e: CategorieInconnue):
+    """Réponse 422 détaillée pour une valeur hors du vocabulaire appris (schéma de preprocessing)."""
+    return JSONResponse(status_code=422, content={"error": str(e), **e.detail()})
 
-    new_request = RequestLogDB(
-        endpoint="/health",
-        user_id="florian_user",
-        timestamp=datetime.utcnow()
+
+# === Service de prédiction partagé (API et interface) ===
+def predire(lignes, endpoint, db, debut, bundle=None):
+    """
+    Étapes :
+    1. Encodage et scaling (FeatureEncoder NumPy, identique au pipeline pandas)
+    2. Prédiction directement sur la matrice de features en mémoire
+    3. Dépôt des saisies échantillonnées pour le modèle candidat (évalué en arrière-plan)
+    4. Journalisation complète (données brutes, requête, features, résultat, réponse)
+       en une seule transaction, ou en différé selon PERSISTENCE_MODE
+    Retourne (features préparées, résultats) ; `bundle` : artefacts courants par défaut.
+    """
+    debut_scoring = time.perf_counter()
+    donnees_pret, results, depuis_cache = score_employees_detail(lignes, bundle or get_bundle())
+    persist_records(
+        _consigner(lignes, endpoint, debut, donnees_pret, results, duree_ms(debut_scoring), depuis_cache), db
     )
-    db.add(new_request)
-    db.commit()
-    db.close()
+    return donnees_pret, results
 
-    return {"status": "OK", "message": "API opérationnelle"}
+
+def _consigner(lignes, endpoint, debut, donnees_pret, results, scoring_ms, depuis_cache):
+    """Étape 3 de predire, puis enregistrements d'audit de l'étape 4 (aussi utilisé par predire_async)."""
+    shadow_scorer.submit(lignes, results, scoring_ms, depuis_cache)
+    return build_audit_records(endpoint, lignes, donnees_pret, results, duree_ms(debut))
+
+
+def predire_depuis_interface(input_data: dict):
+    """
+    Prédiction demandée par l'interface Gradio, dans le processus :
+    même validation, même scoring et même journalisation que /predict, sans aller-retour HTTP.
+    """
+    debut = time.perf_counter()
+    try:
+        lignes = [EmployeeInput(**input_data).dict()]
+    except ValidationError as e:
+        INPUT_REJECTIONS.inc(endpoint="/predict", field=champ_en_erreur(e.errors()))
+        return {"error": str(e)}
+
+    db = SessionLocal()
+    try:
+        return predire(lignes, "/predict", db, debut)[1][0]
+    except CategorieInconnue as e:
+        return {"error": str(e)}
+    except Exception as e:
+        PREDICTION_ERRORS.inc(endpoint="/predict")
+        return {"error": str(e)}
+    finally:
+        db.close()
 
 
 # === Endpoint principal de prédiction ===
-@app.post("/predict")
-def predict_api(input_data: EmployeeInput):
+def predict_api(input_data: EmployeeInput, request: Request, db: Session = Depends(get_db)):
+    """Prédiction unitaire (voir predire) ; l'erreur éventuelle est renvoyée dans la réponse."""
+    debut = mesurer_validation(request)
+    try:
+        return predire([input_data.dict()], "/predict", db, debut)[1][0]
+    except CategorieInconnue as e:
+        return erreur_categorie(e)
+    except Exception as e:
+        PREDICTION_ERRORS.inc(endpoint="/predict")
+        return {"error": str(e)}
+
+
+# === Endpoint de prédiction par lot ===
+def predict_batch_api(input_data: List[EmployeeInput], request: Request, db: Session = Depends(get_db)):
     """
-    Étapes :
-    1. Sauvegarde des données brutes dans la base
-    2. Transformation et scaling
-    3. Sauvegarde des features traitées
-    4. Prédiction à partir des données sauvegardées
-    5. Journalisation complète du résultat et de la réponse
+    Prédiction vectorisée d'une liste d'employés :
+    une seule passe de preprocessing, de scaling et de modèle pour tout le lot,
+    puis journalisation de l'ensemble dans une seule transaction.
     """
-    db: Session = SessionLocal()
+    debut = mesurer_validation(request)
+    if not input_data:
+        return []
+
     try:
-        # Sauvegarde des données brutes saisies
-        new_input = EmployeeInputDB(**input_data.dict())
-        db.add(new_input)
-        db.commit()
-        db.refresh(new_input)
-
-        # Journalisation de la requête
-        new_request = RequestLogDB(
-            endpoint="/predict",
-            employee_input_id=new_input.id,
-            user_id="florian_user",
-            timestamp=datetime.utcnow()
-        )
-        db.add(new_request)
-        db.commit()
-        db.refresh(new_request)
-
-        # Transformation et scaling
-        donnees_saisie = pd.DataFrame([input_data.dict()])
-        donnees_traitees = data_engineering(donnees_saisie)
-        donnees_pret = data_scaling(donnees_traitees)
-
-        # Sauvegarde des données prêtes dans la table "features"
-        donnees_pret_json = donnees_pret.to_json(orient="records")
-        new_feature = FeatureDB(
-            employee_input_id=new_input.id,
-            feature_data=donnees_pret_json
-        )
-        db.add(new_feature)
-        db.commit()
-        db.refresh(new_feature)
-
-        # Relecture propre pour prédiction (on relit les données sauvegardées)
-        donnees_pret_reloaded = pd.read_json(new_feature.feature_data, orient="records")
-
-        # Prédiction à partir des données rechargées
-        result = predict(donnees_pret_reloaded)
-        message = "Risque de départ" if result["prediction"] == 1 else "Employé fidèle"
-
-        # Sauvegarde du résultat
-        new_result = PredictionResultDB(
-            employee_input_id=new_input.id,
-            prediction=int(result["prediction"]),
-            probability=float(result["probability"]),
-            message=message
+        return predire([employe.dict() for employe in input_data], "/predict/batch", db, debut)[1]
+    except CategorieInconnue as e:
+        return erreur_categorie(e)
+    except Exception as e:
+        PREDICTION_ERRORS.inc(endpoint="/predict/batch")
+        return {"error": str(e)}
+
+
+# === Variantes asyncio (DB_MODE=async) ===
+# Le scoring (CPU) part dans un exécuteur borné, les écritures sont attendues
+# sur le moteur asyncio : un worker multiplexe de nombreuses prédictions.
+if DB_MODE == "async":
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from database.async_db import get_async_db
+    from database.persistence import persist_records_async
+    from src.executor import run_scoring
+
+    async def predire_async(lignes, endpoint, db, debut, bundle=None):
+        """predire avec le scoring dans l'exécuteur et l'écriture attendue sur le moteur asyncio."""
+        debut_scoring = time.perf_counter()
+        donnees_pret, results, depuis_cache = await run_scoring(
+            score_employees_detail, lignes, bundle or get_bundle()
         )
-        db.add(new_result)
-        db.commit()
-        db.refresh(new_result)
-
-        # Journalisation de la réponse
-        new_response = ApiResponseDB(
-            request_id=new_request.id,
-            prediction_id=new_result.id,
-            status_code=200,
-            message=message
+        await persist_records_async(
+            _consigner(lignes, endpoint, debut, donnees_pret, results, duree_ms(debut_scoring), depuis_cache), db
         )
-        db.add(new_response)
-        db.commit()
-        db.refresh(new_response)
-
-        # 7On prépare les données à renvoyer avant fermeture de la session
-        prediction_data = {
-            "prediction": new_result.prediction,
-            "probability": new_result.probability,
-            "message": message
-        }
-
-        # Fermeture propre de la session
-        db.close()
+        return donnees_pret, results
 
-        # Envoi du résultat à l’utilisateur
-        return prediction_data
+    async def predict_api_async(input_data: EmployeeInput, request: Request,
+                                db: AsyncSession = Depends(get_async_db)):
+        """Prédiction unitaire, version asyncio de predict_api."""
+        debut = mesurer_validation(request)
+        try:
+            _, results = await predire_async([input_data.dict()], "/predict", db, debut)
+            return results[0]
+        except CategorieInconnue as e:
+            return erreur_categorie(e)
+        except Exception as e:
+            PREDICTION_ERRORS.inc(endpoint="/predict")
+            return {"error": str(e)}
 
+    async def predict_batch_api_async(input_data: List[EmployeeInput], request: Request,
+                                      db: AsyncSession = Depends(get_async_db)):
+        """Prédiction par lot, version asyncio de predict_batch_api."""
+        debut = mesurer_validation(request)
+        if not input_data:
+            return []
+
+        try:
+            _, results = await predire_async([employe.dict() for employe in input_data], "/predict/batch", db, debut)
+            return results
+        except CategorieInconnue as e:
+            return erreur_categorie(e)
+        except Exception as e:
+            PREDICTION_ERRORS.inc(endpoint="/predict/batch")
+            return {"error": str(e)}
+
+    app.post("/predict")(predict_api_async)
+    app.post("/predict/batch")(predict_batch_api_async)
+else:
+    app.post("/predict")(predict_api)
+    app.post("/predict/batch")(predict_batch_api)
+
+
+# === Explication d'une prédiction ===
+@app.post("/predict/explain")
+def predict_explain_api(input_data: EmployeeInput, request: Request,
+                        top: int = Query(default=EXPLANATION_TOP_K, ge=1, le=len(feature_columns())),
+                        db: Session = Depends(get_db)):
+    """
+    Prédiction unitaire (journalisée comme /predict) accompagnée des `top` contributions
+    de features les plus fortes (valeurs SHAP en log-odds, colonnes de scaler_ou_non).
+    Les contributions déjà calculées (cache, scoring de masse) sont relues, pas recalculées.
+    """
+    debut = mesurer_validation(request)
+    try:
+        # Même version d'artefacts pour le score et ses contributions, même en cas de rechargement
+        bundle = get_bundle()
+        lignes = [input_data.dict()]
+        donnees_pret, results = predire(lignes, "/predict/explain", db, debut, bundle)
+
+        with STAGE_DURATION.time(stage="explanation"):
+            vecteur = expliquer(lignes, donnees_pret, bundle, db)[0]
+        return {**results[0], **resumer(vecteur, donnees_pret[0], bundle, top)}
+
+    except CategorieInconnue as e:
+        return erreur_categorie(e)
     except Exception as e:
-        db.rollback()
-        db.close()
+        PREDICTION_ERRORS.inc(endpoint="/predict/explain")
         return {"error": str(e)}
 
 
+# === Métriques Prometheus ===
+@app.get("/metrics")
+def metrics():
+    """Histogrammes de latence par étape, compteurs d'erreurs et état du pool / du cache."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+@register_collector
+def _metriques_etat():
+    pool = pool_stats()
+    cache = prediction_cache.stats()
+    return [
+        ("db_pool_checked_out", "gauge", "Connexions empruntées au pool.", pool["checked_out"]),
+        ("db_pool_overflow", "gauge", "Connexions en débordement du pool.", pool["overflow"]),
+        ("db_pool_checkouts_total", "counter", "Connexions obtenues du pool.", pool.get("checkouts", 0)),
+        ("db_pool_timeouts_total", "counter", "Attentes de connexion expirées.", pool.get("timeouts", 0)),
+        ("db_pool_wait_max_seconds", "gauge", "Attente maximale pour obtenir une connexion.",
+         pool.get("wait_max_ms", 0.0) / 1000),
+        ("prediction_cache_hits_total", "counter", "Succès du cache de prédictions.", cache["hits"]),
+        ("prediction_cache_misses_total", "counter", "Échecs du cache de prédictions.", cache["misses"]),
+        ("prediction_cache_evictions_total", "counter", "Évictions du cache de prédictions.", cache["evictions"]),
+        ("prediction_cache_size", "gauge", "Entrées du cache de prédictions.", cache["size"]),
+        ("health_checks_total", "counter", "Sondes /health reçues.", health_state.health_checks),
+    ]
+
+
+# === Administration ===
+def verifier_admin(x_admin_token: Optional[str] = Header(default=None)):
+    """Dépendance : exige le jeton d'administration (en-tête X-Admin-Token)."""
+    if not ADMIN_TOKEN or x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Accès administrateur refusé")
+
+
+@app.post("/admin/reload", dependencies=[Depends(verifier_admin)])
+def reload_artifacts():
+    """
+    Recharge modèle, scaler et seuil depuis le disque et les substitue de façon atomique.
+    Les requêtes en cours terminent avec les artefacts précédents. Avec le lanceur
+    multi-workers, les autres workers rechargent dans les RELOAD_POLL_INTERVAL_S secondes.
+    """
+    try:
+        bundle = recharger_artefacts()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Rechargement impossible : {e}")
+
+    return {
+        "status": "OK",
+        "version": bundle.version,
+        "threshold": bundle.threshold,
+        "loaded_at": bundle.loaded_at.isoformat()
+    }
+
+
+@app.get("/admin/cache", dependencies=[Depends(verifier_admin)])
+def cache_stats():
+    """Compteurs du cache de prédictions (succès, échecs, évictions, invalidations)."""
+    return prediction_cache.stats()
+
+
+@app.get("/admin/microbatch", dependencies=[Depends(verifier_admin)])
+def microbatch_stats():
+    """Taille des lots obtenus par le regroupement des appels concurrents au modèle."""
+    return micro_batcher.stats()
+
+
+@app.get("/admin/db-pool", dependencies=[Depends(verifier_admin)])
+def db_pool_stats():
+    """Occupation du pool de connexions et temps d'attente pour obtenir une connexion."""
+    return pool_stats()
+
+
+@app.get("/admin/shadow", dependencies=[Depends(verifier_admin)])
+def shadow_stats(db: Session = Depends(get_db)):
+    """
+    Modèle candidat (CANDIDATE_MODELS_DIR) : compteurs de ce processus et comparaison
+    enregistrée avec le modèle principal (accord des décisions, écart des probabilités, latences).
+    """
+    return {**shadow_scorer.stats(), "comparaison": comparaison(db)}
+
+
+@app.post("/admin/shadow/reload", dependencies=[Depends(verifier_admin)])
+def reload_shadow():
+    """
+    Recharge les artefacts du modèle candidat depuis CANDIDATE_MODELS_DIR
+    (puis les autres workers du lanceur, comme /admin/reload).
+    """
+    if not shadow_scorer.configured:
+        raise HTTPException(status_code=409, detail="Aucun modèle candidat configuré (CANDIDATE_MODELS_DIR)")
+    try:
+        bundle = shadow_scorer.load(annoncer=True)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Rechargement impossible : {e}")
+    return {"status": "OK", "version": bundle.version}
+
+
+# === Historique des prédictions ===
+@app.get("/predictions", dependencies=[Depends(verifier_admin)])
+def predictions_history(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    departement: Optional[str] = None,
+    poste: Optional[str] = None,
+    prediction: Optional[int] = Query(default=None, ge=0, le=1),
+    limit: int = Query(default=100, ge=1, le=1000),
+    cursor: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Prédictions enregistrées, des plus récentes aux plus anciennes, filtrées par période
+    [start, end), département, poste et prédiction. Pagination par curseur : passer
+    `next_cursor` de la réponse en `cursor` pour obtenir la page suivante.
+    """
+    return historique(db, start, end, departement, poste, prediction, limit, cursor)
+
+
+@app.get("/predictions/attrition", dependencies=[Depends(verifier_admin)])
+def attrition_history(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    departement: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Taux de risque de départ par département et par jour (jours start à end inclus),
+    lu dans la synthèse attrition_daily (à jour à ROLLUP_INTERVAL_S + ROLLUP_DELAY_S près).
+    """
+    return taux_attrition(db, start, end, departement)
+
+
+# Instant d'arrivée et durée totale de chaque requête de l'API
+app.add_middleware(
+    MetricsMiddleware,
+    endpoints=[route.path for route in app.routes if isinstance(route, APIRoute)],
+)
+
+
 # === Interface Gradio (UI) ===
-demo = build_interface()
-gradio_app = gr.mount_gradio_app(app, demo, path="/")
+if UI_ENABLED:
+    # Imports différés : gradio et l'interface ne coûtent rien en mode API seule
+    import gradio as gr
+    from src.interface import ClientLocal, build_interface
+
+    demo = build_interface(ClientLocal(predire_depuis_interface) if UI_INVOCATION == "inprocess" else None)
+    gradio_app = gr.mount_gradio_app(app, demo, path="/")
+else:
+    gradio_app = app
 
 
 # === Lancement local ===
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run("app:gradio_app", host="0.0.0.0", port=7860)
@@ -0,0 +1,58 @@
+"""
+Mesure le gain du chargement unique des artefacts sur le chemin de la requête.
+
+Compare `data_scaling` + `predict` avec rechargement du scaler et du modèle
+à chaque appel (ancien comportement) et avec le bundle chargé une seule fois.
+
+Usage : python -m benchmarks.bench_artifacts [--repetitions 200]
+"""
+import argparse
+import statistics
+
+import joblib
+import pandas as pd
+
+from src.artifacts import get_bundle
+from src.preprocessing import data_engineering
+from src.prediction import predict
+from src.scaling import data_scaling
+from benchmarks.common import EMPLOYE, chrono
+
+def avec_rechargement():
+    scaler = joblib.load("models/standard_scaler.pkl")
+    model = joblib.load("models/final_model.pkl")
+    donnees_pret = data_scaling(data_engineering(pd.DataFrame([EMPLOYE])), scaler)
+    proba = model.predict_proba(donnees_pret)[:, 1][0]
+    return proba
+
+
+def chargement_seul():
+    joblib.load("models/standard_scaler.pkl")
+    joblib.load("models/final_model.pkl")
+
+
+def avec_bundle():
+    bundle = get_bundle()
+    donnees_pret = data_scaling(data_engineering(pd.DataFrame([EMPLOYE])), bundle.scaler)
+    return predict(donnees_pret, bundle)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repetitions", type=int, default=200)
+    args = parser.parse_args()
+
+    get_bundle()
+    scenarios = [
+        ("chargement seul", chargement_seul),
+        ("rechargement par requête", avec_rechargement),
+        ("bundle en mémoire", avec_bundle),
+    ]
+    for nom, fonction in scenarios:
+        fonction()  # échauffement
+        durees = chrono(fonction, args.repetitions)
+        print(f"{nom:<26} médiane {statistics.median(durees):7.2f} ms   moyenne {statistics.mean(durees):7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Test de charge de /predict : compare le débit des modes DB_MODE=sync et DB_MODE=async.
+
+Chaque mode lance un serveur uvicorn (un worker) sur une base SQLite temporaire,
+puis envoie `--requetes` prédictions avec `--concurrence` clients simultanés.
+
+Usage : python -m benchmarks.bench_async [--requetes 2000] [--concurrence 64]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.common import attendre_serveur, charge
+
+
+def demarrer_serveur(mode, port, dossier):
+    env = {
+        **os.environ,
+        "DB_MODE": mode,
+        "DATABASE_URL": f"sqlite:///{os.path.join(dossier, f'bench_{mode}.db')}",
+    }
+    serveur = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    attendre_serveur(serveur, port)
+    return serveur
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requetes", type=int, default=2000)
+    parser.add_argument("--concurrence", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as dossier:
+        for mode in ("sync", "async"):
+            serveur = demarrer_serveur(mode, args.port, dossier)
+            try:
+                url = f"http://127.0.0.1:{args.port}/predict"
+                asyncio.run(charge(url, 50, 8))  # échauffement
+                duree, latences = asyncio.run(charge(url, args.requetes, args.concurrence))
+            finally:
+                serveur.terminate()
+                serveur.wait()
+
+            quantiles = statistics.quantiles(latences, n=100)
+            print(
+                f"{mode:<5}  {args.requetes / duree:8.1f} req/s   "
+                f"p50 {quantiles[49]:7.1f} ms   p99 {quantiles[98]:7.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
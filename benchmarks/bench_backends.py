@@ -0,0 +1,50 @@
+"""
+Latence de l'inférence selon le moteur (MODEL_BACKEND) : sklearn, native et onnx.
+
+Chaque moteur score la même matrice de features (FeatureEncoder) ligne à ligne puis par lots.
+Le moteur ONNX est mesuré si onnxruntime est installé ; le modèle est exporté
+dans un dossier temporaire.
+
+Usage : python -m benchmarks.bench_backends [--repetitions 200]
+"""
+import argparse
+import shutil
+import statistics
+import tempfile
+
+from benchmarks.common import EMPLOYE, chrono
+from src.artifacts import FICHIERS_ARTEFACTS, MODELS_DIR, load_bundle
+from src.export_model import exporter
+from src.prediction import predict_arrays
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repetitions", type=int, default=200)
+    parser.add_argument("--tailles", type=int, nargs="+", default=[1, 100, 10_000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as dossier:
+        for nom in FICHIERS_ARTEFACTS:
+            shutil.copy(f"{MODELS_DIR}/{nom}", dossier)
+        exporter(dossier)
+
+        for backend in ("sklearn", "native", "onnx"):
+            try:
+                bundle = load_bundle(dossier, backend=backend)
+            except RuntimeError as e:
+                print(f"{backend:<8} ignoré : {e}")
+                continue
+
+            mesures = []
+            for taille in args.tailles:
+                matrice = bundle.encoder.encode([EMPLOYE] * taille)
+                predict_arrays(matrice, bundle)  # échauffement
+                repetitions = max(5, args.repetitions // max(1, taille // 100))
+                durees = chrono(lambda: predict_arrays(matrice, bundle), repetitions)
+                mesures.append(f"{taille:>6} ligne(s) {statistics.median(durees):8.3f} ms")
+            print(f"{backend:<8} " + "   ".join(mesures))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Compare le pipeline pandas (data_engineering + data_scaling) et FeatureEncoder.
+
+Usage : python -m benchmarks.bench_encoder [--repetitions 100]
+"""
+import argparse
+import statistics
+
+import pandas as pd
+
+from src.artifacts import get_bundle
+from src.preprocessing import data_engineering
+from src.scaling import data_scaling
+from benchmarks.common import EMPLOYE, chrono
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repetitions", type=int, default=100)
+    args = parser.parse_args()
+
+    bundle = get_bundle()
+    for taille in (1, 100, 10_000):
+        lignes = [EMPLOYE] * taille
+        scenarios = [
+            ("pandas", lambda: data_scaling(data_engineering(pd.DataFrame(lignes)), bundle.scaler)),
+            ("numpy", lambda: bundle.encoder.encode(lignes)),
+        ]
+        repetitions = max(5, args.repetitions // max(1, taille // 100))
+        medianes = {}
+        for nom, fonction in scenarios:
+            fonction()  # échauffement
+            medianes[nom] = statistics.median(chrono(fonction, repetitions))
+            print(f"lot {taille:>6}  {nom:<7} médiane {medianes[nom]:9.3f} ms")
+        print(f"lot {taille:>6}  accélération x{medianes['pandas'] / medianes['numpy']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Latence d'une prédiction demandée par l'interface Gradio selon le mode d'appel.
+
+- en processus : ClientLocal, le service de prédiction est appelé directement ;
+- HTTP avec session : ClientHTTP (connexions réutilisées) vers un serveur uvicorn ;
+- HTTP sans session : un requests.post par prédiction (fonctionnement précédent).
+
+Chaque mode utilise une base SQLite temporaire et le cache de prédictions désactivé,
+pour mesurer le chemin complet (validation, scoring, journalisation).
+
+Usage : python -m benchmarks.bench_interface [--repetitions 300] [--port 8768]
+"""
+import os
+import tempfile
+
+DOSSIER = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DOSSIER, 'interface.db')}"
+os.environ["PREDICTION_CACHE_SIZE"] = "0"
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+import requests
+
+from benchmarks.common import EMPLOYE, attendre_serveur, chrono
+
+
+def resume(nom, durees):
+    durees = sorted(durees)
+    print(
+        f"{nom:<22} médiane {statistics.median(durees):7.2f} ms   "
+        f"p95 {durees[int(len(durees) * 0.95)]:7.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repetitions", type=int, default=300)
+    parser.add_argument("--port", type=int, default=8768)
+    args = parser.parse_args()
+
+    from app import predire_depuis_interface
+    from database.create_db import init_db
+    from src.artifacts import warm_up
+    from src.interface import ClientHTTP, ClientLocal
+
+    init_db()
+    warm_up()
+    local = ClientLocal(predire_depuis_interface)
+    local.predict(EMPLOYE)
+    resume("en processus", chrono(lambda: local.predict(EMPLOYE), args.repetitions))
+
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{os.path.join(DOSSIER, 'serveur.db')}"}
+    serveur = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(args.port)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        attendre_serveur(serveur, args.port)
+        base = f"http://127.0.0.1:{args.port}"
+        distant = ClientHTTP(base)
+        distant.predict(EMPLOYE)
+        resume("HTTP avec session", chrono(lambda: distant.predict(EMPLOYE), args.repetitions))
+        resume(
+            "HTTP sans session",
+            chrono(lambda: requests.post(f"{base}/predict", json=EMPLOYE).json(), args.repetitions),
+        )
+    finally:
+        serveur.terminate()
+        serveur.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Temps de démarrage de l'application, avec et sans interface Gradio (UI_ENABLED).
+
+Pour chaque mode : durée d'import de `app` (processus neuf, médiane de plusieurs essais),
+puis, serveur uvicorn lancé sur une base SQLite temporaire, délai avant la première
+réponse de /health et de /ready, et latence de la première et de la deuxième requête /predict.
+
+Usage : python -m benchmarks.bench_startup [--essais 3] [--port 8767]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.common import EMPLOYE
+
+CODE_IMPORT = "import time; d = time.perf_counter(); import app; print(time.perf_counter() - d)"
+
+
+def duree_import(env, essais):
+    durees = []
+    for _ in range(essais):
+        sortie = subprocess.run(
+            [sys.executable, "-c", CODE_IMPORT], env=env, capture_output=True, text=True, check=True
+        ).stdout
+        durees.append(float(sortie.strip().splitlines()[-1]) * 1000)
+    return statistics.median(durees)
+
+
+def attendre(url, debut, delai=120):
+    """Interroge `url` jusqu'à un code 200 ; retourne le délai (ms) depuis `debut`."""
+    fin = time.monotonic() + delai
+    while time.monotonic() < fin:
+        try:
+            if httpx.get(url).status_code == 200:
+                return (time.perf_counter() - debut) * 1000
+        except httpx.TransportError:
+            pass
+        time.sleep(0.02)
+    raise RuntimeError(f"Pas de réponse de {url}")
+
+
+def latence_predict(url, employe):
+    debut = time.perf_counter()
+    httpx.post(url, json=employe, timeout=60).raise_for_status()
+    return (time.perf_counter() - debut) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--essais", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8767)
+    args = parser.parse_args()
+
+    base = f"http://127.0.0.1:{args.port}"
+    with tempfile.TemporaryDirectory() as dossier:
+        for mode, ui in (("interface", "true"), ("API seule", "false")):
+            env = {
+                **os.environ,
+                "UI_ENABLED": ui,
+                "DATABASE_URL": f"sqlite:///{os.path.join(dossier, f'startup_{ui}.db')}",
+            }
+            import_ms = duree_import(env, args.essais)
+
+            debut = time.perf_counter()
+            serveur = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "app:gradio_app", "--port", str(args.port)],
+                env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            try:
+                health_ms = attendre(f"{base}/health", debut)
+                ready_ms = attendre(f"{base}/ready", debut)
+                premiere_ms = latence_predict(f"{base}/predict", EMPLOYE)
+                # Saisie différente : pas de réponse servie par le cache
+                deuxieme_ms = latence_predict(f"{base}/predict", {**EMPLOYE, "age": EMPLOYE["age"] + 1})
+            finally:
+                serveur.terminate()
+                serveur.wait()
+
+            print(
+                f"{mode:<10}  import {import_ms:7.0f} ms   /health {health_ms:7.0f} ms   "
+                f"/ready {ready_ms:7.0f} ms   1re requête {premiere_ms:6.1f} ms   2e requête {deuxieme_ms:6.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Débit et mémoire du lanceur multi-workers (src/launcher.py) selon le nombre de workers.
+
+Pour chaque nombre de workers, lance le serveur sur une base SQLite temporaire,
+envoie une charge sur /predict puis relève la mémoire de chaque processus.
+La PSS (mémoire proportionnelle, Linux) répartit les pages partagées entre
+processus : c'est elle qui montre le partage en copie sur écriture.
+
+Usage : python -m benchmarks.bench_workers [--workers 1 2 4] [--requetes 2000]
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.common import attendre_serveur, charge
+
+
+def memoire_ko(pid):
+    """Retourne (RSS, PSS) en Ko d'un processus, d'après /proc/<pid>/smaps_rollup."""
+    valeurs = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for ligne in f:
+            morceaux = ligne.split()
+            if morceaux[0] in ("Rss:", "Pss:"):
+                valeurs[morceaux[0][:-1]] = int(morceaux[1])
+    return valeurs["Rss"], valeurs["Pss"]
+
+
+def processus_enfants(pid):
+    enfants = []
+    for entree in os.listdir("/proc"):
+        if entree.isdigit():
+            try:
+                with open(f"/proc/{entree}/stat") as f:
+                    if int(f.read().rsplit(")", 1)[1].split()[1]) == pid:
+                        enfants.append(int(entree))
+            except (FileNotFoundError, ProcessLookupError):
+                continue
+    return enfants
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requetes", type=int, default=2000)
+    parser.add_argument("--concurrence", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as dossier:
+        for workers in args.workers:
+            env = {
+                **os.environ,
+                "DATABASE_URL": f"sqlite:///{os.path.join(dossier, f'bench_{workers}.db')}",
+            }
+            serveur = subprocess.Popen(
+                [sys.executable, "-m", "src.launcher", "--workers", str(workers),
+                 "--port", str(args.port), "--app", "app:app"],
+                env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            try:
+                attendre_serveur(serveur, args.port)
+                url = f"http://127.0.0.1:{args.port}/predict"
+                asyncio.run(charge(url, 50 * workers, 8))  # échauffement
+                duree, _ = asyncio.run(charge(url, args.requetes, args.concurrence))
+
+                pids = [serveur.pid] + processus_enfants(serveur.pid)
+                memoires = [memoire_ko(pid) for pid in pids]
+            finally:
+                serveur.terminate()
+                serveur.wait()
+
+            rss_total = sum(rss for rss, _ in memoires) / 1024
+            pss_total = sum(pss for _, pss in memoires) / 1024
+            print(
+                f"{workers} worker(s)  {args.requetes / duree:8.1f} req/s   "
+                f"RSS cumulée {rss_total:7.1f} Mo   PSS totale {pss_total:7.1f} Mo   "
+                f"PSS par worker {pss_total / workers:6.1f} Mo"
+            )
+
+
+if __name__ == "__main__":
+    main()
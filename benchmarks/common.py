@@ -0,0 +1,61 @@
+"""Données et outils de mesure partagés par les benchmarks."""
+import asyncio
+import time
+
+import httpx
+
+EMPLOYE = {
+    "age": 35, "genre": "M", "revenu_mensuel": 4500.0, "statut_marital": "Marie",
+    "departement": "Consulting", "poste": "Consultant", "niveau_hierarchique_poste": 2,
+    "nombre_experiences_precedentes": 3, "annee_experience_totale": 10,
+    "annees_dans_l_entreprise": 5, "annees_dans_le_poste_actuel": 3,
+    "satisfaction_employee_environnement": 3.0, "note_evaluation_precedente": 3.0,
+    "satisfaction_employee_nature_travail": 3.0, "satisfaction_employee_equipe": 3.0,
+    "satisfaction_employee_equilibre_pro_perso": 3.0, "note_evaluation_actuelle": 3.0,
+    "heure_supplementaires": "Oui", "augmentation_salaire_precedente_pourcent": 0.15,
+    "nombre_participation_pee": 1, "nb_formations_suivies": 2, "distance_domicile_travail": 10.0,
+    "niveau_education": 3, "domaine_etude": "InfraCloud", "frequence_deplacement": "Occasionnel",
+    "annees_depuis_la_derniere_promotion": 1, "annes_sous_responsable_actuel": 2,
+}
+
+
+def chrono(fonction, repetitions):
+    """Retourne la liste des durées (ms) de `repetitions` appels."""
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        durees.append((time.perf_counter() - debut) * 1000)
+    return durees
+
+
+async def charge(url, requetes, concurrence):
+    """Envoie les requêtes avec `concurrence` clients ; retourne (durée totale, latences ms)."""
+    latences = []
+    compteur = iter(range(requetes))
+    limites = httpx.Limits(max_connections=concurrence)
+
+    async with httpx.AsyncClient(limits=limites, timeout=60) as client:
+        async def client_virtuel():
+            for _ in compteur:
+                debut = time.perf_counter()
+                response = await client.post(url, json=EMPLOYE)
+                response.raise_for_status()
+                latences.append((time.perf_counter() - debut) * 1000)
+
+        debut = time.perf_counter()
+        await asyncio.gather(*(client_virtuel() for _ in range(concurrence)))
+        return time.perf_counter() - debut, latences
+
+
+def attendre_serveur(processus, port, delai=60):
+    """Attend que /health réponde sur le port donné ; arrête le processus sinon."""
+    fin = time.monotonic() + delai
+    while time.monotonic() < fin:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return
+        except httpx.TransportError:
+            time.sleep(0.1)
+    processus.kill()
+    raise RuntimeError(f"Le serveur n'a pas démarré sur le port {port}")
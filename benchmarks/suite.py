@@ -0,0 +1,215 @@
+"""
+Suite de benchmarks reproductible du service de prédiction.
+
+1. Micro-benchmarks (à la pytest-benchmark) de data_engineering, data_scaling, predict,
+   FeatureEncoder et score_employees sur des lots de 1, 100 et 10 000 lignes.
+2. Test de charge en processus de /predict (TestClient FastAPI, base SQLite temporaire) :
+   débit et latences p50 / p95 / p99.
+
+Les résultats sont enregistrés en JSON pour être comparés d'un commit à l'autre ;
+`--compare` signale les régressions au-delà de `--tolerance` et renvoie un code d'erreur.
+
+Usage :
+    python -m benchmarks.suite --output benchmarks/results/$(git rev-parse --short HEAD).json
+    python -m benchmarks.suite --output nouveau.json --compare ancien.json
+"""
+import os
+import tempfile
+
+# Environnement isolé, fixé avant l'import de l'application : base SQLite jetable
+# et cache désactivé pour mesurer le chemin complet à chaque requête
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'benchmark.db')}"
+os.environ["PREDICTION_CACHE_SIZE"] = "0"
+os.environ.pop("SPACE_ID", None)
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from benchmarks.common import EMPLOYE
+
+TAILLES = (1, 100, 10_000)
+
+# data_scaling écrit sur une sélection de colonnes : avertissement pandas répété à chaque tour
+warnings.filterwarnings("ignore", category=pd.errors.SettingWithCopyWarning)
+
+
+def mesurer(fonction, preparation=None, temps_min=0.5, tours_min=5, tours_max=1000):
+    """
+    Chronomètre `fonction` (hors `preparation`, appelée avant chaque tour) jusqu'à
+    `temps_min` secondes cumulées ; retourne les statistiques en millisecondes.
+    """
+    arguments = preparation() if preparation else ()
+    fonction(*arguments)  # échauffement
+
+    durees = []
+    while len(durees) < tours_min or (sum(durees) < temps_min and len(durees) < tours_max):
+        arguments = preparation() if preparation else ()
+        debut = time.perf_counter()
+        fonction(*arguments)
+        durees.append(time.perf_counter() - debut)
+
+    durees_ms = [d * 1000 for d in durees]
+    return {
+        "rounds": len(durees_ms),
+        "min_ms": round(min(durees_ms), 4),
+        "median_ms": round(statistics.median(durees_ms), 4),
+        "mean_ms": round(statistics.mean(durees_ms), 4),
+        "stddev_ms": round(statistics.stdev(durees_ms), 4) if len(durees_ms) > 1 else 0.0,
+        "ops_per_s": round(1000 / statistics.median(durees_ms), 2),
+    }
+
+
+def micro_benchmarks(tailles=TAILLES, temps_min=0.5):
+    from src.artifacts import get_bundle
+    from src.preprocessing import data_engineering
+    from src.prediction import predict_batch
+    from src.scaling import data_scaling
+    from src.service import score_employees
+
+    bundle = get_bundle()
+    resultats = {}
+    for taille in tailles:
+        lignes = [EMPLOYE] * taille
+        saisies = pd.DataFrame(lignes)
+        traitees = data_engineering(saisies)
+        pretes = data_scaling(traitees.copy(), bundle.scaler)
+
+        scenarios = {
+            "data_engineering": (lambda: data_engineering(saisies), None),
+            # data_scaling modifie son entrée : une copie fraîche, non chronométrée, par tour
+            "data_scaling": (lambda donnees: data_scaling(donnees, bundle.scaler), lambda: (traitees.copy(),)),
+            "predict": (lambda: predict_batch(pretes, bundle), None),
+            "feature_encoder": (lambda: bundle.encoder.encode(lignes), None),
+            "score_employees": (lambda: score_employees(lignes, bundle, cache=None), None),
+        }
+        for nom, (fonction, preparation) in scenarios.items():
+            cle = f"{nom}[{taille}]"
+            resultats[cle] = mesurer(fonction, preparation, temps_min=temps_min)
+            print(f"{cle:<28} médiane {resultats[cle]['median_ms']:10.3f} ms   {resultats[cle]['rounds']:>5} tours")
+    return resultats
+
+
+def test_de_charge(requetes=500, concurrence=1):
+    """Charge /predict en processus ; retourne débit et quantiles de latence."""
+    from fastapi.testclient import TestClient
+    from app import app
+
+    latences = []
+
+    def envoyer(client, nombre):
+        for _ in range(nombre):
+            debut = time.perf_counter()
+            response = client.post("/predict", json=EMPLOYE)
+            latences.append((time.perf_counter() - debut) * 1000)
+            if response.status_code != 200 or "error" in response.json():
+                raise RuntimeError(f"Réponse inattendue : {response.status_code} {response.text}")
+
+    with TestClient(app) as client:
+        envoyer(client, 20)  # échauffement
+        latences.clear()
+
+        parts = [requetes // concurrence + (1 if i < requetes % concurrence else 0) for i in range(concurrence)]
+        debut = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrence) as pool:
+            list(pool.map(lambda nombre: envoyer(client, nombre), parts))
+        duree = time.perf_counter() - debut
+
+    quantiles = statistics.quantiles(latences, n=100)
+    resultat = {
+        "requests": requetes,
+        "concurrency": concurrence,
+        "throughput_rps": round(requetes / duree, 2),
+        "p50_ms": round(quantiles[49], 3),
+        "p95_ms": round(quantiles[94], 3),
+        "p99_ms": round(quantiles[98], 3),
+    }
+    print(
+        f"/predict  {resultat['throughput_rps']:.1f} req/s   p50 {resultat['p50_ms']:.2f} ms   "
+        f"p95 {resultat['p95_ms']:.2f} ms   p99 {resultat['p99_ms']:.2f} ms"
+    )
+    return resultat
+
+
+def metadonnees():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "date": datetime.utcnow().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def comparer(actuel, reference, tolerance):
+    """
+    Compare deux fichiers de résultats ; retourne la liste des régressions
+    (médiane ou p99 plus lente, ou débit plus faible, au-delà de la tolérance).
+    """
+    regressions = []
+    for cle, mesure in actuel["micro"].items():
+        ancienne = reference.get("micro", {}).get(cle)
+        if ancienne:
+            ratio = mesure["median_ms"] / ancienne["median_ms"]
+            print(f"{cle:<28} x{ratio:5.2f}")
+            if ratio > 1 + tolerance:
+                regressions.append(f"{cle} : médiane x{ratio:.2f}")
+
+    charge, ancienne = actuel.get("load"), reference.get("load")
+    if charge and ancienne:
+        if charge["throughput_rps"] < ancienne["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"débit /predict : {ancienne['throughput_rps']} -> {charge['throughput_rps']} req/s")
+        if charge["p99_ms"] > ancienne["p99_ms"] * (1 + tolerance):
+            regressions.append(f"p99 /predict : {ancienne['p99_ms']} -> {charge['p99_ms']} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default=None, help="fichier JSON des résultats")
+    parser.add_argument("--compare", default=None, help="fichier JSON de référence")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="écart toléré avant régression (0.25 = 25 %%)")
+    parser.add_argument("--tailles", type=int, nargs="+", default=list(TAILLES))
+    parser.add_argument("--temps-min", type=float, default=0.5, help="secondes de mesure par micro-benchmark")
+    parser.add_argument("--requetes", type=int, default=500)
+    parser.add_argument("--concurrence", type=int, default=1)
+    parser.add_argument("--sans-charge", action="store_true", help="micro-benchmarks uniquement")
+    args = parser.parse_args()
+
+    resultats = {"meta": metadonnees(), "micro": micro_benchmarks(args.tailles, args.temps_min)}
+    if not args.sans_charge:
+        resultats["load"] = test_de_charge(args.requetes, args.concurrence)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(resultats, f, indent=2)
+        print(f"Résultats enregistrés dans {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            reference = json.load(f)
+        regressions = comparer(resultats, reference, args.tolerance)
+        for regression in regressions:
+            print(f"RÉGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
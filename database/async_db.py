@@ -0,0 +1,41 @@
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from database.create_db import (
+    DB_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+)
+
+
+def async_url(url: str) -> str:
+    """
+    Convertit l'URL synchrone en URL asyncio :
+    PostgreSQL -> asyncpg, SQLite -> aiosqlite.
+    """
+    if url.startswith("sqlite"):
+        return "sqlite+aiosqlite" + url[url.index(":"):]
+    if url.startswith(("postgresql", "postgres")):
+        return "postgresql+asyncpg" + url[url.index(":"):]
+    return url
+
+
+# === Moteur asyncio (mêmes réglages de pool que le moteur synchrone) ===
+async_engine = create_async_engine(
+    async_url(DB_URL),
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    echo=False,
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def get_async_db():
+    """Dépendance FastAPI : session asyncio refermée à la fin de la requête."""
+    async with AsyncSessionLocal() as db:
+        yield db
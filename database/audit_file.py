@@ -0,0 +1,253 @@
+"""
+Journal d'audit sur fichiers (AUDIT_SINK=file) et import hors ligne dans la base.
+
+Les enregistrements d'audit (build_audit_record) sont déposés dans une file ; un thread
+les sérialise par lots en JSON Lines, une ligne par prédiction, en ajout seul dans
+AUDIT_DIR. Chaque processus écrit son propre fichier `audit-<date>-<pid>.jsonl.open`,
+renommé en `.jsonl` (fermé) dès qu'il dépasse AUDIT_FILE_MAX_MB ou AUDIT_FILE_MAX_AGE_S,
+et à l'arrêt. Aucune ligne ORM ni requête SQL n'est produite pendant le service.
+
+Un fichier resté `.jsonl.open` après l'arrêt brutal de son processus (pid absent) est
+récupéré à l'import : tronqué après sa dernière ligne complète, puis fermé. Les fichiers
+d'un pid inconnu de cette machine (dossier partagé, redémarrage) se récupèrent avec
+--inclure-orphelins, une fois tous les workers arrêtés.
+
+L'import relit les fichiers fermés et écrit les mêmes lignes que l'audit en base
+(add_records : dédoublonnage des saisies compris), un fichier par transaction.
+Les fichiers importés sont enregistrés dans audit_imports puis déplacés dans
+AUDIT_DIR/importes : relancer l'import ne crée pas de doublons.
+
+Usage : python -m database.audit_file [--dossier audit] [--paquet 5000] [--inclure-orphelins]
+"""
+import argparse
+import base64
+import glob
+import json
+import os
+import time
+from datetime import datetime
+
+from sqlalchemy import select
+
+from src.background import BatchWorker
+from src.feature_codec import FEATURE_SCHEMA
+from src.metrics import AUDIT_FLUSH_DURATION, AUDIT_RECORDS
+from database.create_db import AuditImportDB, SessionLocal
+from database.persistence import add_records
+
+AUDIT_DIR = os.getenv("AUDIT_DIR", "audit")
+AUDIT_FILE_MAX_MB = float(os.getenv("AUDIT_FILE_MAX_MB", "64"))
+AUDIT_FILE_MAX_AGE_S = float(os.getenv("AUDIT_FILE_MAX_AGE_S", "3600"))
+AUDIT_FILE_BATCH_SIZE = int(os.getenv("AUDIT_FILE_BATCH_SIZE", "1000"))
+AUDIT_FILE_FLUSH_INTERVAL_MS = int(os.getenv("AUDIT_FILE_FLUSH_INTERVAL_MS", "200"))
+AUDIT_FILE_QUEUE_SIZE = int(os.getenv("AUDIT_FILE_QUEUE_SIZE", "100000"))
+
+SUFFIXE_OUVERT = ".jsonl.open"
+SUFFIXE_FERME = ".jsonl"
+
+
+def serialiser(record):
+    """Ligne JSON compacte d'un enregistrement d'audit (vecteur de features en base64)."""
+    return json.dumps(
+        {
+            **record,
+            "feature_vector": base64.b64encode(record["feature_vector"]).decode("ascii"),
+            "feature_schema": record.get("feature_schema", FEATURE_SCHEMA),
+            "timestamp": record["timestamp"].isoformat(),
+        },
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+
+
+def deserialiser(ligne):
+    record = json.loads(ligne)
+    record["feature_vector"] = base64.b64decode(record["feature_vector"])
+    record["timestamp"] = datetime.fromisoformat(record["timestamp"])
+    return record
+
+
+class AuditFileWriter(BatchWorker):
+    """
+    Écriture du journal d'audit en fichiers JSON Lines tournants.
+    Les requêtes déposent leurs enregistrements dans une file bornée ; un thread
+    les écrit par lots (jusqu'à `batch_size` ou `flush_interval_ms`) et vide le tampon
+    du fichier après chaque lot. Le fichier courant est fermé à l'arrêt.
+    """
+
+    nom = "audit-file-writer"
+
+    def __init__(self, dossier=AUDIT_DIR, max_mb=AUDIT_FILE_MAX_MB, max_age_s=AUDIT_FILE_MAX_AGE_S,
+                 batch_size=AUDIT_FILE_BATCH_SIZE, flush_interval_ms=AUDIT_FILE_FLUSH_INTERVAL_MS,
+                 max_queue=AUDIT_FILE_QUEUE_SIZE):
+        super().__init__(batch_size, flush_interval_ms, max_queue)
+        self.dossier = dossier
+        self.max_bytes = max_mb * 1024 * 1024
+        self.max_age_s = max_age_s
+        self._fichier = None
+        self._chemin = None
+        self._ouvert_a = 0.0
+        self.written = 0
+        self.failed = 0
+        self.rotations = 0
+
+    def _inactif(self):
+        if self._fichier is not None and time.monotonic() - self._ouvert_a > self.max_age_s:
+            self._fermer()
+
+    def _terminer(self):
+        self._fermer()
+
+    def _abandonner(self, nombre):
+        AUDIT_RECORDS.inc(nombre, status="dropped")
+
+    def _ouvrir(self):
+        os.makedirs(self.dossier, exist_ok=True)
+        nom = f"audit-{datetime.utcnow():%Y%m%dT%H%M%S%f}-{os.getpid()}"
+        self._chemin = os.path.join(self.dossier, nom)
+        self._fichier = open(self._chemin + SUFFIXE_OUVERT, "a", encoding="utf-8")
+        self._ouvert_a = time.monotonic()
+
+    def _fermer(self):
+        """Ferme le fichier courant et le rend disponible pour l'import."""
+        if self._fichier is None:
+            return
+        self._fichier.close()
+        os.replace(self._chemin + SUFFIXE_OUVERT, self._chemin + SUFFIXE_FERME)
+        self._fichier = None
+        self.rotations += 1
+
+    def _traiter(self, batch):
+        try:
+            with AUDIT_FLUSH_DURATION.time():
+                if self._fichier is None:
+                    self._ouvrir()
+                self._fichier.write("".join(serialiser(record) + "\n" for record in batch))
+                self._fichier.flush()
+            self.written += len(batch)
+            AUDIT_RECORDS.inc(len(batch), status="written")
+        except Exception as e:
+            self.failed += len(batch)
+            AUDIT_RECORDS.inc(len(batch), status="failed")
+            print(f"Écriture du journal d'audit impossible ({len(batch)} enregistrements perdus) : {e}")
+            return
+
+        if (self._fichier.tell() >= self.max_bytes
+                or time.monotonic() - self._ouvert_a > self.max_age_s):
+            self._fermer()
+
+
+audit_file_writer = AuditFileWriter()
+
+
+# === Import hors ligne ===
+def _processus_actif(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def recuperer_orphelins(dossier=AUDIT_DIR, tous=False):
+    """
+    Ferme les fichiers `.jsonl.open` dont le processus n'existe plus (tous si `tous`),
+    tronqués après leur dernière ligne complète ; retourne les chemins fermés.
+    """
+    recuperes = []
+    for ouvert in sorted(glob.glob(os.path.join(dossier, "audit-*" + SUFFIXE_OUVERT))):
+        pid = os.path.basename(ouvert)[:-len(SUFFIXE_OUVERT)].rsplit("-", 1)[-1]
+        if not tous and (not pid.isdigit() or _processus_actif(int(pid))):
+            continue
+        with open(ouvert, "rb+") as f:
+            contenu = f.read()
+            # Un arrêt au milieu d'un lot laisse au plus une ligne incomplète, perdue
+            f.truncate(contenu.rfind(b"\n") + 1)
+            f.flush()
+            os.fsync(f.fileno())
+        ferme = ouvert[:-len(SUFFIXE_OUVERT)] + SUFFIXE_FERME
+        os.replace(ouvert, ferme)
+        print(f"Fichier d'audit orphelin récupéré : {os.path.basename(ferme)}")
+        recuperes.append(ferme)
+    return recuperes
+
+
+def fichiers_a_importer(dossier=AUDIT_DIR):
+    """Fichiers fermés de `dossier`, du plus ancien au plus récent."""
+    return sorted(glob.glob(os.path.join(dossier, "audit-*" + SUFFIXE_FERME)))
+
+
+def importer_fichier(chemin, session_factory=SessionLocal, paquet=5000):
+    """
+    Importe un fichier fermé en une transaction ; retourne le nombre d'enregistrements
+    (None si le fichier figure déjà dans audit_imports).
+    """
+    nom = os.path.basename(chemin)
+    db = session_factory()
+    try:
+        if db.execute(select(AuditImportDB.filename).where(AuditImportDB.filename == nom)).first():
+            return None
+
+        total = 0
+        records = []
+        with open(chemin, encoding="utf-8") as f:
+            for ligne in f:
+                if ligne.strip():
+                    records.append(deserialiser(ligne))
+                if len(records) >= paquet:
+                    total += _ajouter(db, records)
+                    records = []
+        total += _ajouter(db, records)
+
+        db.add(AuditImportDB(filename=nom, records=total))
+        db.commit()
+        return total
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _ajouter(db, records):
+    if records:
+        add_records(db, records)
+        # Les lignes partent en base au fil de l'eau ; la session ne les garde pas en mémoire
+        db.flush()
+        db.expunge_all()
+    return len(records)
+
+
+def importer_dossier(dossier=AUDIT_DIR, session_factory=SessionLocal, paquet=5000, inclure_orphelins=False):
+    """
+    Importe tous les fichiers fermés de `dossier` (orphelins récupérés compris) puis
+    les déplace dans `dossier`/importes.
+    """
+    recuperer_orphelins(dossier, tous=inclure_orphelins)
+    resultats = {}
+    importes = os.path.join(dossier, "importes")
+    for chemin in fichiers_a_importer(dossier):
+        resultats[os.path.basename(chemin)] = importer_fichier(chemin, session_factory, paquet)
+        os.makedirs(importes, exist_ok=True)
+        os.replace(chemin, os.path.join(importes, os.path.basename(chemin)))
+    return resultats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dossier", default=AUDIT_DIR, help="dossier des fichiers d'audit")
+    parser.add_argument("--paquet", type=int, default=5000, help="enregistrements envoyés par flush")
+    parser.add_argument("--inclure-orphelins", action="store_true",
+                        help="ferme aussi les fichiers .open dont le pid semble actif (workers arrêtés)")
+    args = parser.parse_args()
+
+    from database.create_db import init_db
+    init_db()
+    for nom, nombre in importer_dossier(args.dossier, paquet=args.paquet, inclure_orphelins=args.inclure_orphelins).items():
+        print(f"{nom:<45} {'déjà importé' if nombre is None else f'{nombre} enregistrement(s)'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,14 @@
 from sqlalchemy import (
-    create_engine, Column, Integer, Float, String,
-    DateTime, Text, ForeignKey, func
+    create_engine, Boolean, Column, Integer, Float, String,
+    Date, DateTime, Text, LargeBinary, ForeignKey, Index, func, text
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -30,19 +34,104 @@ elif DB_URL:
 else:
     raise ValueError("DATABASE_URL introuvable dans .env (nécessaire en local).")
 
-# === Connexion SQLAlchemy ===
-connect_args = {"check_same_thread": False} if DB_URL.startswith("sqlite") else {}
-engine = create_engine(DB_URL, connect_args=connect_args, echo=False)
-SessionLocal = sessionmaker(bind=engine)
-Base = declarative_base()
+# "sync" : handlers FastAPI synchrones (threadpool) ; "async" : moteur SQLAlchemy asyncio
+DB_MODE = os.getenv("DB_MODE", "sync").lower()
+
+# === Configuration du pool de connexions (variables d'environnement) ===
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool qui mesure le temps d'attente pour obtenir une connexion."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        debut = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            attente = time.perf_counter() - debut
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_total += attente
+                self.wait_max = max(self.wait_max, attente)
 
 
 # === Connexion et configuration de la session ===
-connect_args = {"check_same_thread": False} if "sqlite" in DB_URL else {}
-engine = create_engine(DB_URL, connect_args=connect_args)
+connect_args = {"check_same_thread": False} if DB_URL.startswith("sqlite") else {}
+engine = create_engine(
+    DB_URL,
+    connect_args=connect_args,
+    poolclass=TimedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    echo=False,
+)
 SessionLocal = sessionmaker(bind=engine)
 Base = declarative_base()
 
+
+def get_db():
+    """
+    Dépendance FastAPI : fournit une session et garantit sa fermeture
+    (et donc le retour de la connexion au pool), y compris en cas d'erreur.
+    La connexion n'est empruntée au pool qu'à la première requête SQL.
+    """
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def ping_db():
+    """Vérifie que la base répond (une connexion du pool + SELECT 1)."""
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+def pool_stats():
+    """Statistiques du pool : connexions empruntées, débordement, temps d'attente."""
+    pool = engine.pool
+    stats = {
+        "pool_size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "max_overflow": DB_MAX_OVERFLOW,
+        "timeout_s": DB_POOL_TIMEOUT,
+        "recycle_s": DB_POOL_RECYCLE,
+        "pre_ping": DB_POOL_PRE_PING,
+    }
+    if isinstance(pool, TimedQueuePool):
+        with pool._stats_lock:
+            stats.update({
+                "checkouts": pool.checkouts,
+                "timeouts": pool.timeouts,
+                "wait_avg_ms": round(pool.wait_total / pool.checkouts * 1000, 3) if pool.checkouts else 0.0,
+                "wait_max_ms": round(pool.wait_max * 1000, 3),
+            })
+    return stats
+
+
 #  TABLE 1 : Données brutes (inputs du formulaire)
 
 class EmployeeInputDB(Base):
@@ -76,7 +165,9 @@ class EmployeeInputDB(Base):
     frequence_deplacement = Column(String)
     annees_depuis_la_derniere_promotion = Column(Integer)
     annes_sous_responsable_actuel = Column(Integer)
-    created_at = Column(DateTime, server_default=func.now())
+    # Empreinte de la saisie (src.cache.input_hash) : une saisie identique réutilise la ligne
+    input_hash = Column(String(32), unique=True, index=True)
+    created_at = Column(DateTime, server_default=func.now(), index=True)
 
     # Relations
     features = relationship("FeatureDB", back_populates="employee")
@@ -89,9 +180,11 @@ class FeatureDB(Base):
     __tablename__ = "features"
 
     id = Column(Integer, primary_key=True, index=True)
-    employee_input_id = Column(Integer, ForeignKey("employee_inputs.id"))
-    feature_data = Column(Text)  # Données encodées/scalées au format JSON
-    created_at = Column(DateTime, server_default=func.now())
+    employee_input_id = Column(Integer, ForeignKey("employee_inputs.id"), index=True)
+    feature_data = Column(Text)  # Ancien format JSON (lignes historiques uniquement)
+    feature_vector = Column(LargeBinary)  # Vecteur float32 dans l'ordre de scaler_ou_non()
+    feature_schema = Column(String(12))  # Empreinte de la liste de colonnes du vecteur
+    created_at = Column(DateTime, server_default=func.now(), index=True)
 
     # Relation
     employee = relationship("EmployeeInputDB", back_populates="features")
@@ -102,11 +195,11 @@ class PredictionResultDB(Base):
     __tablename__ = "prediction_results"
 
     id = Column(Integer, primary_key=True, index=True)
-    employee_input_id = Column(Integer, ForeignKey("employee_inputs.id"))
+    employee_input_id = Column(Integer, ForeignKey("employee_inputs.id"), index=True)
     prediction = Column(Integer)
     probability = Column(Float)
     message = Column(String)
-    created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(DateTime, server_default=func.now(), index=True)
 
     # Relation
     employee = relationship("EmployeeInputDB", back_populates="predictions")
@@ -118,9 +211,9 @@ class RequestLogDB(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     endpoint = Column(String)
-    employee_input_id = Column(Integer, ForeignKey("employee_inputs.id"))
+    employee_input_id = Column(Integer, ForeignKey("employee_inputs.id"), index=True)
     user_id = Column(String, default="florian_user")
-    timestamp = Column(DateTime, server_default=func.now())
+    timestamp = Column(DateTime, server_default=func.now(), index=True)
 
     # Relations
     employee = relationship("EmployeeInputDB", back_populates="requests")
@@ -132,17 +225,99 @@ class ApiResponseDB(Base):
     __tablename__ = "api_responses"
 
     id = Column(Integer, primary_key=True, index=True)
-    request_id = Column(Integer, ForeignKey("requests.id"))
-    prediction_id = Column(Integer, ForeignKey("prediction_results.id"))
+    request_id = Column(Integer, ForeignKey("requests.id"), index=True)
+    prediction_id = Column(Integer, ForeignKey("prediction_results.id"), index=True)
     status_code = Column(Integer)
     message = Column(String)
-    timestamp = Column(DateTime, server_default=func.now())
+    duration_ms = Column(Float, nullable=True)  # Temps de traitement avant journalisation
+    timestamp = Column(DateTime, server_default=func.now(), index=True)
 
     # Relations
     request = relationship("RequestLogDB", back_populates="responses")
+    prediction = relationship("PredictionResultDB")
+
+#  TABLE 6 : Synthèse quotidienne du risque de départ par département
+#  (mise à jour incrémentale par database/history.py, conservée après la rétention)
+
+class AttritionDailyDB(Base):
+    __tablename__ = "attrition_daily"
+
+    jour = Column(Date, primary_key=True)
+    departement = Column(String, primary_key=True)
+    predictions = Column(Integer, nullable=False, default=0)
+    departs = Column(Integer, nullable=False, default=0)  # Prédictions "Risque de départ"
+    probabilite_totale = Column(Float, nullable=False, default=0.0)
+
+#  TABLE 7 : Dernière prédiction agrégée par chaque synthèse
+
+class RollupStateDB(Base):
+    __tablename__ = "rollup_state"
+
+    name = Column(String, primary_key=True)
+    last_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, server_default=func.now())
+
+#  TABLE 8 : Résultats d'un modèle candidat évalué en parallèle (shadow / canary)
+#  Reliés à la saisie par son empreinte, avec le résultat du modèle principal pour comparaison
+
+class ShadowResultDB(Base):
+    __tablename__ = "shadow_results"
+
+    id = Column(Integer, primary_key=True, index=True)
+    input_hash = Column(String(32), index=True)
+    model_version = Column(String(12))  # Version des artefacts du candidat
+    prediction = Column(Integer)
+    probability = Column(Float)
+    latency_ms = Column(Float)  # Encodage + inférence du candidat, par ligne de son lot
+    primary_prediction = Column(Integer)
+    primary_probability = Column(Float)
+    primary_latency_ms = Column(Float)  # Scoring du modèle principal, par ligne calculée (NULL si servie par le cache)
+    primary_cached = Column(Boolean)  # Résultat principal servi par le cache de prédictions
+    created_at = Column(DateTime, server_default=func.now(), index=True)
+
+#  TABLE 9 : Fichiers du journal d'audit déjà importés (database/audit_file.py)
+
+class AuditImportDB(Base):
+    __tablename__ = "audit_imports"
+
+    filename = Column(String, primary_key=True)
+    records = Column(Integer)
+    imported_at = Column(DateTime, server_default=func.now())
+
+#  TABLE 10 : Contributions des features à une prédiction (valeurs SHAP, src/explanation.py)
+#  Une ligne par saisie (empreinte) et par version des artefacts
+
+class ExplanationDB(Base):
+    __tablename__ = "prediction_explanations"
+    __table_args__ = (Index("ix_prediction_explanations_saisie", "input_hash", "model_version", unique=True),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    input_hash = Column(String(32), nullable=False)
+    model_version = Column(String(12), nullable=False)
+    contributions = Column(LargeBinary)  # float32 : une contribution par colonne de scaler_ou_non(), puis la valeur de base
+    created_at = Column(DateTime, server_default=func.now(), index=True)
 
 #  CRÉATION DES TABLES
 
+_tables_pretes = False
+
+
+def init_db():
+    """
+    Crée les tables absentes et applique les migrations en attente (database/migrations.py),
+    une seule fois par processus. Appelée au démarrage de l'application
+    (ou dans le parent, avant le fork des workers).
+    """
+    global _tables_pretes
+    if not _tables_pretes:
+        from database.migrations import upgrade
+
+        print("Initialisation des tables si absentes...")
+        upgrade(engine)
+        print("Tables prêtes.")
+        _tables_pretes = True
+
+
 if __name__ == "__main__":
-    Base.metadata.create_all(bind=engine)
+    init_db()
     print("Base de données et tables créées avec succès.")
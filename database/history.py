@@ -0,0 +1,184 @@
+"""
+Lecture de l'historique des prédictions et synthèse quotidienne du risque de départ.
+
+L'historique (prediction_results joint à employee_inputs) est paginé par curseur :
+chaque page s'arrête à un identifiant que la page suivante reprend (id < curseur),
+sans OFFSET, donc à coût constant quelle que soit la profondeur de la pagination.
+
+La synthèse attrition_daily est mise à jour de façon incrémentale : seules les prédictions
+d'identifiant supérieur au dernier agrégé (rollup_state) sont lues, puis ajoutées aux
+compteurs de leur jour et département. Les prédictions sont lues dans l'ordre des
+identifiants et la lecture s'arrête à la première des ROLLUP_DELAY_S dernières secondes :
+tout ce qui la suit est laissé au passage suivant, même les lignes plus anciennes, le temps
+que les transactions en cours soient validées. Une transaction qui reste ouverte plus de
+ROLLUP_DELAY_S secondes après avoir obtenu son identifiant peut être dépassée par le
+filigrane et ses prédictions manquer à la synthèse : ROLLUP_DELAY_S doit rester supérieur
+à la plus longue transaction d'écriture (chargement d'un morceau du scoring de masse compris).
+Le filigrane est avancé sous condition avant l'ajout : si plusieurs workers
+mettent à jour en même temps, un seul applique chaque lot.
+
+Usage : python -m database.history (mise à jour de la synthèse)
+"""
+import os
+from collections import defaultdict
+from datetime import timedelta
+
+from sqlalchemy import func, select, update
+
+from database.create_db import AttritionDailyDB, EmployeeInputDB, PredictionResultDB, RollupStateDB, engine
+
+# Intervalle entre deux mises à jour de la synthèse par l'API (0 : désactivée)
+ROLLUP_INTERVAL_S = float(os.getenv("ROLLUP_INTERVAL_S", "60"))
+# Âge minimal d'une prédiction avant d'être agrégée
+ROLLUP_DELAY_S = float(os.getenv("ROLLUP_DELAY_S", "30"))
+# Prédictions lues par transaction lors de la mise à jour
+ROLLUP_PAQUET = 50_000
+SYNTHESE = "attrition_daily"
+DEPARTEMENT_INCONNU = "inconnu"
+
+predictions = PredictionResultDB.__table__
+employes = EmployeeInputDB.__table__
+synthese = AttritionDailyDB.__table__
+etat = RollupStateDB.__table__
+
+
+# === Historique paginé ===
+def historique(db, debut=None, fin=None, departement=None, poste=None, prediction=None,
+               limite=100, curseur=None):
+    """
+    Prédictions les plus récentes d'abord, filtrées ; retourne
+    {"items": [...], "next_cursor": identifiant à passer pour la page suivante ou None}.
+    """
+    requete = (
+        select(
+            predictions.c.id,
+            predictions.c.created_at,
+            predictions.c.prediction,
+            predictions.c.probability,
+            predictions.c.message,
+            predictions.c.employee_input_id,
+            employes.c.departement,
+            employes.c.poste,
+        )
+        .join(employes, employes.c.id == predictions.c.employee_input_id)
+        .order_by(predictions.c.id.desc())
+        .limit(limite + 1)
+    )
+    if debut is not None:
+        requete = requete.where(predictions.c.created_at >= debut)
+    if fin is not None:
+        requete = requete.where(predictions.c.created_at < fin)
+    if departement is not None:
+        requete = requete.where(employes.c.departement == departement)
+    if poste is not None:
+        requete = requete.where(employes.c.poste == poste)
+    if prediction is not None:
+        requete = requete.where(predictions.c.prediction == prediction)
+    if curseur is not None:
+        requete = requete.where(predictions.c.id < curseur)
+
+    lignes = [dict(ligne) for ligne in db.execute(requete).mappings()]
+    suivant = lignes[limite - 1]["id"] if len(lignes) > limite else None
+    return {"items": lignes[:limite], "next_cursor": suivant}
+
+
+# === Synthèse quotidienne ===
+def taux_attrition(db, debut=None, fin=None, departement=None):
+    """Lignes de la synthèse (jours `debut` à `fin` inclus) avec taux de risque et probabilité moyenne."""
+    requete = select(synthese).order_by(synthese.c.jour, synthese.c.departement)
+    if debut is not None:
+        requete = requete.where(synthese.c.jour >= debut)
+    if fin is not None:
+        requete = requete.where(synthese.c.jour <= fin)
+    if departement is not None:
+        requete = requete.where(synthese.c.departement == departement)
+
+    return [
+        {
+            "jour": ligne.jour.isoformat(),
+            "departement": ligne.departement,
+            "predictions": ligne.predictions,
+            "departs": ligne.departs,
+            "taux_risque": round(ligne.departs / ligne.predictions, 4),
+            "probabilite_moyenne": round(ligne.probabilite_totale / ligne.predictions, 4),
+        }
+        for ligne in db.execute(requete)
+        if ligne.predictions
+    ]
+
+
+def _appliquer_paquet(bind, delai_s, paquet):
+    with bind.begin() as connexion:
+        limite = connexion.execute(select(func.now())).scalar() - timedelta(seconds=delai_s)
+        dernier = connexion.execute(select(etat.c.last_id).where(etat.c.name == SYNTHESE)).scalar()
+        if dernier is None:
+            raise RuntimeError("Synthèse absente : appliquez les migrations (python -m database.migrations upgrade)")
+
+        lignes = connexion.execute(
+            select(
+                predictions.c.id,
+                predictions.c.created_at,
+                predictions.c.prediction,
+                predictions.c.probability,
+                employes.c.departement,
+            )
+            .join(employes, employes.c.id == predictions.c.employee_input_id, isouter=True)
+            .where(predictions.c.id > dernier)
+            .order_by(predictions.c.id)
+            .limit(paquet)
+        ).all()
+        # Arrêt à la première prédiction trop récente : le filigrane ne dépasse jamais
+        # un identifiant dont les prédécesseurs pourraient encore être en cours d'écriture
+        for position, ligne in enumerate(lignes):
+            if ligne.created_at > limite:
+                lignes = lignes[:position]
+                break
+        if not lignes:
+            return 0
+
+        # Sur PostgreSQL, la ligne d'état reste verrouillée jusqu'à la validation :
+        # un second worker attend ici, puis ne trouve plus `dernier` et abandonne son lot.
+        avance = connexion.execute(
+            update(etat)
+            .where(etat.c.name == SYNTHESE, etat.c.last_id == dernier)
+            .values(last_id=lignes[-1].id, updated_at=func.now())
+        ).rowcount
+        if not avance:
+            return 0
+
+        compteurs = defaultdict(lambda: [0, 0, 0.0])
+        for ligne in lignes:
+            compteur = compteurs[(ligne.created_at.date(), ligne.departement or DEPARTEMENT_INCONNU)]
+            compteur[0] += 1
+            compteur[1] += int(ligne.prediction == 1)
+            compteur[2] += ligne.probability or 0.0
+
+        for (jour, departement), (nombre, departs, probabilites) in compteurs.items():
+            cle = (synthese.c.jour == jour) & (synthese.c.departement == departement)
+            mis_a_jour = connexion.execute(
+                update(synthese).where(cle).values(
+                    predictions=synthese.c.predictions + nombre,
+                    departs=synthese.c.departs + departs,
+                    probabilite_totale=synthese.c.probabilite_totale + probabilites,
+                )
+            ).rowcount
+            if not mis_a_jour:
+                connexion.execute(synthese.insert().values(
+                    jour=jour, departement=departement,
+                    predictions=nombre, departs=departs, probabilite_totale=probabilites,
+                ))
+        return len(lignes)
+
+
+def mettre_a_jour_synthese(bind=engine, delai_s=ROLLUP_DELAY_S, paquet=ROLLUP_PAQUET):
+    """Agrège les nouvelles prédictions dans attrition_daily ; retourne leur nombre."""
+    total = 0
+    while True:
+        nombre = _appliquer_paquet(bind, delai_s, paquet)
+        if not nombre:
+            return total
+        total += nombre
+
+
+if __name__ == "__main__":
+    print(f"{mettre_a_jour_synthese()} prédiction(s) agrégée(s).")
@@ -0,0 +1,294 @@
+"""
+Migrations versionnées du schéma, enregistrées dans la table schema_version.
+
+Chaque migration porte un numéro, s'applique une seule fois et dans sa propre transaction.
+Elles sont écrites pour une base créée par une version antérieure de l'application :
+colonnes et index ne sont ajoutés que s'ils manquent. Sur PostgreSQL, un verrou consultatif
+empêche deux processus de migrer en même temps.
+
+Usage : python -m database.migrations [status|upgrade]
+"""
+import argparse
+from datetime import date, datetime
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, inspect, select, text
+from sqlalchemy.schema import AddConstraint
+
+from database.create_db import Base, engine
+
+# Tables partitionnées par mois sur PostgreSQL, avec leur colonne de date.
+# Seules les tables qu'aucune clé étrangère ne référence peuvent l'être
+# (une clé primaire de table partitionnée doit inclure la colonne de partitionnement).
+TABLES_PARTITIONNEES = {"features": "created_at", "api_responses": "timestamp"}
+# Partitions mensuelles créées à l'avance (en plus de la partition par défaut)
+PARTITIONS_A_L_AVANCE = 3
+# Clé du verrou consultatif PostgreSQL des migrations
+VERROU_MIGRATIONS = 72_018
+
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String),
+    Column("applied_at", DateTime, server_default=func.now()),
+)
+
+MIGRATIONS = []
+
+
+def migration(version, description):
+    """Enregistre une fonction de migration (appelée avec une connexion en transaction)."""
+    def enregistrer(fonction):
+        MIGRATIONS.append((version, description, fonction))
+        return fonction
+    return enregistrer
+
+
+def _ajouter_colonne(connexion, colonne):
+    table = colonne.table.name
+    if colonne.name not in {c["name"] for c in inspect(connexion).get_columns(table)}:
+        type_sql = colonne.type.compile(dialect=connexion.dialect)
+        connexion.execute(text(f"ALTER TABLE {table} ADD COLUMN {colonne.name} {type_sql}"))
+
+
+@migration(1, "tables initiales")
+def _tables_initiales(connexion):
+    Base.metadata.create_all(bind=connexion)
+
+
+@migration(2, "features : vecteur binaire et empreinte du schéma")
+def _features_binaires(connexion):
+    features = Base.metadata.tables["features"]
+    _ajouter_colonne(connexion, features.c.feature_vector)
+    _ajouter_colonne(connexion, features.c.feature_schema)
+
+
+@migration(3, "api_responses : durée de traitement")
+def _duree_reponses(connexion):
+    _ajouter_colonne(connexion, Base.metadata.tables["api_responses"].c.duration_ms)
+
+
+def _creer_index(connexion, index):
+    # Un index dont une colonne n'existe pas encore est créé par la migration qui l'ajoute
+    colonnes = {c["name"] for c in inspect(connexion).get_columns(index.table.name)}
+    if all(colonne.name in colonnes for colonne in index.columns):
+        index.create(bind=connexion, checkfirst=True)
+
+
+@migration(4, "index des clés étrangères et des colonnes de date")
+def _index(connexion):
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            _creer_index(connexion, index)
+
+
+@migration(5, "partitionnement mensuel de features et api_responses (PostgreSQL)")
+def _partitionnement(connexion):
+    if connexion.dialect.name != "postgresql":
+        return
+    for table, colonne in TABLES_PARTITIONNEES.items():
+        _partitionner(connexion, table, colonne)
+
+
+@migration(6, "synthèse quotidienne du risque de départ par département")
+def _synthese_attrition(connexion):
+    tables = [Base.metadata.tables["attrition_daily"], Base.metadata.tables["rollup_state"]]
+    Base.metadata.create_all(bind=connexion, tables=tables)
+    etat = tables[1]
+    if connexion.execute(select(etat.c.name).where(etat.c.name == "attrition_daily")).first() is None:
+        connexion.execute(etat.insert().values(name="attrition_daily", last_id=0))
+
+
+@migration(7, "employee_inputs : empreinte unique de la saisie")
+def _empreinte_saisies(connexion):
+    # Les saisies antérieures gardent une empreinte vide : seules les nouvelles sont dédoublonnées
+    saisies = Base.metadata.tables["employee_inputs"]
+    _ajouter_colonne(connexion, saisies.c.input_hash)
+    for index in saisies.indexes:
+        _creer_index(connexion, index)
+
+
+@migration(8, "résultats des modèles candidats (shadow)")
+def _resultats_candidats(connexion):
+    Base.metadata.create_all(bind=connexion, tables=[Base.metadata.tables["shadow_results"]])
+
+
+@migration(9, "fichiers du journal d'audit importés")
+def _imports_audit(connexion):
+    Base.metadata.create_all(bind=connexion, tables=[Base.metadata.tables["audit_imports"]])
+
+
+@migration(10, "contributions des features aux prédictions (explications)")
+def _explications(connexion):
+    Base.metadata.create_all(bind=connexion, tables=[Base.metadata.tables["prediction_explanations"]])
+
+
+@migration(11, "shadow_results : résultat principal servi par le cache")
+def _candidats_cache(connexion):
+    _ajouter_colonne(connexion, Base.metadata.tables["shadow_results"].c.primary_cached)
+
+
+# === Partitions PostgreSQL ===
+def _mois_suivant(mois):
+    return date(mois.year + mois.month // 12, mois.month % 12 + 1, 1)
+
+
+def creer_partitions(connexion, table, debut, jusqu_a):
+    """Crée les partitions mensuelles de `table` manquantes, du mois de `debut` à celui de `jusqu_a`."""
+    mois = date(debut.year, debut.month, 1)
+    while mois <= jusqu_a:
+        suivant = _mois_suivant(mois)
+        connexion.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {table}_{mois:%Y_%m} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{mois}') TO ('{suivant}')"
+        ))
+        mois = suivant
+
+
+def _partitionner(connexion, table, colonne):
+    """
+    Convertit `table` en table partitionnée par mois sur `colonne` :
+    nouvelle table (mêmes colonnes et valeurs par défaut), partition par défaut,
+    partitions couvrant les données existantes, copie, puis clé primaire (id, colonne),
+    clés étrangères et index.
+    """
+    deja = connexion.execute(
+        text("SELECT relkind FROM pg_class WHERE relname = :table"), {"table": table}
+    ).scalar()
+    if deja == "p":
+        return
+
+    ancienne = f"{table}_avant_partitionnement"
+    sequence = f"{table}_id_seq"
+    connexion.execute(text(f"ALTER TABLE {table} RENAME TO {ancienne}"))
+    connexion.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY NONE"))
+    connexion.execute(text(
+        f"CREATE TABLE {table} (LIKE {ancienne} INCLUDING DEFAULTS) PARTITION BY RANGE ({colonne})"
+    ))
+    connexion.execute(text(f"CREATE TABLE {table}_defaut PARTITION OF {table} DEFAULT"))
+
+    debut = connexion.execute(text(f"SELECT min({colonne}) FROM {ancienne}")).scalar() or datetime.utcnow()
+    creer_partitions(connexion, table, debut, _horizon())
+    connexion.execute(text(f"INSERT INTO {table} SELECT * FROM {ancienne}"))
+    connexion.execute(text(f"DROP TABLE {ancienne}"))
+    connexion.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id"))
+    # Après la suppression de l'ancienne table : son index {table}_pkey libère le nom
+    connexion.execute(text(f"ALTER TABLE {table} ADD PRIMARY KEY (id, {colonne})"))
+
+    modele = Base.metadata.tables[table]
+    for contrainte in modele.foreign_key_constraints:
+        connexion.execute(AddConstraint(contrainte))
+    for index in modele.indexes:
+        index.create(bind=connexion, checkfirst=True)
+
+
+def _horizon():
+    mois = date.today().replace(day=1)
+    for _ in range(PARTITIONS_A_L_AVANCE):
+        mois = _mois_suivant(mois)
+    return mois
+
+
+def partitions(connexion, table):
+    """Partitions mensuelles de `table` : liste de (nom, premier jour du mois)."""
+    noms = connexion.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :table"
+    ), {"table": table}).scalars()
+    resultat = []
+    for nom in noms:
+        suffixe = nom[len(table) + 1:]
+        if len(suffixe) == 7 and suffixe[4] == "_":
+            resultat.append((nom, date(int(suffixe[:4]), int(suffixe[5:]), 1)))
+    return sorted(resultat, key=lambda partition: partition[1])
+
+
+def maintenir_partitions(bind=engine):
+    """
+    PostgreSQL : crée les partitions des PARTITIONS_A_L_AVANCE prochains mois.
+    Un mois dont des lignes sont déjà dans la partition par défaut est laissé tel quel.
+    """
+    if bind.dialect.name != "postgresql":
+        return
+    for table in TABLES_PARTITIONNEES:
+        mois = date.today().replace(day=1)
+        while mois <= _horizon():
+            try:
+                with bind.begin() as connexion:
+                    creer_partitions(connexion, table, mois, mois)
+            except Exception as e:
+                print(f"Partition {table}_{mois:%Y_%m} non créée : {e}")
+            mois = _mois_suivant(mois)
+
+
+def supprimer_partitions_vides(bind, avant):
+    """PostgreSQL : supprime les partitions mensuelles vides entièrement antérieures à `avant`."""
+    if bind.dialect.name != "postgresql":
+        return []
+    supprimees = []
+    with bind.begin() as connexion:
+        for table in TABLES_PARTITIONNEES:
+            for nom, mois in partitions(connexion, table):
+                if datetime.combine(_mois_suivant(mois), datetime.min.time()) > avant:
+                    break
+                if connexion.execute(text(f"SELECT NOT EXISTS (SELECT 1 FROM {nom})")).scalar():
+                    connexion.execute(text(f"DROP TABLE {nom}"))
+                    supprimees.append(nom)
+    return supprimees
+
+
+# === Application ===
+def versions_appliquees(bind=engine):
+    with bind.begin() as connexion:
+        schema_version.create(connexion, checkfirst=True)
+        return set(connexion.execute(select(schema_version.c.version)).scalars())
+
+
+def upgrade(bind=engine):
+    """Applique les migrations en attente, dans l'ordre ; retourne les versions appliquées."""
+    postgres = bind.dialect.name == "postgresql"
+    appliquees = []
+    with bind.connect() as connexion:
+        if postgres:
+            connexion.execute(text("SELECT pg_advisory_lock(:cle)"), {"cle": VERROU_MIGRATIONS})
+            connexion.commit()
+        try:
+            with connexion.begin():
+                schema_version.create(connexion, checkfirst=True)
+                deja = set(connexion.execute(select(schema_version.c.version)).scalars())
+
+            for version, description, fonction in sorted(MIGRATIONS, key=lambda m: m[0]):
+                if version in deja:
+                    continue
+                print(f"Migration {version} : {description}")
+                with connexion.begin():
+                    fonction(connexion)
+                    connexion.execute(schema_version.insert().values(version=version, description=description))
+                appliquees.append(version)
+        finally:
+            if postgres:
+                connexion.execute(text("SELECT pg_advisory_unlock(:cle)"), {"cle": VERROU_MIGRATIONS})
+                connexion.commit()
+
+    maintenir_partitions(bind)
+    return appliquees
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("commande", nargs="?", choices=["status", "upgrade"], default="status")
+    args = parser.parse_args()
+
+    if args.commande == "upgrade":
+        appliquees = upgrade()
+        print(f"{len(appliquees)} migration(s) appliquée(s).")
+        return
+
+    deja = versions_appliquees()
+    for version, description, _ in sorted(MIGRATIONS, key=lambda m: m[0]):
+        print(f"{version:>3}  {'appliquée ' if version in deja else 'en attente'}  {description}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+import asyncio
+import os
+from datetime import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+from src.background import BatchWorker
+from src.cache import input_hash
+from src.feature_codec import FEATURE_SCHEMA, encode_features
+from src.metrics import AUDIT_FLUSH_DURATION, AUDIT_RECORDS, STAGE_DURATION
+from database.create_db import (
+    SessionLocal,
+    EmployeeInputDB,
+    PredictionResultDB,
+    FeatureDB,
+    RequestLogDB,
+    ApiResponseDB,
+)
+
+# Destination de l'audit : "db" (tables d'audit) ou "file" (journal JSON Lines, database/audit_file.py)
+AUDIT_SINK = os.getenv("AUDIT_SINK", "db").lower()
+# "sync" : les lignes d'audit sont écrites avant la réponse (audit strict)
+# "async" : la réponse part immédiatement, un thread écrit les lignes par lots
+PERSISTENCE_MODE = os.getenv("PERSISTENCE_MODE", "sync").lower()
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+AUDIT_FLUSH_INTERVAL_MS = int(os.getenv("AUDIT_FLUSH_INTERVAL_MS", "200"))
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+
+
+def build_audit_record(endpoint, employee_data, feature_vector, result, message, status_code=200,
+                       duration_ms=None):
+    """
+    Regroupe dans un dictionnaire simple tout ce qu'il faut journaliser pour une prédiction.
+    Aucun objet ORM n'est créé ici : la construction est faite au moment de l'écriture.
+    """
+    return {
+        "endpoint": endpoint,
+        "employee_data": employee_data,
+        "feature_vector": feature_vector,
+        "prediction": int(result["prediction"]),
+        "probability": float(result["probability"]),
+        "message": message,
+        "status_code": status_code,
+        "duration_ms": duration_ms,
+        "timestamp": datetime.utcnow(),
+    }
+
+
+def build_audit_records(endpoint, lignes, donnees_pret, results, duration_ms=None):
+    """
+    Enregistrements d'audit d'un lot scoré (features encodées en binaire).
+    `duration_ms` : temps de traitement de la requête avant journalisation.
+    """
+    features = encode_features(donnees_pret)
+    return [
+        build_audit_record(endpoint, ligne, feature, result, result["message"], duration_ms=duration_ms)
+        for ligne, feature, result in zip(lignes, features, results)
+    ]
+
+
+def _paquets(valeurs, taille=1000):
+    valeurs = list(valeurs)
+    for debut in range(0, len(valeurs), taille):
+        yield valeurs[debut:debut + taille]
+
+
+def lignes_existantes(db, empreintes):
+    """
+    Saisies déjà en base parmi `empreintes` (session ou connexion) : pour chacune,
+    {"employee": identifiant, "features": (vecteur, schéma)} avec les dernières features.
+    """
+    saisies = EmployeeInputDB.__table__
+    features = FeatureDB.__table__
+
+    connus = {}
+    par_id = {}
+    for paquet in _paquets(empreintes):
+        for identifiant, empreinte in db.execute(
+            select(saisies.c.id, saisies.c.input_hash).where(saisies.c.input_hash.in_(paquet))
+        ):
+            connus[empreinte] = par_id[identifiant] = {"employee": identifiant}
+
+    for paquet in _paquets(par_id):
+        dernieres = (
+            select(func.max(features.c.id))
+            .where(features.c.employee_input_id.in_(paquet))
+            .group_by(features.c.employee_input_id)
+        )
+        for ligne in db.execute(
+            select(features.c.employee_input_id, features.c.feature_vector, features.c.feature_schema)
+            .where(features.c.id.in_(dernieres))
+        ):
+            vecteur = bytes(ligne.feature_vector) if ligne.feature_vector is not None else None
+            par_id[ligne.employee_input_id]["features"] = (vecteur, ligne.feature_schema)
+    return connus
+
+
+def _lien(cible, relation, colonne):
+    # Ligne créée dans cette transaction : relation ORM ; ligne existante : clé étrangère
+    return {colonne: cible} if isinstance(cible, int) else {relation: cible}
+
+
+def audit_rows(record, connu=None):
+    """
+    Construit les lignes d'audit d'une prédiction.
+    Les lignes sont reliées par leurs relations : SQLAlchemy renseigne les clés
+    étrangères au flush, sans aller-retour intermédiaire vers la base.
+
+    `connu` (voir lignes_existantes) décrit la saisie si elle est déjà enregistrée :
+    la saisie est réutilisée, de même que ses features si elles n'ont pas changé.
+    Chaque prédiction écrit son résultat, sa requête et sa réponse : l'historique et
+    la synthèse quotidienne comptent toutes les prédictions, saisies répétées comprises.
+    Il est complété avec les lignes créées, pour les saisies répétées dans un même lot.
+
+    Toutes les lignes créées portent l'horodatage de la prédiction (record["timestamp"]),
+    y compris à l'import différé d'un journal d'audit (database/audit_file.py).
+    """
+    instant = record["timestamp"]
+    connu = {} if connu is None else connu
+    lignes = []
+    if "employee" not in connu:
+        connu["employee"] = EmployeeInputDB(
+            **record["employee_data"], input_hash=input_hash(record["employee_data"]), created_at=instant
+        )
+        lignes.append(connu["employee"])
+    employee = _lien(connu["employee"], "employee", "employee_input_id")
+
+    new_request = RequestLogDB(
+        endpoint=record["endpoint"],
+        user_id="florian_user",
+        timestamp=instant,
+        **employee
+    )
+    lignes.append(new_request)
+
+    features = (record["feature_vector"], record.get("feature_schema", FEATURE_SCHEMA))
+    if connu.get("features") != features:
+        lignes.append(FeatureDB(
+            feature_vector=record["feature_vector"],
+            feature_schema=features[1],
+            created_at=instant,
+            **employee
+        ))
+        connu["features"] = features
+
+    new_result = PredictionResultDB(
+        prediction=record["prediction"],
+        probability=record["probability"],
+        message=record["message"],
+        created_at=instant,
+        **employee
+    )
+    lignes.append(new_result)
+
+    lignes.append(ApiResponseDB(
+        request=new_request,
+        status_code=record["status_code"],
+        message=record["message"],
+        duration_ms=record.get("duration_ms"),
+        timestamp=instant,
+        prediction=new_result
+    ))
+    return lignes
+
+
+def add_records(db, records):
+    """Ajoute à la session les lignes d'audit de plusieurs prédictions (sans commit)."""
+    empreintes = [input_hash(record["employee_data"]) for record in records]
+    connus = lignes_existantes(db, set(empreintes))
+    for record, empreinte in zip(records, empreintes):
+        db.add_all(audit_rows(record, connus.setdefault(empreinte, {})))
+
+
+def save_records(db, records):
+    """
+    Écrit les lignes d'audit de plusieurs prédictions dans une seule transaction.
+    Si une saisie identique est insérée en même temps par une autre transaction
+    (index unique sur l'empreinte), la transaction est rejouée une fois et la réutilise.
+    """
+    try:
+        add_records(db, records)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        add_records(db, records)
+        db.commit()
+
+
+def persist_records(records, db):
+    """
+    Journalise des prédictions selon la destination et le mode configurés :
+    dépôt dans la file du journal sur fichiers (AUDIT_SINK=file), écriture immédiate
+    en une transaction sur la session de la requête ("sync") ou dépôt dans la file
+    d'écriture ("async") ; la session n'est utilisée qu'en "sync".
+    """
+    if AUDIT_SINK == "file":
+        from database.audit_file import audit_file_writer
+        audit_file_writer.start()
+        with STAGE_DURATION.time(stage="audit_enqueue"):
+            for record in records:
+                audit_file_writer.submit(record)
+        return
+
+    if PERSISTENCE_MODE == "async":
+        audit_writer.start()
+        with STAGE_DURATION.time(stage="audit_enqueue"):
+            for record in records:
+                audit_writer.submit(record)
+        return
+
+    try:
+        with STAGE_DURATION.time(stage="db_write"):
+            save_records(db, records)
+    except Exception:
+        db.rollback()
+        raise
+
+
+async def persist_records_async(records, db):
+    """
+    Équivalent de persist_records pour une session asyncio (DB_MODE=async).
+    La construction des objets ORM est réutilisée via run_sync ; seul le commit est attendu.
+    """
+    if AUDIT_SINK == "file":
+        from database.audit_file import audit_file_writer
+        audit_file_writer.start()
+        with STAGE_DURATION.time(stage="audit_enqueue"):
+            for record in records:
+                if not audit_file_writer.submit_nowait(record):
+                    await asyncio.to_thread(audit_file_writer.submit, record)
+        return
+
+    if PERSISTENCE_MODE == "async":
+        audit_writer.start()
+        with STAGE_DURATION.time(stage="audit_enqueue"):
+            for record in records:
+                if not audit_writer.submit_nowait(record):
+                    # File pleine : on attend hors de la boucle d'événements
+                    await asyncio.to_thread(audit_writer.submit, record)
+        return
+
+    try:
+        with STAGE_DURATION.time(stage="db_write"):
+            try:
+                await db.run_sync(add_records, records)
+                await db.commit()
+            except IntegrityError:
+                # Saisie identique insérée en parallèle : voir save_records
+                await db.rollback()
+                await db.run_sync(add_records, records)
+                await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+
+class AuditWriter(BatchWorker):
+    """
+    Écriture différée (write-behind) des lignes d'audit.
+    Les requêtes déposent leurs enregistrements dans une file bornée ;
+    un thread les regroupe (jusqu'à `batch_size` ou `flush_interval_ms`)
+    et les écrit en une seule transaction par lot.
+    """
+
+    nom = "audit-writer"
+
+    def __init__(self, session_factory=SessionLocal, batch_size=AUDIT_BATCH_SIZE,
+                 flush_interval_ms=AUDIT_FLUSH_INTERVAL_MS, max_queue=AUDIT_QUEUE_SIZE):
+        super().__init__(batch_size, flush_interval_ms, max_queue)
+        self.session_factory = session_factory
+        self.written = 0
+        self.failed = 0
+
+    def _traiter(self, batch):
+        db = self.session_factory()
+        try:
+            with AUDIT_FLUSH_DURATION.time():
+                save_records(db, batch)
+            self.written += len(batch)
+            AUDIT_RECORDS.inc(len(batch), status="written")
+        except Exception as e:
+            db.rollback()
+            self.failed += len(batch)
+            AUDIT_RECORDS.inc(len(batch), status="failed")
+            print(f"Écriture d'audit impossible ({len(batch)} enregistrements perdus) : {e}")
+        finally:
+            db.close()
+
+    def _abandonner(self, nombre):
+        AUDIT_RECORDS.inc(nombre, status="dropped")
+
+
+audit_writer = AuditWriter()
@@ -0,0 +1,138 @@
+"""
+Rétention des tables d'audit : les lignes plus anciennes que --jours sont archivées
+dans des fichiers Parquet compressés (zstd), puis supprimées de la base.
+
+Les tables sont parcourues des feuilles vers les parents (api_responses, features,
+prediction_results, requests, employee_inputs) ; une ligne encore référencée par une
+ligne conservée reste en base. Chaque paquet est écrit dans son propre fichier Parquet
+(dossier/<table>/<table>_<date>_<premier id>-<dernier id>.parquet), fermé et synchronisé
+sur disque avant que la suppression du paquet ne soit validée : une interruption
+(y compris SIGKILL) peut au pire archiver deux fois un même paquet, jamais en perdre.
+Sur PostgreSQL, les partitions mensuelles vidées sont ensuite supprimées.
+
+Usage : python -m database.retention --jours 365 [--dossier archives] [--paquet 10000] [--dry-run]
+"""
+import argparse
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import DateTime, Float, Integer, LargeBinary, delete, exists, select
+
+from database.create_db import Base, engine
+from database.migrations import maintenir_partitions, supprimer_partitions_vides
+
+COLONNES_DATE = ("created_at", "timestamp")
+
+
+def _schema_arrow(table):
+    import pyarrow as pa
+
+    champs = []
+    for colonne in table.columns:
+        if isinstance(colonne.type, Integer):
+            type_arrow = pa.int64()
+        elif isinstance(colonne.type, Float):
+            type_arrow = pa.float64()
+        elif isinstance(colonne.type, DateTime):
+            type_arrow = pa.timestamp("us")
+        elif isinstance(colonne.type, LargeBinary):
+            type_arrow = pa.binary()
+        else:
+            type_arrow = pa.string()
+        champs.append(pa.field(colonne.name, type_arrow))
+    return pa.schema(champs)
+
+
+def _references(table):
+    """Colonnes (d'autres tables) qui référencent la clé primaire de `table`."""
+    return [
+        cle.parent
+        for autre in Base.metadata.tables.values()
+        for cle in autre.foreign_keys
+        if cle.column.table is table
+    ]
+
+
+def archiver_table(bind, table, avant, dossier, paquet=10_000, dry_run=False):
+    """Archive puis supprime les lignes de `table` antérieures à `avant` ; retourne leur nombre."""
+    import pyarrow as pa
+
+    colonne_date = next(table.c[nom] for nom in COLONNES_DATE if nom in table.c)
+    condition = [colonne_date < avant] + [~exists().where(ref == table.c.id) for ref in _references(table)]
+
+    schema = _schema_arrow(table)
+    execution = datetime.utcnow()
+    dernier_id = 0
+    total = 0
+    while True:
+        with bind.begin() as connexion:
+            lignes = connexion.execute(
+                select(table).where(*condition, table.c.id > dernier_id).order_by(table.c.id).limit(paquet)
+            ).mappings().all()
+            if not lignes:
+                break
+            dernier_id = lignes[-1]["id"]
+            total += len(lignes)
+            if dry_run:
+                continue
+
+            nom_fichier = f"{table.name}_{execution:%Y%m%dT%H%M%S}_{lignes[0]['id']}-{dernier_id}.parquet"
+            _ecrire_paquet(
+                os.path.join(dossier, table.name, nom_fichier),
+                pa.Table.from_pylist([dict(ligne) for ligne in lignes], schema=schema),
+            )
+            # Le fichier est complet et sur disque : la suppression peut être validée
+            connexion.execute(delete(table).where(table.c.id.in_([ligne["id"] for ligne in lignes])))
+    return total
+
+
+def _ecrire_paquet(chemin, donnees):
+    """Écrit un paquet dans un fichier Parquet complet (pied de page compris), synchronisé sur disque."""
+    import pyarrow.parquet as pq
+
+    os.makedirs(os.path.dirname(chemin), exist_ok=True)
+    provisoire = chemin + ".tmp"
+    with open(provisoire, "wb") as f:
+        pq.write_table(donnees, f, compression="zstd")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(provisoire, chemin)
+    # Le renommage lui-même doit survivre à un arrêt brutal
+    descripteur = os.open(os.path.dirname(chemin), os.O_RDONLY)
+    try:
+        os.fsync(descripteur)
+    finally:
+        os.close(descripteur)
+
+
+def appliquer_retention(bind=engine, jours=365, dossier="archives", paquet=10_000, dry_run=False):
+    """Archive et supprime les lignes d'audit de plus de `jours` jours ; retourne le nombre par table."""
+    avant = datetime.utcnow() - timedelta(days=jours)
+    resultats = {}
+    for table in reversed(Base.metadata.sorted_tables):
+        if any(nom in table.c for nom in COLONNES_DATE):
+            resultats[table.name] = archiver_table(bind, table, avant, dossier, paquet, dry_run)
+
+    if not dry_run:
+        for partition in supprimer_partitions_vides(bind, avant):
+            print(f"Partition supprimée : {partition}")
+        maintenir_partitions(bind)
+    return resultats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jours", type=int, default=365, help="ancienneté au-delà de laquelle archiver")
+    parser.add_argument("--dossier", default="archives", help="dossier des fichiers Parquet")
+    parser.add_argument("--paquet", type=int, default=10_000, help="lignes archivées par transaction")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="compte les lignes sans rien modifier (les parents encore référencés sont exclus)")
+    args = parser.parse_args()
+
+    resultats = appliquer_retention(engine, args.jours, args.dossier, args.paquet, args.dry_run)
+    for table, nombre in resultats.items():
+        print(f"{table:<20} {nombre:>10} ligne(s) {'à archiver' if args.dry_run else 'archivée(s)'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import hashlib
+import multiprocessing
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+
+import joblib
+from src.backends import MODEL_BACKEND, load_backend
+from src.encoder import FeatureEncoder
+from src.preprocessing_schema import FICHIER_SCHEMA, charger_schema
+
+# Emplacement des artefacts (surchargeable pour tester un autre modèle)
+MODELS_DIR = os.getenv("MODELS_DIR", "models")
+# Fichiers d'un dossier d'artefacts (dans l'ordre de lecture)
+FICHIERS_ARTEFACTS = ["final_model.pkl", "standard_scaler.pkl", "threshold.txt", FICHIER_SCHEMA]
+
+
+@dataclass(frozen=True)
+class ModelBundle:
+    """
+    Ensemble immuable des artefacts nécessaires à la prédiction.
+    Une requête récupère le bundle une seule fois et l'utilise jusqu'au bout,
+    même si un rechargement a lieu entre-temps.
+    """
+    model: object
+    scaler: object
+    threshold: float
+    encoder: FeatureEncoder
+    backend: object  # moteur d'inférence (src/backends.py) construit à partir de `model`
+    version: str
+    loaded_at: datetime
+
+
+def load_bundle(models_dir: str = MODELS_DIR, backend: str = MODEL_BACKEND) -> ModelBundle:
+    """
+    Charge le modèle, le scaler, le seuil et le schéma de preprocessing depuis le disque,
+    puis le moteur d'inférence. La version est l'empreinte du contenu des quatre fichiers.
+    """
+    chemins = [os.path.join(models_dir, nom) for nom in FICHIERS_ARTEFACTS]
+    empreinte = hashlib.sha256()
+    for chemin in chemins:
+        with open(chemin, "rb") as f:
+            empreinte.update(f.read())
+
+    model = joblib.load(chemins[0])
+    scaler = joblib.load(chemins[1])
+    with open(chemins[2], "r") as f:
+        threshold = float(f.read())
+
+    return ModelBundle(
+        model=model,
+        scaler=scaler,
+        threshold=threshold,
+        encoder=FeatureEncoder(scaler, charger_schema(models_dir)),
+        backend=load_backend(model, models_dir, backend),
+        version=empreinte.hexdigest()[:12],
+        loaded_at=datetime.utcnow(),
+    )
+
+
+class GenerationPartagee:
+    """
+    Compteur de rechargements en mémoire partagée, créé avant le fork : avec le lanceur
+    multi-workers, tous les workers voient la même valeur. Le worker qui recharge l'incrémente ;
+    les autres constatent l'écart (a_suivre) et rechargent à leur tour.
+    """
+
+    def __init__(self):
+        self._valeur = multiprocessing.Value("Q", 0)
+        self.vue = 0
+
+    def annoncer(self):
+        with self._valeur.get_lock():
+            self._valeur.value += 1
+            self.vue = self._valeur.value
+
+    def a_suivre(self):
+        """Vrai (une seule fois) si un autre processus a rechargé depuis la dernière vérification."""
+        valeur = self._valeur.value
+        if valeur == self.vue:
+            return False
+        self.vue = valeur
+        return True
+
+
+_bundle = None
+_lock = threading.Lock()
+# Rechargements des artefacts, partagés entre les workers du lanceur
+generation = GenerationPartagee()
+# Bundle ayant déjà servi une prédiction factice (modèle prêt à répondre sans latence de première requête)
+_warm = None
+_warm_lock = threading.Lock()
+
+
+def get_bundle() -> ModelBundle:
+    """Retourne le bundle courant (chargé au premier appel uniquement)."""
+    global _bundle
+    if _bundle is None:
+        with _lock:
+            if _bundle is None:
+                _bundle = load_bundle()
+    return _bundle
+
+
+def is_loaded() -> bool:
+    """Indique si le bundle a déjà été chargé (sans déclencher le chargement)."""
+    return _bundle is not None
+
+
+def warm_up(bundle: ModelBundle = None) -> ModelBundle:
+    """
+    Charge le bundle si besoin et lui fait calculer une prédiction factice :
+    imports paresseux, initialisation de CatBoost et du pipeline sont payés
+    au démarrage plutôt que par la première requête.
+    """
+    global _warm
+    bundle = bundle or get_bundle()
+    with _warm_lock:
+        if _warm is not bundle:
+            import numpy as np
+            from src.feature_codec import feature_columns
+            from src.prediction import predict_batch
+
+            predict_batch(np.zeros((1, len(feature_columns()))), bundle)
+            _warm = bundle
+    return bundle
+
+
+def is_warm() -> bool:
+    """Indique si le bundle courant a été échauffé."""
+    return _bundle is not None and _warm is _bundle
+
+
+def reload_bundle(models_dir: str = MODELS_DIR, annoncer: bool = True) -> ModelBundle:
+    """
+    Recharge les artefacts, les échauffe, puis remplace le bundle courant en une seule affectation.
+    Les requêtes en cours terminent avec l'ancien bundle ; si le chargement échoue,
+    le bundle courant reste en place. Avec `annoncer`, le rechargement est signalé
+    aux autres workers (generation), qui le reproduisent.
+    """
+    global _bundle
+    with _lock:
+        nouveau = warm_up(load_bundle(models_dir))
+        _bundle = nouveau
+        if annoncer:
+            generation.annoncer()
+    return nouveau
@@ -0,0 +1,141 @@
+"""
+Moteurs d'inférence du modèle, choisis par MODEL_BACKEND.
+
+- "sklearn" (défaut) : pipeline d'origine (ColumnTransformer + CatBoost) sur un DataFrame ;
+- "native" : CatBoost appelé directement sur la matrice de features, le StandardScaler
+  du pipeline étant fusionné dans les seuils des arbres (aucun DataFrame, aucun scaling) ;
+- "onnx" : le même modèle fusionné, exporté par `python -m src.export_model`,
+  exécuté par onnxruntime (dépendance optionnelle).
+
+Chaque moteur reçoit les features préparées (DataFrame ou matrice dans l'ordre de
+feature_columns()) et retourne la probabilité de départ de chaque ligne.
+"""
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+from src.feature_codec import feature_columns
+
+MODEL_BACKEND = os.getenv("MODEL_BACKEND", "sklearn")
+BACKENDS = ("sklearn", "native", "onnx")
+
+FICHIER_ONNX = "final_model.onnx"
+# Empreinte du final_model.pkl dont l'export ONNX est issu (détection d'un export périmé)
+FICHIER_EXPORT = "final_model.onnx.json"
+
+
+def _matrice(donnees_pret):
+    if isinstance(donnees_pret, pd.DataFrame):
+        return donnees_pret[feature_columns()].to_numpy(dtype=np.float64)
+    return donnees_pret
+
+
+def empreinte_fichier(chemin):
+    with open(chemin, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def fusionner_standardisation(pipeline):
+    """
+    Retourne un CatBoostClassifier équivalent au pipeline, qui accepte directement
+    les features préparées : le StandardScaler du pipeline est reporté dans les seuils
+    des arbres (x_scalé > s  <=>  x > s * écart-type + moyenne).
+    """
+    from catboost import CatBoostClassifier
+
+    # Disposition attendue : StandardScaler ("num") puis passthrough ("cat"), dans l'ordre de feature_columns()
+    transformations = [t for t in pipeline.named_steps["preprocessor"].transformers_ if t[0] != "remainder"]
+    if ([t[0] for t in transformations] != ["num", "cat"]
+            or list(transformations[0][2]) + list(transformations[1][2]) != feature_columns()):
+        raise ValueError("Pipeline non pris en charge : colonnes différentes de feature_columns()")
+    scaler = transformations[0][1]
+
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, "modele.json")
+        pipeline.named_steps["model"].save_model(chemin, format="json")
+        with open(chemin) as f:
+            description = json.load(f)
+        for feature in description["features_info"]["float_features"]:
+            i = feature["flat_feature_index"]
+            if i < len(scaler.mean_):
+                feature["borders"] = [
+                    float(np.float32(seuil * scaler.scale_[i] + scaler.mean_[i]))
+                    for seuil in feature["borders"]
+                ]
+        with open(chemin, "w") as f:
+            json.dump(description, f)
+
+        modele = CatBoostClassifier()
+        modele.load_model(chemin, format="json")
+    return modele
+
+
+class SklearnBackend:
+    """Pipeline scikit-learn d'origine, appelé sur un DataFrame."""
+
+    name = "sklearn"
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+
+    def predict_proba(self, donnees_pret):
+        if isinstance(donnees_pret, np.ndarray):
+            donnees_pret = pd.DataFrame(donnees_pret, columns=feature_columns())
+        return self.pipeline.predict_proba(donnees_pret)[:, 1]
+
+
+class NativeBackend:
+    """CatBoost fusionné avec le StandardScaler du pipeline, appelé sur la matrice NumPy."""
+
+    name = "native"
+
+    def __init__(self, pipeline):
+        self.model = fusionner_standardisation(pipeline)
+
+    def predict_proba(self, donnees_pret):
+        return self.model.predict(_matrice(donnees_pret), prediction_type="Probability")[:, 1]
+
+
+class OnnxBackend:
+    """Modèle fusionné exporté en ONNX, exécuté par onnxruntime (entrées en float32)."""
+
+    name = "onnx"
+
+    def __init__(self, models_dir):
+        try:
+            import onnxruntime
+        except ImportError:
+            raise RuntimeError("MODEL_BACKEND=onnx nécessite onnxruntime (pip install onnxruntime)")
+
+        chemin = os.path.join(models_dir, FICHIER_ONNX)
+        export = os.path.join(models_dir, FICHIER_EXPORT)
+        if not os.path.exists(chemin) or not os.path.exists(export):
+            raise RuntimeError(f"{chemin} absent : lancer python -m src.export_model")
+        with open(export) as f:
+            source = json.load(f)["source_sha256"]
+        if source != empreinte_fichier(os.path.join(models_dir, "final_model.pkl")):
+            raise RuntimeError(f"{chemin} ne correspond plus à final_model.pkl : relancer python -m src.export_model")
+
+        self.session = onnxruntime.InferenceSession(chemin, providers=["CPUExecutionProvider"])
+
+    def predict_proba(self, donnees_pret):
+        matrice = np.ascontiguousarray(_matrice(donnees_pret), dtype=np.float32)
+        probabilites = self.session.run(["probabilities"], {"features": matrice})[0]
+        # Sortie ZipMap de CatBoost : une table {classe: probabilité} par ligne
+        if isinstance(probabilites, list):
+            return np.array([ligne[1] for ligne in probabilites], dtype=np.float64)
+        return np.asarray(probabilites, dtype=np.float64)[:, 1]
+
+
+def load_backend(pipeline, models_dir, name=MODEL_BACKEND):
+    """Construit le moteur d'inférence `name` pour le pipeline chargé depuis `models_dir`."""
+    if name == "sklearn":
+        return SklearnBackend(pipeline)
+    if name == "native":
+        return NativeBackend(pipeline)
+    if name == "onnx":
+        return OnnxBackend(models_dir)
+    raise ValueError(f"MODEL_BACKEND inconnu : {name} (attendu : {', '.join(BACKENDS)})")
@@ -0,0 +1,99 @@
+"""
+Traitement par lots en arrière-plan, hors du chemin critique des requêtes.
+
+Les requêtes déposent leurs éléments dans une file bornée ; un thread les regroupe
+(jusqu'à `batch_size` éléments ou `flush_interval_ms` après le premier) et traite
+chaque lot en un appel. À l'arrêt, la file est vidée avant la fin du thread.
+Utilisé par l'audit différé en base (database/persistence.py), le journal d'audit
+sur fichiers (database/audit_file.py) et l'évaluation du modèle candidat (src/shadow.py).
+"""
+import queue
+import threading
+import time
+
+
+class BatchWorker:
+    """
+    Base des écritures différées : file bornée, thread de regroupement et arrêt propre.
+    Les sous-classes implémentent `_traiter(batch)` et, au besoin, `_inactif()`
+    (aucun élément pendant `flush_interval_ms`), `_terminer()` (fin du thread) et
+    `_abandonner(nombre)` (éléments encore en file quand stop() expire).
+    """
+
+    # Nom du thread
+    nom = "batch-worker"
+
+    def __init__(self, batch_size, flush_interval_ms, max_queue):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=self.nom, daemon=True)
+            self._thread.start()
+
+    def submit(self, element):
+        """Dépose un élément ; bloque si la file est pleine (contre-pression)."""
+        self._queue.put(element)
+
+    def submit_nowait(self, element):
+        """Dépose un élément sans attendre ; retourne False si la file est pleine."""
+        try:
+            self._queue.put_nowait(element)
+            return True
+        except queue.Full:
+            return False
+
+    def stop(self, timeout=10):
+        """
+        Traite les éléments en attente puis arrête le thread. Si la file n'est pas vidée
+        en `timeout` secondes, les éléments restants sont signalés et comptés comme abandonnés.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                restants = self._queue.qsize()
+                print(f"Arrêt de {self.nom} après {timeout} s : {restants} élément(s) en file abandonné(s)")
+                self._abandonner(restants)
+
+    def _next_batch(self):
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if batch:
+                self._traiter(batch)
+            else:
+                self._inactif()
+        self._terminer()
+
+    def _traiter(self, batch):
+        raise NotImplementedError
+
+    def _inactif(self):
+        pass
+
+    def _terminer(self):
+        pass
+
+    def _abandonner(self, nombre):
+        pass
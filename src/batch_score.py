@@ -0,0 +1,270 @@
+"""
+Scoring de masse hors ligne d'un extrait RH (CSV ou Parquet).
+
+Le fichier est lu par morceaux ; chaque morceau est vérifié contre les vocabulaires
+du schéma de preprocessing, puis passe par data_engineering, data_scaling et le modèle
+dans un pool de processus. Le nombre de morceaux en cours est borné, ce qui borne
+la mémoire quelle que soit la taille du fichier.
+La sortie reprend les colonnes d'entrée et ajoute `prediction` et `probability`.
+
+Avec --explain, les contributions des features (src/explanation.py) sont calculées dans
+les mêmes processus, un appel par morceau ; la sortie reçoit la colonne `top_contributions`
+(JSON des EXPLANATION_TOP_K plus fortes) et, avec --load-db, toutes les contributions sont
+enregistrées dans prediction_explanations, où /predict/explain les relit sans les recalculer.
+
+Usage :
+    python -m src.batch_score entree.parquet sortie.parquet [--chunksize 50000] [--workers 4] [--load-db] [--explain]
+"""
+import argparse
+import io
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.artifacts import get_bundle
+from src.preprocessing import data_engineering
+from src.scaling import data_scaling
+from src.prediction import predict_arrays
+from src.preprocessing_schema import verifier_categories
+from src.service import message_prediction
+
+# Colonnes d'une saisie (identiques à EmployeeInput et à la table employee_inputs)
+COLONNES_SAISIE = [
+    'age', 'genre', 'revenu_mensuel', 'statut_marital', 'departement', 'poste',
+    'niveau_hierarchique_poste', 'nombre_experiences_precedentes', 'annee_experience_totale',
+    'annees_dans_l_entreprise', 'annees_dans_le_poste_actuel', 'satisfaction_employee_environnement',
+    'note_evaluation_precedente', 'satisfaction_employee_nature_travail', 'satisfaction_employee_equipe',
+    'satisfaction_employee_equilibre_pro_perso', 'note_evaluation_actuelle', 'heure_supplementaires',
+    'augmentation_salaire_precedente_pourcent', 'nombre_participation_pee', 'nb_formations_suivies',
+    'distance_domicile_travail', 'niveau_education', 'domaine_etude', 'frequence_deplacement',
+    'annees_depuis_la_derniere_promotion', 'annes_sous_responsable_actuel',
+]
+
+
+def format_fichier(chemin):
+    extension = os.path.splitext(chemin)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".parquet", ".pq"):
+        return "parquet"
+    raise ValueError(f"Format non pris en charge : {chemin} (attendu .csv ou .parquet)")
+
+
+def lire_morceaux(chemin, chunksize):
+    """Itère sur le fichier d'entrée par morceaux de `chunksize` lignes."""
+    if format_fichier(chemin) == "csv":
+        yield from pd.read_csv(chemin, chunksize=chunksize)
+        return
+
+    import pyarrow.parquet as pq
+    for batch in pq.ParquetFile(chemin).iter_batches(batch_size=chunksize):
+        yield batch.to_pandas()
+
+
+class Ecrivain:
+    """Écrit les morceaux scorés dans l'ordre, en CSV ou en Parquet, sans tout garder en mémoire."""
+
+    def __init__(self, chemin):
+        self.chemin = chemin
+        self.format = format_fichier(chemin)
+        self._parquet = None
+        self._premier = True
+
+    def ecrire(self, morceau):
+        if self.format == "csv":
+            morceau.to_csv(self.chemin, mode="w" if self._premier else "a", header=self._premier, index=False)
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(morceau, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.chemin, table.schema)
+            self._parquet.write_table(table)
+        self._premier = False
+
+    def fermer(self):
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+def _initialiser_worker():
+    # Chargement unique des artefacts dans chaque processus du pool
+    get_bundle()
+
+
+def scorer_morceau(morceau: pd.DataFrame, expliquer=False):
+    """
+    Applique le pipeline pandas et le modèle à un morceau ; ajoute prediction et probability.
+    Retourne le morceau scoré et, avec `expliquer`, (version des artefacts, contributions)
+    après avoir ajouté la colonne top_contributions (None sinon).
+    """
+    bundle = get_bundle()
+    verifier_categories(morceau, bundle.encoder.schema)
+    donnees_pret = data_scaling(data_engineering(morceau[COLONNES_SAISIE].copy()), bundle.scaler)
+    predictions, probas = predict_arrays(donnees_pret, bundle)
+    morceau = morceau.copy()
+    morceau["prediction"] = predictions
+    morceau["probability"] = np.round(probas, 4)
+    if not expliquer:
+        return morceau, None
+
+    from src.explanation import EXPLANATION_TOP_K, contributions
+
+    valeurs = contributions(donnees_pret, bundle)
+    colonnes = bundle.encoder.colonnes
+    ordre = np.argsort(-np.abs(valeurs[:, :-1]), axis=1, kind="stable")[:, :EXPLANATION_TOP_K]
+    morceau["top_contributions"] = [
+        json.dumps({colonnes[i]: round(float(ligne[i]), 4) for i in indices}, ensure_ascii=False)
+        for ligne, indices in zip(valeurs, ordre)
+    ]
+    return morceau, (bundle.version, valeurs)
+
+
+def _saisies_typees(morceau):
+    """Saisies aux types de employee_inputs (comme après validation Pydantic) : même empreinte que l'API."""
+    from database.create_db import EmployeeInputDB
+
+    types = {colonne: EmployeeInputDB.__table__.c[colonne].type.python_type for colonne in COLONNES_SAISIE}
+    return [
+        {colonne: None if pd.isna(valeur) else types[colonne](valeur) for colonne, valeur in ligne.items()}
+        for ligne in morceau[COLONNES_SAISIE].to_dict(orient="records")
+    ]
+
+
+def charger_en_base(engine, morceau, explications=None):
+    """
+    Insère un morceau scoré dans employee_inputs et prediction_results en masse :
+    COPY sur PostgreSQL, INSERT multi-lignes (executemany) sur les autres bases.
+    Une saisie déjà en base (même empreinte) est réutilisée ; chaque ligne scorée
+    ajoute son résultat (un nouveau passage apparaît dans l'historique).
+    Les contributions éventuelles (version, matrice) vont dans prediction_explanations,
+    une seule fois par saisie et par version.
+    """
+    from sqlalchemy import insert, text
+    from database.create_db import EmployeeInputDB, PredictionResultDB
+    from database.persistence import lignes_existantes
+    from src.cache import input_hash
+
+    saisies = _saisies_typees(morceau)
+    empreintes = [input_hash(saisie) for saisie in saisies]
+    messages = [message_prediction(p) for p in morceau["prediction"]]
+
+    with engine.begin() as connexion:
+        connus = lignes_existantes(connexion, set(empreintes))
+        nouvelles = {}
+        for saisie, empreinte in zip(saisies, empreintes):
+            if empreinte not in connus and empreinte not in nouvelles:
+                nouvelles[empreinte] = dict(saisie, input_hash=empreinte)
+
+        if nouvelles:
+            nouvelles_saisies = pd.DataFrame(list(nouvelles.values()))
+            if engine.dialect.name == "postgresql":
+                # Identifiants réservés d'avance dans la séquence, puis COPY
+                ids = connexion.execute(
+                    text("SELECT nextval(pg_get_serial_sequence('employee_inputs', 'id')) "
+                         "FROM generate_series(1, :n)"),
+                    {"n": len(nouvelles_saisies)},
+                ).scalars().all()
+                _copy(connexion.connection.cursor(), "employee_inputs", nouvelles_saisies.assign(id=ids))
+            else:
+                table = EmployeeInputDB.__table__
+                ids = connexion.execute(
+                    insert(table).returning(table.c.id, sort_by_parameter_order=True),
+                    nouvelles_saisies.to_dict(orient="records"),
+                ).scalars().all()
+            for empreinte, identifiant in zip(nouvelles, ids):
+                connus[empreinte] = {"employee": identifiant}
+
+        resultats = [
+            {
+                "prediction": int(prediction),
+                "probability": float(probabilite),
+                "message": message,
+                "employee_input_id": connus[empreinte]["employee"],
+            }
+            for empreinte, prediction, probabilite, message in zip(
+                empreintes, morceau["prediction"], morceau["probability"], messages
+            )
+        ]
+
+        if resultats:
+            if engine.dialect.name == "postgresql":
+                _copy(connexion.connection.cursor(), "prediction_results", pd.DataFrame(resultats))
+            else:
+                connexion.execute(insert(PredictionResultDB.__table__), resultats)
+
+        if explications is not None:
+            from src.explanation import enregistrer_explications
+
+            version, valeurs = explications
+            enregistrer_explications(connexion, version, dict(zip(empreintes, valeurs)))
+
+
+def _copy(curseur, table, donnees):
+    tampon = io.StringIO()
+    donnees.to_csv(tampon, index=False, header=False)
+    tampon.seek(0)
+    colonnes = ", ".join(donnees.columns)
+    curseur.copy_expert(f"COPY {table} ({colonnes}) FROM STDIN WITH (FORMAT csv)", tampon)
+
+
+def scorer_fichier(entree, sortie, chunksize=50_000, workers=None, load_db=False, explain=False):
+    """Score `entree` dans `sortie` ; retourne le nombre de lignes traitées."""
+    workers = workers or os.cpu_count() or 1
+    engine = None
+    if load_db:
+        from database.create_db import engine, init_db
+        init_db()
+
+    ecrivain = Ecrivain(sortie)
+    en_cours = deque()
+    total = 0
+
+    def terminer_le_plus_ancien():
+        nonlocal total
+        morceau, explications = en_cours.popleft().result()
+        ecrivain.ecrire(morceau)
+        if engine is not None:
+            charger_en_base(engine, morceau, explications)
+        total += len(morceau)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_initialiser_worker) as pool:
+            for morceau in lire_morceaux(entree, chunksize):
+                # Au plus deux morceaux en attente par processus : mémoire bornée
+                if len(en_cours) >= 2 * workers:
+                    terminer_le_plus_ancien()
+                en_cours.append(pool.submit(scorer_morceau, morceau, explain))
+            while en_cours:
+                terminer_le_plus_ancien()
+    finally:
+        ecrivain.fermer()
+
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("entree", help="fichier d'entrée (.csv ou .parquet)")
+    parser.add_argument("sortie", help="fichier de sortie (.csv ou .parquet)")
+    parser.add_argument("--chunksize", type=int, default=50_000, help="lignes par morceau")
+    parser.add_argument("--workers", type=int, default=None, help="processus de scoring (défaut : nombre de CPU)")
+    parser.add_argument("--load-db", action="store_true",
+                        help="charge aussi les résultats dans employee_inputs / prediction_results")
+    parser.add_argument("--explain", action="store_true",
+                        help="calcule aussi les contributions des features (colonne top_contributions)")
+    args = parser.parse_args()
+
+    debut = time.perf_counter()
+    total = scorer_fichier(args.entree, args.sortie, args.chunksize, args.workers, args.load_db, args.explain)
+    duree = time.perf_counter() - debut
+    print(f"{total} lignes scorées en {duree:.1f} s ({total / max(duree, 1e-9):.0f} lignes/s) -> {args.sortie}")
+
+
+if __name__ == "__main__":
+    main()
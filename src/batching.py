@@ -0,0 +1,139 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+from src.prediction import predict_batch
+from src.metrics import Histogram
+
+# Regroupement des appels concurrents au modèle (désactivé par défaut)
+MICROBATCH_ENABLED = os.getenv("MICROBATCH_ENABLED", "false").lower() in ("1", "true", "yes")
+MICROBATCH_MAX_WAIT_MS = float(os.getenv("MICROBATCH_MAX_WAIT_MS", "2"))
+MICROBATCH_MAX_ROWS = int(os.getenv("MICROBATCH_MAX_ROWS", "64"))
+
+# Bornes supérieures de l'histogramme des tailles de lot
+TAILLES_LOT = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+BATCH_ROWS = Histogram(
+    "microbatch_batch_rows", "Nombre de lignes par appel regroupé au modèle.", buckets=TAILLES_LOT
+)
+
+
+class MicroBatcher:
+    """
+    Regroupe les appels concurrents au modèle en un seul predict_proba.
+
+    Chaque requête dépose sa matrice de features et attend un Future ;
+    un thread collecte les dépôts pendant au plus `max_wait_ms` (à partir du premier)
+    ou jusqu'à `max_rows` lignes, empile les matrices, appelle le modèle une fois
+    puis redistribue les résultats à chaque requête.
+    """
+
+    def __init__(self, max_wait_ms=MICROBATCH_MAX_WAIT_MS, max_rows=MICROBATCH_MAX_ROWS,
+                 enabled=MICROBATCH_ENABLED):
+        self.enabled = enabled
+        self.max_wait = max_wait_ms / 1000
+        self.max_rows = max_rows
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.batches = 0
+        self.rows = 0
+        self.requests = 0
+        self.max_batch_rows = 0
+        self.histogram = {borne: 0 for borne in TAILLES_LOT}
+        self.histogram["+Inf"] = 0
+
+    def predict(self, donnees_pret, bundle):
+        """Soumet une matrice de features et attend ses résultats (une entrée par ligne)."""
+        return self.submit(donnees_pret, bundle).result()
+
+    def submit(self, donnees_pret, bundle):
+        self._start()
+        future = Future()
+        self._queue.put((donnees_pret, bundle, future))
+        return future
+
+    def _start(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+                    self._thread.start()
+
+    def _collect(self):
+        premier = self._queue.get()
+        lot = [premier]
+        lignes = len(premier[0])
+        deadline = time.monotonic() + self.max_wait
+        while lignes < self.max_rows:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                depot = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            lot.append(depot)
+            lignes += len(depot[0])
+        return lot
+
+    def _run(self):
+        while True:
+            lot = self._collect()
+            # Un rechargement peut intervenir pendant la collecte : un appel par bundle
+            par_bundle = {}
+            for depot in lot:
+                par_bundle.setdefault(id(depot[1]), []).append(depot)
+            for depots in par_bundle.values():
+                self._score(depots)
+
+    def _score(self, depots):
+        bundle = depots[0][1]
+        try:
+            results = predict_batch(np.vstack([depot[0] for depot in depots]), bundle)
+        except Exception as e:
+            for _, _, future in depots:
+                future.set_exception(e)
+            return
+
+        self._record(len(depots), len(results))
+        debut = 0
+        for donnees_pret, _, future in depots:
+            fin = debut + len(donnees_pret)
+            future.set_result(results[debut:fin])
+            debut = fin
+
+    def _record(self, requetes, lignes):
+        BATCH_ROWS.observe(lignes)
+        with self._lock:
+            self.batches += 1
+            self.requests += requetes
+            self.rows += lignes
+            self.max_batch_rows = max(self.max_batch_rows, lignes)
+            for borne in TAILLES_LOT:
+                if lignes <= borne:
+                    self.histogram[borne] += 1
+                    break
+            else:
+                self.histogram["+Inf"] += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "max_wait_ms": self.max_wait * 1000,
+                "max_rows": self.max_rows,
+                "batches": self.batches,
+                "requests": self.requests,
+                "rows": self.rows,
+                "avg_batch_rows": round(self.rows / self.batches, 2) if self.batches else 0.0,
+                "avg_requests_per_batch": round(self.requests / self.batches, 2) if self.batches else 0.0,
+                "max_batch_rows": self.max_batch_rows,
+                "batch_rows_histogram": {str(borne): n for borne, n in self.histogram.items()},
+            }
+
+
+micro_batcher = MicroBatcher()
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Nombre maximal d'entrées (0 = cache désactivé) et durée de vie en secondes
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "3600"))
+
+
+def input_hash(ligne: dict) -> str:
+    """
+    Empreinte stable d'une saisie validée : JSON canonique (clés triées)
+    haché en BLAKE2b. Pydantic ayant déjà converti les types, 3 et 3.0
+    ne peuvent pas produire deux empreintes différentes pour un même champ.
+    """
+    canonique = json.dumps(ligne, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(canonique.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class PredictionCache:
+    """
+    Cache LRU à durée de vie des prédictions, indexé par l'empreinte de la saisie.
+    Une entrée contient le vecteur de features et le résultat, ce qui permet de sauter
+    encodage, scaling et modèle tout en conservant la journalisation des features.
+    Le cache est vidé dès que la version des artefacts change.
+    """
+
+    def __init__(self, max_size=PREDICTION_CACHE_SIZE, ttl=PREDICTION_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    def _check_version(self, version):
+        # Appelé sous verrou : invalide tout si les artefacts ont changé
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key, version):
+        """Retourne (features, résultat) ou None."""
+        with self._lock:
+            self._check_version(version)
+            entree = self._entries.get(key)
+            if entree is None:
+                self.misses += 1
+                return None
+            expire_at, valeur = entree
+            if expire_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return valeur
+
+    def put(self, key, version, valeur):
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = (time.monotonic() + self.ttl, valeur)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_s": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "version": self._version,
+            }
+
+
+prediction_cache = PredictionCache()
@@ -0,0 +1,115 @@
+import numpy as np
+
+from src.preprocessing_schema import CategorieInconnue
+
+# Variables numériques saisies, reprises telles quelles avant scaling
+COLONNES_DIRECTES = [
+    'revenu_mensuel', 'annees_dans_l_entreprise', 'satisfaction_employee_environnement',
+    'note_evaluation_precedente', 'satisfaction_employee_nature_travail', 'satisfaction_employee_equipe',
+    'satisfaction_employee_equilibre_pro_perso', 'note_evaluation_actuelle',
+    'augmentation_salaire_precedente_pourcent', 'distance_domicile_travail', 'niveau_education',
+    'annees_depuis_la_derniere_promotion',
+]
+
+# Saisies numériques nécessaires au calcul des variables dérivées
+COLONNES_CALCUL = [
+    'annee_experience_totale', 'nb_formations_suivies', 'nombre_participation_pee', 'age',
+]
+
+
+def _codes(lignes, variable, table):
+    """Code de chaque ligne pour `variable` ; CategorieInconnue à la première valeur hors de `table`."""
+    try:
+        return [table[ligne[variable]] for ligne in lignes]
+    except KeyError:
+        for position, ligne in enumerate(lignes):
+            if ligne[variable] not in table:
+                raise CategorieInconnue(variable, ligne[variable], table, position) from None
+        raise
+
+
+class FeatureEncoder:
+    """
+    Version NumPy de data_engineering + data_scaling pour l'inférence en ligne.
+
+    Les saisies sont écrites directement dans une matrice float64 préallouée,
+    dans l'ordre des colonnes du schéma de preprocessing (src/preprocessing_schema.py),
+    à l'aide de tables de correspondance précalculées à partir de ses vocabulaires ;
+    le scaler est appliqué en une seule opération vectorisée.
+    Le résultat est identique bit à bit à celui du pipeline pandas.
+    """
+
+    def __init__(self, scaler, schema):
+        self.schema = schema
+        self.colonnes = list(schema["colonnes"])
+        features_a_scaler = schema["colonnes_scalees"]
+        index = {colonne: i for i, colonne in enumerate(self.colonnes)}
+        self.nb_scalees = len(features_a_scaler)
+
+        # Paramètres du scaler, réordonnés sur features_a_scaler
+        noms_scaler = list(getattr(scaler, "feature_names_in_", features_a_scaler))
+        ordre = [noms_scaler.index(colonne) for colonne in features_a_scaler]
+        self.mean = np.asarray(scaler.mean_, dtype=np.float64)[ordre]
+        self.scale = np.asarray(scaler.scale_, dtype=np.float64)[ordre]
+
+        self.index_directes = [index[colonne] for colonne in COLONNES_DIRECTES]
+        self.index = index
+
+        self.ordinales = schema["ordinales"]
+        self.bornes_age = np.array(schema["tranches_age"]["bornes"], dtype=np.float64)
+        # Table valeur -> colonne du one-hot, par variable catégorielle
+        self.one_hot = {
+            variable: {valeur: index[f"{variable}_{valeur}"] for valeur in valeurs}
+            for variable, valeurs in schema["one_hot"].items()
+        }
+
+    def encode(self, lignes):
+        """
+        Encode une liste de saisies (dictionnaires ou modèles Pydantic)
+        en une matrice (n_lignes, n_features) prête pour le modèle.
+        """
+        lignes = [ligne if isinstance(ligne, dict) else ligne.dict() for ligne in lignes]
+        n = len(lignes)
+        index = self.index
+        sortie = np.zeros((n, len(self.colonnes)), dtype=np.float64)
+
+        directes = np.array([[ligne[c] for c in COLONNES_DIRECTES] for ligne in lignes], dtype=np.float64)
+        calcul = np.array([[ligne[c] for c in COLONNES_CALCUL] for ligne in lignes], dtype=np.float64)
+        directes = directes.reshape(n, len(COLONNES_DIRECTES))
+        calcul = calcul.reshape(n, len(COLONNES_CALCUL))
+        experience_totale, nb_formations, participation_pee, age = calcul.T
+        anciennete = directes[:, 1]
+
+        sortie[:, self.index_directes] = directes
+
+        # Variables dérivées (mêmes opérations, dans le même ordre, que data_engineering)
+        sortie[:, index['experience_externe']] = experience_totale - anciennete
+        sortie[:, index['score_satisfaction']] = (
+            directes[:, 2] + directes[:, 4] + directes[:, 5] + directes[:, 6]
+        ) / 4
+        sortie[:, index['augmentation_par_formation']] = (directes[:, 8] * 100) / (nb_formations + 1)
+        sortie[:, index['pee_par_anciennete']] = participation_pee / (anciennete + 1)
+
+        # Scaling vectorisé des colonnes numériques
+        bloc = sortie[:, :self.nb_scalees]
+        bloc -= self.mean
+        bloc /= self.scale
+
+        # Variables encodées (CategorieInconnue pour une valeur hors vocabulaire)
+        for variable, table in self.ordinales.items():
+            sortie[:, index[variable]] = _codes(lignes, variable, table)
+        sortie[:, index['a_suivi_formation']] = nb_formations >= 1
+        sortie[:, index['promotion_recente']] = directes[:, 11] <= 2
+
+        # Tranche d'âge : intervalles fermés à droite, -1 hors bornes (comme pd.cut + codes)
+        bornes = self.bornes_age
+        tranche = np.searchsorted(bornes, age, side="left") - 1
+        hors_bornes = (age <= bornes[0]) | (age > bornes[-1]) | np.isnan(age)
+        sortie[:, index['tranche_age']] = np.where(hors_bornes, -1, tranche)
+
+        # One-hot : une seule écriture par variable via les tables d'index
+        lignes_index = np.arange(n)
+        for variable, table in self.one_hot.items():
+            sortie[lignes_index, _codes(lignes, variable, table)] = 1
+
+        return sortie
@@ -0,0 +1,17 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Nombre de threads réservés au scoring (CPU) en mode asyncio
+SCORING_WORKERS = int(os.getenv("SCORING_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_executor = ThreadPoolExecutor(max_workers=SCORING_WORKERS, thread_name_prefix="scoring")
+
+
+async def run_scoring(fonction, *args):
+    """
+    Exécute une fonction de scoring dans l'exécuteur borné,
+    sans bloquer la boucle d'événements.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, fonction, *args)
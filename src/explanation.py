@@ -0,0 +1,157 @@
+"""
+Explication des prédictions : contribution de chaque feature au score (valeurs SHAP).
+
+Les contributions sont calculées par CatBoost lui-même (ShapValues, algorithme exact
+sur les arbres), en un seul appel pour tout un lot, sur le modèle dont le StandardScaler
+du pipeline est fusionné dans les seuils (src/backends.py) : il accepte directement les
+features préparées et donne les mêmes valeurs que le pipeline d'origine.
+Une contribution est exprimée en log-odds ; leur somme plus la valeur de base donne
+le logit de la probabilité.
+
+Les contributions d'une saisie ne dépendent que de la saisie et des artefacts : elles sont
+conservées par empreinte et version, en mémoire (cache LRU, comme les prédictions) et dans
+la table prediction_explanations, que le scoring de masse remplit d'avance
+(python -m src.batch_score ... --load-db --explain). Seules les saisies jamais expliquées
+passent par le calcul.
+"""
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from src.backends import fusionner_standardisation
+from src.cache import PredictionCache, input_hash
+from src.feature_codec import FEATURE_DTYPE
+from database.create_db import ExplanationDB
+
+# Nombre de contributions renvoyées par défaut (les plus fortes en valeur absolue)
+EXPLANATION_TOP_K = int(os.getenv("EXPLANATION_TOP_K", "5"))
+EXPLANATION_CACHE_SIZE = int(os.getenv("EXPLANATION_CACHE_SIZE", "10000"))
+EXPLANATION_CACHE_TTL = float(os.getenv("EXPLANATION_CACHE_TTL", "3600"))
+
+explanation_cache = PredictionCache(max_size=EXPLANATION_CACHE_SIZE, ttl=EXPLANATION_CACHE_TTL)
+
+# Modèle fusionné de la dernière version d'artefacts expliquée : (version, modèle)
+_modele = (None, None)
+_lock = threading.Lock()
+
+
+def modele_explicatif(bundle):
+    """CatBoost fusionné du bundle (celui du moteur "native" s'il est déjà construit)."""
+    global _modele
+    if getattr(bundle.backend, "name", None) == "native":
+        return bundle.backend.model
+    with _lock:
+        version, modele = _modele
+        if version != bundle.version:
+            modele = fusionner_standardisation(bundle.model)
+            _modele = (bundle.version, modele)
+    return modele
+
+
+def contributions(donnees_pret, bundle):
+    """
+    Contributions d'un lot de lignes préparées (DataFrame ou matrice dans l'ordre du schéma) :
+    matrice float32 d'une ligne par saisie, une colonne par feature puis la valeur de base.
+    """
+    from catboost import Pool
+
+    if isinstance(donnees_pret, pd.DataFrame):
+        donnees_pret = donnees_pret[bundle.encoder.colonnes].to_numpy(dtype=np.float64)
+    valeurs = modele_explicatif(bundle).get_feature_importance(Pool(donnees_pret), type="ShapValues")
+    return valeurs.astype(FEATURE_DTYPE)
+
+
+def echauffer(bundle):
+    """Premier calcul factice : initialisation de CatBoost payée au démarrage."""
+    contributions(np.zeros((1, len(bundle.encoder.colonnes))), bundle)
+
+
+# === Contributions enregistrées ===
+def explications_enregistrees(db, version, empreintes):
+    """Contributions déjà en base (session ou connexion) : {empreinte: vecteur float32}."""
+    table = ExplanationDB.__table__
+    empreintes = list(empreintes)
+    connues = {}
+    for debut in range(0, len(empreintes), 1000):
+        for empreinte, vecteur in db.execute(
+            select(table.c.input_hash, table.c.contributions).where(
+                table.c.model_version == version,
+                table.c.input_hash.in_(empreintes[debut:debut + 1000]),
+            )
+        ):
+            connues[empreinte] = np.frombuffer(vecteur, dtype=FEATURE_DTYPE)
+    return connues
+
+
+def enregistrer_explications(db, version, vecteurs):
+    """Insère les contributions {empreinte: vecteur} absentes de la base (sans valider la transaction)."""
+    deja = explications_enregistrees(db, version, vecteurs)
+    lignes = [
+        {"input_hash": empreinte, "model_version": version, "contributions": vecteur.tobytes()}
+        for empreinte, vecteur in vecteurs.items()
+        if empreinte not in deja
+    ]
+    if lignes:
+        db.execute(insert(ExplanationDB.__table__), lignes)
+    return len(lignes)
+
+
+# === Explication des saisies ===
+def expliquer(lignes, donnees_pret, bundle, db=None, cache=explanation_cache):
+    """
+    Contributions de chaque saisie de `lignes` (features préparées : `donnees_pret`).
+    Ordre de recherche : cache mémoire, table prediction_explanations (si `db`), puis calcul
+    en un seul appel pour toutes les saisies manquantes, enregistrées ensuite en base.
+    """
+    cles = [input_hash(ligne) for ligne in lignes]
+    vecteurs = [cache.get(cle, bundle.version) if cache is not None and cache.enabled else None for cle in cles]
+
+    manquants = [i for i, vecteur in enumerate(vecteurs) if vecteur is None]
+    if manquants and db is not None:
+        connues = explications_enregistrees(db, bundle.version, {cles[i] for i in manquants})
+        for i in manquants:
+            vecteurs[i] = connues.get(cles[i])
+        manquants = [i for i in manquants if vecteurs[i] is None]
+
+    nouveaux = {}
+    if manquants:
+        for i, vecteur in zip(manquants, contributions(donnees_pret[manquants], bundle)):
+            vecteurs[i] = nouveaux[cles[i]] = vecteur
+        if db is not None:
+            try:
+                enregistrer_explications(db, bundle.version, nouveaux)
+                db.commit()
+            except IntegrityError:
+                # Enregistrées entre-temps par un autre worker : les mêmes valeurs sont déjà en base
+                db.rollback()
+
+    if cache is not None and cache.enabled:
+        for cle, vecteur in zip(cles, vecteurs):
+            cache.put(cle, bundle.version, vecteur)
+    return vecteurs
+
+
+def resumer(vecteur, features, bundle, top_k=EXPLANATION_TOP_K):
+    """
+    Les `top_k` contributions les plus fortes (en valeur absolue) d'une saisie, avec
+    la valeur lisible de chaque feature (avant scaling) et la valeur de base.
+    """
+    encoder = bundle.encoder
+    valeurs = np.asarray(features, dtype=np.float64).copy()
+    valeurs[:encoder.nb_scalees] = valeurs[:encoder.nb_scalees] * encoder.scale + encoder.mean
+    ordre = np.argsort(-np.abs(vecteur[:-1]), kind="stable")[:top_k]
+    return {
+        "base_value": round(float(vecteur[-1]), 4),
+        "contributions": [
+            {
+                "feature": encoder.colonnes[i],
+                "value": round(float(valeurs[i]), 4),
+                "contribution": round(float(vecteur[i]), 4),
+            }
+            for i in ordre
+        ],
+    }
@@ -0,0 +1,45 @@
+"""
+Export du modèle pour le moteur d'inférence ONNX (MODEL_BACKEND=onnx).
+
+Le StandardScaler du pipeline est fusionné dans les seuils des arbres CatBoost
+(src/backends.fusionner_standardisation), puis le modèle est écrit en ONNX :
+le graphe prend directement les features préparées par FeatureEncoder.
+L'empreinte de final_model.pkl est enregistrée à côté pour détecter un export périmé.
+
+Usage : python -m src.export_model [--models-dir models]
+"""
+import argparse
+import json
+import os
+
+import joblib
+
+from src.artifacts import MODELS_DIR
+from src.backends import FICHIER_EXPORT, FICHIER_ONNX, empreinte_fichier, fusionner_standardisation
+
+
+def exporter(models_dir=MODELS_DIR):
+    """Écrit final_model.onnx et son empreinte dans `models_dir` ; retourne le chemin du modèle ONNX."""
+    source = os.path.join(models_dir, "final_model.pkl")
+    modele = fusionner_standardisation(joblib.load(source))
+
+    chemin = os.path.join(models_dir, FICHIER_ONNX)
+    modele.save_model(
+        chemin,
+        format="onnx",
+        export_parameters={"onnx_domain": "ai.catboost", "onnx_graph_name": "employee_turnover"},
+    )
+    with open(os.path.join(models_dir, FICHIER_EXPORT), "w") as f:
+        json.dump({"source_sha256": empreinte_fichier(source)}, f)
+    return chemin
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models-dir", default=MODELS_DIR)
+    args = parser.parse_args()
+    print(f"Modèle exporté : {exporter(args.models_dir)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import hashlib
+import json
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+from src.utils import scaler_ou_non
+
+# Format de stockage des features : vecteur float32 little-endian,
+# dans l'ordre fixe des colonnes de scaler_ou_non()
+FEATURE_DTYPE = np.dtype("<f4")
+
+
+def feature_columns():
+    """Retourne l'ordre des colonnes attendu par le modèle."""
+    features_a_scaler, features_encodees = scaler_ou_non()
+    return features_a_scaler + features_encodees
+
+
+# Empreinte de la liste de colonnes : permet de relire un vecteur avec le bon schéma
+FEATURE_SCHEMA = hashlib.sha256(json.dumps(feature_columns()).encode()).hexdigest()[:12]
+
+
+def encode_features(donnees_pret):
+    """
+    Encode chaque ligne de features (DataFrame ou matrice dans l'ordre de feature_columns())
+    en un blob binaire compact (43 float32 = 172 octets).
+    """
+    if isinstance(donnees_pret, np.ndarray):
+        matrice = donnees_pret.astype(FEATURE_DTYPE)
+    else:
+        matrice = donnees_pret[feature_columns()].to_numpy(dtype=FEATURE_DTYPE)
+    return [ligne.tobytes() for ligne in matrice]
+
+
+def decode_features(feature) -> pd.DataFrame:
+    """
+    Relit les features stockées d'une ligne FeatureDB (pour l'audit).
+    Gère le format binaire et l'ancien format JSON.
+    """
+    if feature.feature_vector is not None:
+        if feature.feature_schema not in (None, FEATURE_SCHEMA):
+            raise ValueError(
+                f"Schéma de features inconnu : {feature.feature_schema} (attendu {FEATURE_SCHEMA})"
+            )
+        vecteur = np.frombuffer(feature.feature_vector, dtype=FEATURE_DTYPE)
+        return pd.DataFrame([vecteur], columns=feature_columns())
+
+    return pd.read_json(StringIO(feature.feature_data), orient="records")
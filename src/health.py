@@ -0,0 +1,82 @@
+import os
+import threading
+import time
+from datetime import datetime
+
+from src.artifacts import is_loaded, is_warm
+from database.create_db import SessionLocal, RequestLogDB, ping_db
+
+# Journalise une sonde /health sur N dans la table "requests" (0 = jamais)
+HEALTH_LOG_EVERY = int(os.getenv("HEALTH_LOG_EVERY", "0"))
+# Durée de validité du résultat de /ready (secondes)
+READY_CACHE_TTL = float(os.getenv("READY_CACHE_TTL", "5"))
+
+
+class HealthState:
+    """
+    État de santé en mémoire : compteur des sondes de vivacité
+    et résultat de disponibilité mis en cache pendant READY_CACHE_TTL.
+    """
+
+    def __init__(self, log_every=HEALTH_LOG_EVERY, ready_ttl=READY_CACHE_TTL):
+        self.log_every = log_every
+        self.ready_ttl = ready_ttl
+        self.started_at = datetime.utcnow()
+        self.health_checks = 0
+        # Verrous distincts : une vérification lente de la base ne retarde jamais /health
+        self._compteur = threading.Lock()
+        self._verification = threading.Lock()
+        self._ready = None
+        self._ready_at = 0.0
+
+    def record_health_check(self):
+        """Compte une sonde ; retourne True si celle-ci doit être journalisée."""
+        with self._compteur:
+            self.health_checks += 1
+            return self.log_every > 0 and self.health_checks % self.log_every == 0
+
+    def readiness(self):
+        """
+        Vérifie que les artefacts sont chargés et échauffés et que la base répond.
+        Un résultat positif est réutilisé tant qu'il a moins de READY_CACHE_TTL secondes ;
+        tant que l'instance n'est pas prête, chaque sonde refait les vérifications
+        (la disponibilité est annoncée dès la fin de l'échauffement).
+        Une seule vérification à la fois : pendant qu'elle attend la base, les autres
+        sondes reçoivent le dernier résultat connu (la première attend la sienne).
+        """
+        etat = self._ready
+        if etat is not None and etat["ready"] and time.monotonic() - self._ready_at < self.ready_ttl:
+            return etat
+
+        if not self._verification.acquire(blocking=etat is None):
+            return etat
+        try:
+            checks = {"model": is_loaded(), "warmup": is_warm()}
+            try:
+                ping_db()
+                checks["database"] = True
+            except Exception:
+                checks["database"] = False
+
+            self._ready_at = time.monotonic()
+            self._ready = {"ready": all(checks.values()), "checks": checks}
+            return self._ready
+        finally:
+            self._verification.release()
+
+
+def log_health_check():
+    """Écrit une ligne "/health" dans la table des requêtes (sondes échantillonnées)."""
+    db = SessionLocal()
+    try:
+        db.add(RequestLogDB(
+            endpoint="/health",
+            user_id="florian_user",
+            timestamp=datetime.utcnow()
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+
+health_state = HealthState()
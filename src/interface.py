@@ -3,16 +3,16 @@ import pandas as pd
 import joblib
 import requests
 import os
+from requests.adapters import HTTPAdapter
 
 # Fonctions de test
 def test_api_health():
     """Teste si l’API FastAPI répond via le endpoint /health."""
     try:
-        response = requests.get(f"{API_URL.replace('/predict', '')}/health")
-        if response.status_code == 200:
-            return f"API opérationnelle : {response.json().get('message', '')}"
-        else:
-            return f"API non disponible — Code {response.status_code}"
+        data = _client.health()
+        if data.get("status") != "OK":
+            return f"API non disponible : {data.get('message', '')}"
+        return f"API opérationnelle : {data.get('message', '')}"
     except Exception as e:
         return f"Erreur de connexion à l’API — {e}"
 
@@ -36,7 +36,61 @@ def test_model():
 
 # === Connexion à l’API FastAPI ===
 SPACE_URL = os.getenv("SPACE_URL", "").strip().replace("_", "-").lower().rstrip("/")
-API_URL = f"{SPACE_URL}/predict" if SPACE_URL else "http://localhost:7860/predict"
+API_BASE_URL = SPACE_URL or "http://localhost:7860"
+API_URL = f"{API_BASE_URL}/predict"
+# Client HTTP (API distante) : délai maximal et connexions conservées
+API_TIMEOUT = float(os.getenv("API_TIMEOUT", "30"))
+API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", "10"))
+
+
+class ClientHTTP:
+    """
+    Appels à une API distante avec une session requests :
+    les connexions sont réutilisées d'une prédiction à l'autre (keep-alive).
+    """
+
+    def __init__(self, base_url=API_BASE_URL, timeout=API_TIMEOUT, pool_size=API_POOL_SIZE):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def health(self):
+        response = self.session.get(f"{self.base_url}/health", timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def predict(self, input_data):
+        response = self.session.post(f"{self.base_url}/predict", json=input_data, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+
+class ClientLocal:
+    """
+    Appels directs au service de prédiction du même processus :
+    ni aller-retour HTTP, ni sérialisation JSON, ni place prise dans le pool de threads de l'API.
+    `predict` reçoit la saisie (dict) et retourne la même réponse que /predict.
+    """
+
+    def __init__(self, predict):
+        self.predict = predict
+
+    def health(self):
+        """État réel du service : artefacts chargés et échauffés, base joignable (comme /ready)."""
+        from src.health import health_state
+
+        etat = health_state.readiness()
+        if not etat["ready"]:
+            absents = ", ".join(nom for nom, ok in etat["checks"].items() if not ok)
+            return {"status": "KO", "message": f"service non disponible ({absents})", **etat}
+        return {"status": "OK", "message": "service de prédiction chargé et échauffé dans ce processus", **etat}
+
+
+# Client utilisé par l'interface (choisi par build_interface)
+_client = ClientHTTP()
 
 # Fonction principale de prédiction
 def process_input(
@@ -53,7 +107,7 @@ def process_input(
     domaine_etude, frequence_deplacement,
     annees_depuis_la_derniere_promotion, annes_sous_responsable_actuel
 ):
-    """Envoie les données saisies à l'API FastAPI pour prédiction."""
+    """Transmet les données saisies au service de prédiction (en processus ou via l'API)."""
     input_data = {
         "age": age,
         "genre": genre,
@@ -85,9 +139,7 @@ def process_input(
     }
 
     try:
-        response = requests.post(API_URL, json=input_data)
-        response.raise_for_status()
-        data = response.json()
+        data = _client.predict(input_data)
         if "error" in data:
             return f"Erreur API : {data['error']}"
             
@@ -101,8 +153,15 @@ def process_input(
         return f"Erreur : {e}"
 
 # Interface Gradio
-def build_interface():
-    """Construit l'interface Gradio."""
+def build_interface(client=None):
+    """
+    Construit l'interface Gradio.
+    `client` : ClientLocal pour appeler le service dans le processus ;
+    par défaut, ClientHTTP vers API_BASE_URL (déploiement distant).
+    """
+    global _client
+    _client = client or ClientHTTP()
+
     with gr.Blocks(
         title="Employee Turnover Prediction",
         theme=gr.themes.Soft(primary_hue="indigo", secondary_hue="gray", neutral_hue="gray")
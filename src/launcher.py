@@ -0,0 +1,82 @@
+"""
+Lanceur de production multi-workers.
+
+L'application (modèle, scaler, encodeur, création des tables) est chargée une seule fois
+dans le processus parent, puis partagée en copie sur écriture par les N workers forkés :
+la mémoire résidente n'augmente presque pas avec le nombre de workers.
+
+L'API seule est servie par défaut (UI_ENABLED=false sauf indication contraire) : l'interface
+Gradio garde son état de session dans chaque processus et reste servie par `python app.py`.
+
+Usage : python -m src.launcher [--workers N] [--host 0.0.0.0] [--port 7860] [--app app:app]
+"""
+import argparse
+import gc
+import importlib
+import os
+
+from gunicorn.app.base import BaseApplication
+
+# Nombre de workers par défaut : un par CPU
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", str(os.cpu_count() or 1)))
+
+
+def pre_fork(server, worker):
+    # Les objets chargés par le parent passent en génération permanente :
+    # le ramasse-miettes des workers ne les modifie plus (pas de copie des pages)
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Les connexions ouvertes par le parent (create_all) ne doivent pas être partagées
+    from database.create_db import engine
+    engine.dispose(close=False)
+
+
+class PreloadedApplication(BaseApplication):
+    """Application gunicorn chargée avant le fork (preload_app) avec des workers uvicorn."""
+
+    def __init__(self, app_uri, options):
+        self.app_uri = app_uri
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for cle, valeur in self.options.items():
+            self.cfg.set(cle, valeur)
+
+    def load(self):
+        module, attribut = self.app_uri.split(":")
+        application = getattr(importlib.import_module(module), attribut)
+        # Tables et modèle échauffé prêts dans le parent : les workers en héritent
+        # et leur propre démarrage (lifespan) n'a plus rien à faire
+        from database.create_db import init_db
+        from src.artifacts import warm_up
+        init_db()
+        warm_up()
+        return application
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=WEB_WORKERS)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=7860)
+    parser.add_argument("--app", default="app:app", help="module:attribut de l'application ASGI (défaut : API seule)")
+    args = parser.parse_args()
+    # Gradio se monte sur l'application FastAPI elle-même : il n'est désactivé qu'à l'import
+    os.environ.setdefault("UI_ENABLED", "false")
+
+    options = {
+        "bind": f"{args.host}:{args.port}",
+        "workers": args.workers,
+        "worker_class": "uvicorn_worker.UvicornWorker",
+        "preload_app": True,
+        "pre_fork": pre_fork,
+        "post_fork": post_fork,
+    }
+    PreloadedApplication(args.app, options).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Métriques au format texte Prometheus, sans dépendance externe.
+
+Les compteurs et histogrammes sont propres à chaque processus : avec plusieurs
+workers, Prometheus agrège les séries de chaque worker.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+# Bornes (secondes) adaptées à des étapes de l'ordre de la milliseconde
+BUCKETS_LATENCE = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_metriques = []
+_collecteurs = []
+
+
+def _labels(noms, valeurs):
+    if not noms:
+        return ""
+    paires = ",".join(f'{nom}="{str(valeur)}"' for nom, valeur in zip(noms, valeurs))
+    return "{" + paires + "}"
+
+
+def _format(valeur):
+    if valeur == float("inf"):
+        return "+Inf"
+    return repr(float(valeur)) if isinstance(valeur, float) else str(valeur)
+
+
+class Counter:
+    """Compteur monotone, éventuellement étiqueté."""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _metriques.append(self)
+
+    def inc(self, amount=1, **labels):
+        cle = tuple(labels.get(nom, "") for nom in self.labelnames)
+        with self._lock:
+            self._values[cle] = self._values.get(cle, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(labels.get(nom, "") for nom in self.labelnames), 0)
+
+    def render(self):
+        lignes = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for cle, valeur in sorted(self._values.items()):
+                lignes.append(f"{self.name}{_labels(self.labelnames, cle)} {_format(valeur)}")
+        return lignes
+
+
+class Histogram:
+    """Histogramme cumulatif (buckets, somme, nombre d'observations)."""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=BUCKETS_LATENCE):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets) + (float("inf"),)
+        self._series = {}
+        self._lock = threading.Lock()
+        _metriques.append(self)
+
+    def observe(self, valeur, **labels):
+        cle = tuple(labels.get(nom, "") for nom in self.labelnames)
+        with self._lock:
+            serie = self._series.get(cle)
+            if serie is None:
+                serie = self._series[cle] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, borne in enumerate(self.buckets):
+                if valeur <= borne:
+                    serie["counts"][i] += 1
+                    break
+            serie["sum"] += valeur
+            serie["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Mesure la durée du bloc (secondes)."""
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - debut, **labels)
+
+    def render(self):
+        lignes = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        noms = self.labelnames + ("le",)
+        with self._lock:
+            for cle, serie in sorted(self._series.items()):
+                cumul = 0
+                for borne, nombre in zip(self.buckets, serie["counts"]):
+                    cumul += nombre
+                    lignes.append(f"{self.name}_bucket{_labels(noms, cle + (_format(borne),))} {cumul}")
+                lignes.append(f"{self.name}_sum{_labels(self.labelnames, cle)} {_format(serie['sum'])}")
+                lignes.append(f"{self.name}_count{_labels(self.labelnames, cle)} {serie['count']}")
+        return lignes
+
+
+def register_collector(fonction):
+    """
+    Enregistre une fonction appelée à chaque lecture de /metrics.
+    Elle retourne des tuples (nom, type, aide, valeur) pour des valeurs
+    déjà tenues ailleurs (pool de connexions, cache...).
+    """
+    _collecteurs.append(fonction)
+    return fonction
+
+
+def render():
+    """Texte d'exposition Prometheus de toutes les métriques."""
+    lignes = []
+    for metrique in _metriques:
+        lignes.extend(metrique.render())
+    for collecteur in _collecteurs:
+        for nom, type_, aide, valeur in collecteur():
+            lignes.extend([f"# HELP {nom} {aide}", f"# TYPE {nom} {type_}", f"{nom} {_format(valeur)}"])
+    return "\n".join(lignes) + "\n"
+
+
+# === Métriques de l'API ===
+REQUEST_DURATION = Histogram(
+    "api_request_duration_seconds", "Durée totale des requêtes HTTP.", ("endpoint", "method", "status")
+)
+STAGE_DURATION = Histogram(
+    "prediction_stage_duration_seconds",
+    "Durée de chaque étape d'une prédiction (validation, cache_lookup, encoding, inference, db_write, audit_enqueue).",
+    ("stage",),
+)
+PREDICTION_ERRORS = Counter(
+    "prediction_errors_total", "Prédictions terminées en erreur.", ("endpoint",)
+)
+INPUT_REJECTIONS = Counter(
+    "prediction_input_rejections_total",
+    "Requêtes rejetées par la validation Pydantic (422), par endpoint et premier champ en erreur.",
+    ("endpoint", "field"),
+)
+AUDIT_FLUSH_DURATION = Histogram(
+    "audit_writer_flush_duration_seconds", "Durée d'écriture d'un lot par le thread d'audit différé."
+)
+AUDIT_RECORDS = Counter(
+    "audit_writer_records_total", "Enregistrements traités par le thread d'audit différé.", ("status",)
+)
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI : note l'instant d'arrivée de la requête (request.state.debut)
+    et mesure la durée totale par endpoint. Les chemins hors API (interface Gradio)
+    sont regroupés sous "other" pour borner le nombre de séries.
+    """
+
+    def __init__(self, app, endpoints=()):
+        self.app = app
+        self.endpoints = set(endpoints)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        debut = time.perf_counter()
+        scope.setdefault("state", {})["debut"] = debut
+        statut = {"code": 500}
+
+        async def send_avec_statut(message):
+            if message["type"] == "http.response.start":
+                statut["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_avec_statut)
+        finally:
+            chemin = scope["path"] if scope["path"] in self.endpoints else "other"
+            REQUEST_DURATION.observe(
+                time.perf_counter() - debut,
+                endpoint=chemin, method=scope["method"], status=statut["code"],
+            )
@@ -1,17 +1,33 @@
 import pandas as pd
-import joblib
+from src.artifacts import get_bundle
 
-model = joblib.load("models/final_model.pkl")
-with open("models/threshold.txt", "r") as f:
-    threshold = float(f.read())
-
-def predict(donnees_pret: pd.DataFrame):
+def predict(donnees_pret: pd.DataFrame, bundle=None):
     """
     Applique le modèle sur les données préparées et retourne la prédiction et la probabilité.
     """
-    proba = model.predict_proba(donnees_pret)[:, 1][0]
-    prediction = int(proba >= threshold)
-    return {
-        "prediction": prediction,
-        "probability": round(float(proba), 4)
-    }
\ No newline at end of file
+    return predict_batch(donnees_pret, bundle)[0]
+
+def predict_batch(donnees_pret: pd.DataFrame, bundle=None):
+    """
+    Applique le modèle en une seule passe sur un lot de lignes préparées
+    (DataFrame ou matrice issue de FeatureEncoder) et retourne une prédiction
+    et une probabilité par ligne.
+    """
+    predictions, probas = predict_arrays(donnees_pret, bundle)
+    return [
+        {
+            "prediction": int(prediction),
+            "probability": round(float(proba), 4)
+        }
+        for prediction, proba in zip(predictions, probas)
+    ]
+
+def predict_arrays(donnees_pret, bundle=None):
+    """
+    Version vectorisée sans conversion en dictionnaires (traitements de masse) :
+    retourne le tableau des prédictions et celui des probabilités (non arrondies).
+    """
+    bundle = bundle or get_bundle()
+    probas = bundle.backend.predict_proba(donnees_pret)
+    predictions = (probas >= bundle.threshold).astype(int)
+    return predictions, probas
@@ -1,5 +1,4 @@
 import pandas as pd
-from sklearn.preprocessing import LabelEncoder
 
 # FONCTION DATA ENGINEERING
 
@@ -30,8 +29,9 @@ def data_engineering(donnees_features: pd.DataFrame):
     donnees_features['tranche_age'] = pd.cut(donnees_features[
         'age'],bins=[17, 30, 36, 43, 60],
         labels=['18-30', '31-36', '37-43','44+'])
-    labelencoder = LabelEncoder()
-    donnees_features['tranche_age']= labelencoder.fit_transform(donnees_features['tranche_age'])
+# Codes fixes des tranches (ordre identique au LabelEncoder de l'entraînement),
+# indépendants des autres lignes du lot
+    donnees_features['tranche_age'] = donnees_features['tranche_age'].cat.codes.astype(int)
     donnees_features = donnees_features.drop(columns='age')
 
     donnees_features['genre'] = donnees_features['genre'].map({'F': 1, 'M': 0})
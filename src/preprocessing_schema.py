@@ -0,0 +1,119 @@
+"""
+Schéma de preprocessing ajusté à l'entraînement, enregistré à côté du scaler
+(models/preprocessing.json) : ordre des colonnes du modèle, vocabulaires des variables
+catégorielles, tables des encodages ordinaux et bornes des tranches d'âge.
+
+FeatureEncoder n'encode qu'à partir de ce fichier : une valeur absente d'un vocabulaire
+lève CategorieInconnue au lieu de produire silencieusement NaN ou un one-hot vide.
+
+Usage : python -m src.preprocessing_schema [--models-dir models]  (réécrit le fichier)
+"""
+import argparse
+import json
+import os
+
+import pandas as pd
+
+from src.utils import scaler_ou_non
+
+FICHIER_SCHEMA = "preprocessing.json"
+# Version du format du fichier (à incrémenter si sa structure change)
+FORMAT_SCHEMA = 1
+
+# Définitions de l'entraînement (mêmes tables que data_engineering)
+ORDINALES = {
+    "genre": {"F": 1, "M": 0},
+    "heure_supplementaires": {"Oui": 1, "Non": 0},
+    "frequence_deplacement": {"Aucun": 0, "Occasionnel": 1, "Frequent": 2},
+}
+COLONNES_ONE_HOT = ["statut_marital", "departement", "poste", "domaine_etude"]
+# Tranches d'âge : ]17, 30], ]30, 36], ]36, 43], ]43, 60]
+TRANCHES_AGE = {"bornes": [17, 30, 36, 43, 60], "libelles": ["18-30", "31-36", "37-43", "44+"]}
+
+
+class CategorieInconnue(ValueError):
+    """Valeur absente du vocabulaire appris pour une variable catégorielle."""
+
+    def __init__(self, champ, valeur, attendues, ligne=0):
+        self.champ = champ
+        self.valeur = valeur
+        self.attendues = list(attendues)
+        self.ligne = ligne
+        super().__init__(
+            f"Valeur inconnue pour '{champ}' (ligne {ligne}) : {valeur!r} ; "
+            f"valeurs acceptées : {', '.join(self.attendues)}"
+        )
+
+    def __reduce__(self):
+        # Reconstruction à l'identique depuis un processus du pool (scoring de masse)
+        return CategorieInconnue, (self.champ, self.valeur, self.attendues, self.ligne)
+
+    def detail(self):
+        return {"champ": self.champ, "valeur": self.valeur, "attendues": self.attendues, "ligne": self.ligne}
+
+
+def construire_schema():
+    """Schéma issu des définitions de l'entraînement et de l'ordre des colonnes du modèle."""
+    features_a_scaler, features_encodees = scaler_ou_non()
+    return {
+        "format": FORMAT_SCHEMA,
+        "colonnes": features_a_scaler + features_encodees,
+        "colonnes_scalees": features_a_scaler,
+        "ordinales": ORDINALES,
+        "one_hot": {
+            variable: [
+                colonne[len(variable) + 1:] for colonne in features_encodees if colonne.startswith(variable + "_")
+            ]
+            for variable in COLONNES_ONE_HOT
+        },
+        "tranches_age": TRANCHES_AGE,
+    }
+
+
+def charger_schema(models_dir):
+    """Lit models_dir/preprocessing.json et vérifie son format et l'ordre des colonnes."""
+    with open(os.path.join(models_dir, FICHIER_SCHEMA), encoding="utf-8") as f:
+        schema = json.load(f)
+    if schema.get("format") != FORMAT_SCHEMA:
+        raise ValueError(f"{FICHIER_SCHEMA} : format {schema.get('format')} non pris en charge ({FORMAT_SCHEMA} attendu)")
+    features_a_scaler, features_encodees = scaler_ou_non()
+    if schema["colonnes"] != features_a_scaler + features_encodees:
+        raise ValueError(f"{FICHIER_SCHEMA} : l'ordre des colonnes ne correspond pas à celui du modèle")
+    return schema
+
+
+def vocabulaires(schema):
+    """Valeurs acceptées par variable catégorielle (ordinales et one-hot)."""
+    return {
+        **{variable: list(table) for variable, table in schema["ordinales"].items()},
+        **schema["one_hot"],
+    }
+
+
+def verifier_categories(donnees, schema):
+    """Lève CategorieInconnue pour la première valeur hors vocabulaire d'un DataFrame de saisies."""
+    for variable, valeurs in vocabulaires(schema).items():
+        inconnues = ~donnees[variable].isin(valeurs)
+        if inconnues.any():
+            ligne = inconnues.idxmax()
+            valeur = donnees[variable][ligne]
+            raise CategorieInconnue(variable, None if pd.isna(valeur) else str(valeur), valeurs, int(ligne))
+
+
+def ecrire_schema(models_dir):
+    chemin = os.path.join(models_dir, FICHIER_SCHEMA)
+    with open(chemin, "w", encoding="utf-8") as f:
+        json.dump(construire_schema(), f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    return chemin
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models-dir", default=os.getenv("MODELS_DIR", "models"))
+    args = parser.parse_args()
+    print(f"Schéma de preprocessing écrit : {ecrire_schema(args.models_dir)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import numpy as np
+from src.artifacts import get_bundle
+from src.cache import input_hash, prediction_cache
+from src.prediction import predict_batch
+from src.batching import micro_batcher
+from src.metrics import STAGE_DURATION
+
+MESSAGE_RISQUE = "Risque de départ"
+MESSAGE_FIDELE = "Employé fidèle"
+
+
+def message_prediction(prediction):
+    """Message lisible associé à une prédiction."""
+    return MESSAGE_RISQUE if prediction == 1 else MESSAGE_FIDELE
+
+
+def score_employees(lignes, bundle=None, cache=prediction_cache):
+    """
+    Encode et score une liste de saisies en une seule passe.
+    Retourne la matrice de features et, pour chaque ligne,
+    la prédiction, la probabilité et le message.
+
+    Les saisies déjà scorées avec la même version d'artefacts sont servies
+    par le cache ; seules les autres passent par l'encodeur et le modèle.
+    """
+    donnees_pret, results, _ = score_employees_detail(lignes, bundle, cache)
+    return donnees_pret, results
+
+
+def score_employees_detail(lignes, bundle=None, cache=prediction_cache):
+    """
+    Comme score_employees, avec en plus, pour chaque ligne, True si son résultat
+    vient du cache (ni encodage ni appel au modèle).
+    """
+    bundle = bundle or get_bundle()
+    if cache is None or not cache.enabled:
+        return (*_score(lignes, bundle), [False] * len(lignes))
+
+    with STAGE_DURATION.time(stage="cache_lookup"):
+        cles = [input_hash(ligne) for ligne in lignes]
+        en_cache = [cache.get(cle, bundle.version) for cle in cles]
+    manquants = [i for i, valeur in enumerate(en_cache) if valeur is None]
+    depuis_cache = [valeur is not None for valeur in en_cache]
+
+    if manquants:
+        donnees_pret, results = _score([lignes[i] for i in manquants], bundle)
+        for position, i in enumerate(manquants):
+            en_cache[i] = (donnees_pret[position].copy(), results[position])
+            cache.put(cles[i], bundle.version, en_cache[i])
+
+    donnees_pret = np.vstack([features for features, _ in en_cache])
+    results = [dict(result) for _, result in en_cache]
+    return donnees_pret, results, depuis_cache
+
+
+def _score(lignes, bundle):
+    with STAGE_DURATION.time(stage="encoding"):
+        donnees_pret = bundle.encoder.encode(lignes)
+    # Les petites demandes concurrentes sont regroupées en un seul appel au modèle ;
+    # les gros lots sont déjà vectorisés et passent directement
+    with STAGE_DURATION.time(stage="inference"):
+        if micro_batcher.enabled and len(lignes) < micro_batcher.max_rows:
+            results = micro_batcher.predict(donnees_pret, bundle)
+        else:
+            results = predict_batch(donnees_pret, bundle)
+    for result in results:
+        result["message"] = message_prediction(result["prediction"])
+    return donnees_pret, results
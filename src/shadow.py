@@ -0,0 +1,212 @@
+"""
+Évaluation d'un modèle candidat sur le trafic réel (shadow / canary).
+
+Les artefacts du candidat (même structure que models/) sont lus dans CANDIDATE_MODELS_DIR.
+Une fraction CANDIDATE_FRACTION des saisies scorées par l'API (1 : tout le trafic) est
+rejouée sur le candidat, hors du chemin critique : la requête dépose ses saisies dans une
+file bornée et répond sans attendre. La sélection dépend de l'empreinte de la saisie,
+une même saisie est donc toujours évaluée (ou non).
+
+Comme pour l'audit différé, un thread regroupe les saisies (jusqu'à CANDIDATE_BATCH_SIZE
+ou CANDIDATE_FLUSH_INTERVAL_MS), les score en un seul appel au candidat et écrit les
+résultats dans shadow_results en une transaction, avec ceux du modèle principal et les
+deux latences. File pleine (CANDIDATE_QUEUE_SIZE) : les saisies sont ignorées et comptées.
+
+Les deux latences sont ramenées à une ligne : celle du candidat sur son lot, celle du modèle
+principal sur les lignes qu'il a réellement calculées dans la requête. Une ligne servie par le
+cache de prédictions est marquée (primary_cached) et n'a pas de latence principale.
+"""
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+from sqlalchemy import case, func, select
+
+from src.background import BatchWorker
+from src.artifacts import GenerationPartagee, load_bundle
+from src.cache import input_hash
+from src.prediction import predict_batch
+from database.create_db import SessionLocal, ShadowResultDB
+
+CANDIDATE_MODELS_DIR = os.getenv("CANDIDATE_MODELS_DIR") or None
+CANDIDATE_FRACTION = float(os.getenv("CANDIDATE_FRACTION", "1"))
+CANDIDATE_BATCH_SIZE = int(os.getenv("CANDIDATE_BATCH_SIZE", "256"))
+CANDIDATE_FLUSH_INTERVAL_MS = int(os.getenv("CANDIDATE_FLUSH_INTERVAL_MS", "500"))
+CANDIDATE_QUEUE_SIZE = int(os.getenv("CANDIDATE_QUEUE_SIZE", "10000"))
+
+
+class ShadowScorer(BatchWorker):
+    """Modèle candidat évalué par lots dans un thread, hors du chemin critique des requêtes."""
+
+    nom = "shadow-scorer"
+
+    def __init__(self, models_dir=CANDIDATE_MODELS_DIR, fraction=CANDIDATE_FRACTION,
+                 batch_size=CANDIDATE_BATCH_SIZE, flush_interval_ms=CANDIDATE_FLUSH_INTERVAL_MS,
+                 max_queue=CANDIDATE_QUEUE_SIZE, session_factory=SessionLocal):
+        super().__init__(batch_size, flush_interval_ms, max_queue)
+        self.models_dir = models_dir
+        self.fraction = fraction
+        self.session_factory = session_factory
+        self.bundle = None
+        # Dernier échec de chargement du candidat : l'évaluation est suspendue jusqu'au prochain load() réussi
+        self.load_error = None
+        # Rechargements du candidat, partagés entre les workers du lanceur
+        self.generation = GenerationPartagee()
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.scored = 0
+        self.dropped = 0
+        self.failed = 0
+        self.agreements = 0
+
+    @property
+    def configured(self):
+        return self.models_dir is not None and self.fraction > 0
+
+    @property
+    def enabled(self):
+        return self.configured and self.load_error is None
+
+    def load(self, annoncer=False):
+        """
+        Charge (ou recharge) les artefacts du candidat et les échauffe.
+        En cas d'échec, l'évaluation est désactivée (les saisies ne sont plus déposées)
+        et l'exception est relancée ; le modèle principal n'en dépend pas.
+        Avec `annoncer`, le rechargement est signalé aux autres workers.
+        """
+        try:
+            bundle = load_bundle(self.models_dir)
+            predict_batch(np.zeros((1, len(bundle.encoder.colonnes))), bundle)
+        except Exception as e:
+            self.load_error = repr(e)
+            raise
+        self.bundle = bundle
+        self.load_error = None
+        if annoncer:
+            self.generation.annoncer()
+        return bundle
+
+    def selectionnee(self, cle):
+        """Vrai si la saisie d'empreinte `cle` fait partie de la fraction évaluée."""
+        return int(cle[:8], 16) < self.fraction * 0x100000000
+
+    def submit(self, lignes, results, scoring_ms=None, depuis_cache=None):
+        """
+        Dépose les saisies sélectionnées d'un lot scoré, sans jamais attendre.
+        `scoring_ms` : durée du scoring principal de la requête ; `depuis_cache` : lignes
+        servies par le cache (score_employees_detail), exclues du calcul de la latence par ligne.
+        """
+        if not self.enabled:
+            return
+        self.start()
+        depuis_cache = depuis_cache or [False] * len(lignes)
+        calculees = len(lignes) - sum(depuis_cache)
+        latence = round(scoring_ms / calculees, 3) if scoring_ms is not None and calculees else None
+        deposees = ignorees = 0
+        for ligne, result, en_cache in zip(lignes, results, depuis_cache):
+            cle = input_hash(ligne)
+            if not self.selectionnee(cle):
+                continue
+            try:
+                self._queue.put_nowait((cle, ligne, result, None if en_cache else latence, en_cache))
+                deposees += 1
+            except queue.Full:
+                ignorees += 1
+        with self._lock:
+            self.submitted += deposees
+            self.dropped += ignorees
+
+    def _traiter(self, batch):
+        try:
+            bundle = self.bundle or self.load()
+            debut = time.perf_counter()
+            candidats = predict_batch(bundle.encoder.encode([ligne for _, ligne, _, _, _ in batch]), bundle)
+            # Latence du candidat ramenée à une ligne de son lot
+            latence = round((time.perf_counter() - debut) * 1000 / len(batch), 3)
+
+            db = self.session_factory()
+            try:
+                db.add_all([
+                    ShadowResultDB(
+                        input_hash=cle,
+                        model_version=bundle.version,
+                        prediction=candidat["prediction"],
+                        probability=candidat["probability"],
+                        latency_ms=latence,
+                        primary_prediction=int(result["prediction"]),
+                        primary_probability=float(result["probability"]),
+                        primary_latency_ms=primary_latency_ms,
+                        primary_cached=en_cache,
+                    )
+                    for (cle, _, result, primary_latency_ms, en_cache), candidat in zip(batch, candidats)
+                ])
+                db.commit()
+            finally:
+                db.close()
+
+            with self._lock:
+                self.scored += len(batch)
+                self.agreements += sum(
+                    candidat["prediction"] == result["prediction"]
+                    for (_, _, result, _, _), candidat in zip(batch, candidats)
+                )
+        except Exception as e:
+            with self._lock:
+                self.failed += len(batch)
+            print(f"Scoring du modèle candidat impossible ({len(batch)} saisies) : {e}")
+
+    def _abandonner(self, nombre):
+        with self._lock:
+            self.dropped += nombre
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "load_error": self.load_error,
+                "models_dir": self.models_dir,
+                "version": self.bundle.version if self.bundle else None,
+                "fraction": self.fraction,
+                "queued": self._queue.qsize(),
+                "submitted": self.submitted,
+                "scored": self.scored,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "agreement_rate": round(self.agreements / self.scored, 4) if self.scored else None,
+            }
+
+
+def comparaison(db):
+    """
+    Comparaison enregistrée par version de candidat : accord des décisions, écarts et latences
+    moyennes par ligne (la latence principale ne porte que sur les lignes non servies par le cache).
+    """
+    requete = (
+        select(
+            ShadowResultDB.model_version,
+            func.count(),
+            func.avg(case((ShadowResultDB.prediction == ShadowResultDB.primary_prediction, 1.0), else_=0.0)),
+            func.avg(func.abs(ShadowResultDB.probability - ShadowResultDB.primary_probability)),
+            func.avg(ShadowResultDB.latency_ms),
+            func.avg(ShadowResultDB.primary_latency_ms),
+            func.sum(case((ShadowResultDB.primary_cached.is_(True), 1), else_=0)),
+        )
+        .group_by(ShadowResultDB.model_version)
+    )
+    return [
+        {
+            "model_version": version,
+            "count": nombre,
+            "agreement_rate": round(accord, 4),
+            "mean_probability_gap": round(ecart, 6),
+            "mean_latency_ms": round(latence, 3),
+            "mean_primary_latency_ms": round(latence_principale, 3) if latence_principale is not None else None,
+            "primary_cached": depuis_cache,
+        }
+        for version, nombre, accord, ecart, latence, latence_principale, depuis_cache in db.execute(requete)
+    ]
+
+
+shadow_scorer = ShadowScorer()
@@ -0,0 +1,44 @@
+import os
+import sys
+import tempfile
+
+# Racine du projet : imports `app` / `src` et chemins relatifs "models/..."
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+os.chdir(RACINE)
+
+# Base SQLite temporaire pour les tests (pas de PostgreSQL en CI)
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+)
+os.environ.setdefault("ADMIN_TOKEN", "jeton-de-test")
+
+EMPLOYE_EXEMPLE = {
+    "age": 35,
+    "genre": "M",
+    "revenu_mensuel": 4500.0,
+    "statut_marital": "Marie",
+    "departement": "Consulting",
+    "poste": "Consultant",
+    "niveau_hierarchique_poste": 2,
+    "nombre_experiences_precedentes": 3,
+    "annee_experience_totale": 10,
+    "annees_dans_l_entreprise": 5,
+    "annees_dans_le_poste_actuel": 3,
+    "satisfaction_employee_environnement": 3,
+    "note_evaluation_precedente": 3,
+    "satisfaction_employee_nature_travail": 3,
+    "satisfaction_employee_equipe": 3,
+    "satisfaction_employee_equilibre_pro_perso": 3,
+    "note_evaluation_actuelle": 3,
+    "heure_supplementaires": "Oui",
+    "augmentation_salaire_precedente_pourcent": 0.15,
+    "nombre_participation_pee": 1,
+    "nb_formations_suivies": 2,
+    "distance_domicile_travail": 10,
+    "niveau_education": 3,
+    "domaine_etude": "InfraCloud",
+    "frequence_deplacement": "Occasionnel",
+    "annees_depuis_la_derniere_promotion": 1,
+    "annes_sous_responsable_actuel": 2,
+}
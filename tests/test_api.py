@@ -0,0 +1,328 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from conftest import EMPLOYE_EXEMPLE
+
+
+@pytest.fixture(scope="module")
+def client():
+    from app import app
+    # Le démarrage (tables, échauffement du modèle) a lieu dans le lifespan
+    from src.artifacts import warm_up
+    with TestClient(app) as client:
+        warm_up()  # attend la fin de l'échauffement lancé en arrière-plan
+        yield client
+
+
+def test_health_sans_ecriture_en_base(client):
+    from database.create_db import SessionLocal, RequestLogDB
+
+    db = SessionLocal()
+    avant = db.query(RequestLogDB).count()
+    response = client.get("/health")
+    apres = db.query(RequestLogDB).count()
+    db.close()
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "OK"
+    assert apres == avant
+
+
+def test_ready(client):
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json() == {
+        "ready": True, "checks": {"model": True, "warmup": True, "database": True}
+    }
+
+
+def test_base_lente_sans_effet_sur_la_vivacite(monkeypatch):
+    import threading
+    import time
+
+    import src.health as health
+
+    lente = threading.Event()
+    monkeypatch.setattr(health, "ping_db", lambda: lente.wait(5))
+    etat = health.HealthState(ready_ttl=0)
+    etat._ready = {"ready": False, "checks": {}}
+
+    verification = threading.Thread(target=etat.readiness)
+    verification.start()
+    time.sleep(0.1)
+    debut = time.perf_counter()
+    etat.record_health_check()
+    # Vérification déjà en cours : dernier résultat connu, sans attendre la base
+    assert etat.readiness() == {"ready": False, "checks": {}}
+    assert time.perf_counter() - debut < 0.5
+
+    lente.set()
+    verification.join()
+    assert etat.readiness()["checks"]["database"] is True
+
+
+def test_mode_api_seule_sans_gradio():
+    """UI_ENABLED=false : l'import de l'application ne charge ni gradio ni le modèle."""
+    import subprocess
+    import sys
+
+    code = (
+        "import sys, app; from src.artifacts import is_loaded; "
+        "assert 'gradio' not in sys.modules and not is_loaded() and app.gradio_app is app.app"
+    )
+    resultat = subprocess.run(
+        [sys.executable, "-c", code], env={**os.environ, "UI_ENABLED": "false"},
+        capture_output=True, text=True,
+    )
+    assert resultat.returncode == 0, resultat.stderr
+
+
+def test_echauffement_en_echec():
+    """Artefacts introuvables : échec journalisé au démarrage, /ready à 503, arrêt sans erreur."""
+    import subprocess
+    import sys
+
+    code = (
+        "from fastapi.testclient import TestClient; import app, time\n"
+        "with TestClient(app.app) as client:\n"
+        "    time.sleep(0.5)\n"
+        "    assert client.get('/ready').status_code == 503\n"
+        "print('arret termine')\n"
+    )
+    resultat = subprocess.run(
+        [sys.executable, "-c", code],
+        env={**os.environ, "UI_ENABLED": "false", "MODELS_DIR": "/nonexistent"},
+        capture_output=True, text=True,
+    )
+    assert resultat.returncode == 0, resultat.stderr
+    assert "Échauffement impossible" in resultat.stdout
+    assert resultat.stdout.index("Échauffement impossible") < resultat.stdout.index("arret termine")
+
+
+def test_predict_batch_identique_au_predict_unitaire(client):
+    """Le lot doit renvoyer, ligne à ligne, le même résultat que /predict."""
+    employes = [
+        EMPLOYE_EXEMPLE,
+        {**EMPLOYE_EXEMPLE, "age": 52, "poste": "Manager", "heure_supplementaires": "Non"},
+        {**EMPLOYE_EXEMPLE, "age": 24, "genre": "F", "statut_marital": "Celibataire"},
+    ]
+
+    lot = client.post("/predict/batch", json=employes).json()
+    unitaires = [client.post("/predict", json=employe).json() for employe in employes]
+
+    assert lot == unitaires
+
+
+def test_admin_reload(client):
+    from src.artifacts import get_bundle
+
+    assert client.post("/admin/reload").status_code == 403
+
+    avant = get_bundle()
+    response = client.post("/admin/reload", headers={"X-Admin-Token": "jeton-de-test"})
+    assert response.status_code == 200
+    assert response.json()["version"] == avant.version
+    assert get_bundle() is not avant
+
+
+def test_rechargement_suivi_par_les_autres_workers(client):
+    import multiprocessing
+    from app import suivre_rechargements
+    from src.artifacts import generation, get_bundle
+
+    avant = get_bundle()
+    suivre_rechargements()
+    assert get_bundle() is avant
+
+    # Un worker frère (forké après la création du compteur) reçoit /admin/reload
+    frere = multiprocessing.get_context("fork").Process(target=generation.annoncer)
+    frere.start()
+    frere.join()
+
+    suivre_rechargements()
+    recharge = get_bundle()
+    assert recharge is not avant and recharge.version == avant.version
+    suivre_rechargements()
+    assert get_bundle() is recharge
+
+
+def test_features_stockees_en_binaire(client):
+    import numpy as np
+    import pandas as pd
+    from database.create_db import SessionLocal, FeatureDB, RequestLogDB
+    from src.feature_codec import decode_features, feature_columns
+    from src.preprocessing import data_engineering
+    from src.scaling import data_scaling
+
+    client.post("/predict", json=EMPLOYE_EXEMPLE)
+
+    # La saisie a pu être enregistrée par un test précédent : ses features sont réutilisées
+    db = SessionLocal()
+    requete = db.query(RequestLogDB).order_by(RequestLogDB.id.desc()).first()
+    feature = (
+        db.query(FeatureDB)
+        .filter(FeatureDB.employee_input_id == requete.employee_input_id)
+        .order_by(FeatureDB.id.desc())
+        .first()
+    )
+    db.close()
+
+    attendu = data_scaling(data_engineering(pd.DataFrame([EMPLOYE_EXEMPLE])))
+    assert len(feature.feature_vector) == 4 * len(feature_columns())
+    np.testing.assert_allclose(
+        decode_features(feature).to_numpy(), attendu[feature_columns()].to_numpy(), rtol=1e-6
+    )
+
+
+def test_statistiques_pool(client):
+    assert client.get("/admin/db-pool").status_code == 403
+
+    client.post("/predict", json=EMPLOYE_EXEMPLE)
+    stats = client.get("/admin/db-pool", headers={"X-Admin-Token": "jeton-de-test"}).json()
+    assert stats["checked_out"] == 0
+    assert stats["checkouts"] >= 1
+
+
+def test_metrics(client):
+    client.post("/predict", json=EMPLOYE_EXEMPLE)
+    texte = client.get("/metrics").text
+
+    for etape in ("validation", "cache_lookup", "db_write"):
+        assert f'prediction_stage_duration_seconds_count{{stage="{etape}"}}' in texte
+    assert 'api_request_duration_seconds_count{endpoint="/predict",method="POST",status="200"}' in texte
+    assert "db_pool_checked_out 0" in texte
+
+
+def test_interface_en_processus(client):
+    """L'interface appelle le service sans HTTP : même résultat que /predict, même journalisation."""
+    from app import predire_depuis_interface
+    from database.create_db import SessionLocal, ApiResponseDB
+    from src.interface import process_input
+
+    attendu = client.post("/predict", json=EMPLOYE_EXEMPLE).json()
+
+    db = SessionLocal()
+    avant = db.query(ApiResponseDB).count()
+    assert predire_depuis_interface(EMPLOYE_EXEMPLE) == attendu
+    assert db.query(ApiResponseDB).count() == avant + 1
+    db.close()
+
+    # Valeurs telles que les transmet Gradio (nombres flottants, pourcentage en texte)
+    saisie = {cle: float(v) if isinstance(v, int) else v for cle, v in EMPLOYE_EXEMPLE.items()}
+    saisie["augmentation_salaire_precedente_pourcent"] = "0.15"
+    assert process_input(**saisie) == f"{attendu['message']} — probabilité : {attendu['probability']:.3f}"
+    assert "error" in predire_depuis_interface({**EMPLOYE_EXEMPLE, "age": None})
+
+
+def test_interface_etat_reel_du_service(monkeypatch):
+    import src.health as health
+    from src.interface import ClientLocal
+
+    monkeypatch.setattr(health, "is_loaded", lambda: True)
+    monkeypatch.setattr(health, "is_warm", lambda: True)
+    monkeypatch.setattr(health, "health_state", health.HealthState(ready_ttl=0))
+    client_local = ClientLocal(predict=None)
+    assert client_local.health()["status"] == "OK"
+
+    def base_injoignable():
+        raise ConnectionError("base injoignable")
+
+    monkeypatch.setattr(health, "ping_db", base_injoignable)
+    reponse = client_local.health()
+    assert reponse["status"] == "KO"
+    assert reponse["checks"]["database"] is False
+    assert "database" in reponse["message"]
+
+
+def test_historique_des_predictions(client):
+    entetes = {"X-Admin-Token": "jeton-de-test"}
+    employes = [dict(EMPLOYE_EXEMPLE, age=20 + i, departement="Commercial") for i in range(3)]
+    assert client.post("/predict/batch", json=employes).status_code == 200
+
+    premiere = client.get("/predictions", params={"departement": "Commercial", "limit": 2}, headers=entetes).json()
+    assert len(premiere["items"]) == 2
+    suivante = client.get(
+        "/predictions", params={"departement": "Commercial", "limit": 2, "cursor": premiere["next_cursor"]},
+        headers=entetes,
+    ).json()
+    assert suivante["items"][0]["id"] < premiere["items"][-1]["id"]
+
+    assert client.get("/predictions", params={"prediction": 2}, headers=entetes).status_code == 422
+    assert client.get("/predictions/attrition").status_code == 403
+    assert client.get("/predictions/attrition", headers=entetes).status_code == 200
+
+
+def test_saisie_repetee_reutilisee(client):
+    from database.create_db import (
+        SessionLocal, ApiResponseDB, EmployeeInputDB, FeatureDB, PredictionResultDB, RequestLogDB
+    )
+    employe = dict(EMPLOYE_EXEMPLE, age=58, poste="TechLead")
+    tables = (EmployeeInputDB, FeatureDB, PredictionResultDB, RequestLogDB, ApiResponseDB)
+
+    client.post("/predict", json=employe)
+    db = SessionLocal()
+    avant = [db.query(table).count() for table in tables]
+    client.post("/predict", json=employe)
+    client.post("/predict/batch", json=[employe, employe])
+    apres = [db.query(table).count() for table in tables]
+    derniere = db.query(ApiResponseDB).order_by(ApiResponseDB.id.desc()).first()
+    assert derniere.prediction.employee.age == 58
+    employe_id = derniere.prediction.employee_input_id
+    db.close()
+
+    # Saisie et features réutilisées ; chaque prédiction garde son résultat
+    assert [b - a for a, b in zip(avant, apres)] == [0, 0, 3, 3, 3]
+    historique = client.get(
+        "/predictions", params={"poste": "TechLead", "limit": 1000}, headers={"X-Admin-Token": "jeton-de-test"}
+    ).json()
+    assert sum(item["employee_input_id"] == employe_id for item in historique["items"]) == 4
+
+
+def test_saisie_invalide_rejetee_avant_la_base(client):
+    from database.create_db import RequestLogDB, SessionLocal
+    from src.metrics import INPUT_REJECTIONS
+
+    with SessionLocal() as db:
+        avant = db.query(RequestLogDB).count()
+    rejets = INPUT_REJECTIONS.value(endpoint="/predict", field="departement")
+
+    response = client.post("/predict", json={**EMPLOYE_EXEMPLE, "departement": "Finance"})
+    assert response.status_code == 422
+    erreur = response.json()["detail"][0]
+    assert erreur["loc"] == ["body", "departement"]
+    assert erreur["input"] == "Finance"
+    assert "Consulting" in erreur["msg"]
+    assert INPUT_REJECTIONS.value(endpoint="/predict", field="departement") == rejets + 1
+
+    # Bornes du formulaire de l'interface, appliquées à chaque ligne d'un lot
+    assert client.post("/predict", json={**EMPLOYE_EXEMPLE, "age": 75}).status_code == 422
+    lot = client.post("/predict/batch", json=[EMPLOYE_EXEMPLE, {**EMPLOYE_EXEMPLE, "note_evaluation_actuelle": 1}])
+    assert lot.status_code == 422
+    assert lot.json()["detail"][0]["loc"] == ["body", 1, "note_evaluation_actuelle"]
+    assert INPUT_REJECTIONS.value(endpoint="/predict/batch", field="note_evaluation_actuelle") >= 1
+
+    with SessionLocal() as db:
+        assert db.query(RequestLogDB).count() == avant
+
+
+def test_explication(client):
+    saisie = {**EMPLOYE_EXEMPLE, "revenu_mensuel": 2871.0}
+    response = client.post("/predict/explain?top=4", json=saisie)
+    assert response.status_code == 200
+    explication = response.json()
+    assert explication["prediction"] == client.post("/predict", json=saisie).json()["prediction"]
+    assert len(explication["contributions"]) == 4
+    assert {"feature", "value", "contribution"} == set(explication["contributions"][0])
+
+    # Deuxième demande : contributions relues (cache), identiques
+    assert client.post("/predict/explain?top=4", json=saisie).json() == explication
+    assert client.post("/predict/explain?top=0", json=saisie).status_code == 422
+
+
+def test_lanceur_application_en_module_pointe():
+    from src.launcher import PreloadedApplication
+    from src.shadow import comparaison
+
+    assert PreloadedApplication("src.shadow:comparaison", {"workers": 1}).load() is comparaison
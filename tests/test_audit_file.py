@@ -0,0 +1,85 @@
+import os
+import shutil
+from datetime import datetime
+
+from database.audit_file import AuditFileWriter, deserialiser, importer_dossier, serialiser
+from database.create_db import (
+    ApiResponseDB, EmployeeInputDB, FeatureDB, PredictionResultDB, RequestLogDB, SessionLocal, init_db
+)
+from database.persistence import build_audit_records
+from src.service import score_employees
+from test_encoder import employes_aleatoires
+
+
+def test_journal_tournant_puis_import(tmp_path):
+    init_db()
+    employes = employes_aleatoires(30, graine=23)
+    donnees_pret, results = score_employees(employes, cache=None)
+    records = build_audit_records("/predict", employes, donnees_pret, results, duration_ms=1.5)
+
+    # Fichiers minuscules : une rotation après chaque lot
+    writer = AuditFileWriter(dossier=str(tmp_path), max_mb=0.001, batch_size=10, flush_interval_ms=10)
+    writer.start()
+    for record in records:
+        writer.submit(record)
+    writer.stop()
+
+    fichiers = sorted(tmp_path.glob("audit-*.jsonl"))
+    assert len(fichiers) >= 3
+    assert not list(tmp_path.glob("*.open"))
+    relus = [deserialiser(ligne) for f in fichiers for ligne in f.read_text(encoding="utf-8").splitlines()]
+    assert [r["feature_vector"] for r in relus] == [r["feature_vector"] for r in records]
+    assert relus[0]["timestamp"] == records[0]["timestamp"]
+
+    with SessionLocal() as db:
+        avant = db.query(RequestLogDB).count()
+    resultats = importer_dossier(str(tmp_path))
+    assert sum(resultats.values()) == 30
+    with SessionLocal() as db:
+        assert db.query(RequestLogDB).count() == avant + 30
+
+    # Un fichier déjà importé n'est pas rejoué
+    shutil.copy(tmp_path / "importes" / fichiers[0].name, fichiers[0])
+    assert importer_dossier(str(tmp_path)) == {fichiers[0].name: None}
+
+
+def test_fichiers_orphelins_recuperes(tmp_path):
+    init_db()
+    employes = employes_aleatoires(6, graine=26)
+    donnees_pret, results = score_employees(employes, cache=None)
+    lignes = [serialiser(r) + "\n" for r in build_audit_records("/predict", employes, donnees_pret, results, 1.0)]
+
+    # Worker arrêté brutalement au milieu d'un lot (pid au-delà de pid_max : jamais actif)
+    orphelin = tmp_path / "audit-20260301T090000000000-4194305.jsonl.open"
+    orphelin.write_text("".join(lignes[:3]) + lignes[3][:40], encoding="utf-8")
+    # Fichier d'un processus vivant : en cours d'écriture, laissé de côté
+    en_cours = tmp_path / f"audit-20260301T090000000000-{os.getpid()}.jsonl.open"
+    en_cours.write_text("".join(lignes[3:]), encoding="utf-8")
+
+    assert importer_dossier(str(tmp_path)) == {"audit-20260301T090000000000-4194305.jsonl": 3}
+    assert not orphelin.exists() and en_cours.exists()
+
+    resultats = importer_dossier(str(tmp_path), inclure_orphelins=True)
+    assert resultats == {en_cours.name[:-len(".open")]: 3}
+    assert not list(tmp_path.glob("*.open"))
+
+
+def test_import_conserve_l_horodatage_de_la_prediction(tmp_path):
+    init_db()
+    employes = employes_aleatoires(1, graine=30)
+    donnees_pret, results = score_employees(employes, cache=None)
+    record = build_audit_records("/predict", employes, donnees_pret, results, 1.0)[0]
+    record["timestamp"] = datetime(2026, 1, 5, 9, 30)
+    (tmp_path / "audit-20260105T093000000000-4194305.jsonl").write_text(serialiser(record) + "\n", encoding="utf-8")
+
+    assert sum(importer_dossier(str(tmp_path)).values()) == 1
+    with SessionLocal() as db:
+        reponse = db.query(ApiResponseDB).join(RequestLogDB).filter(
+            RequestLogDB.timestamp == record["timestamp"]
+        ).one()
+        employe = reponse.prediction.employee
+        feature = db.query(FeatureDB).filter(FeatureDB.employee_input_id == employe.id).one()
+        assert {
+            reponse.timestamp, reponse.request.timestamp, reponse.prediction.created_at,
+            employe.created_at, feature.created_at,
+        } == {record["timestamp"]}
@@ -0,0 +1,84 @@
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database.create_db import RequestLogDB, SessionLocal, init_db
+from database.persistence import AuditWriter, build_audit_records
+from src.metrics import AUDIT_RECORDS
+from src.service import score_employees
+from test_encoder import employes_aleatoires
+
+
+def enregistrements(nombre, graine):
+    employes = employes_aleatoires(nombre, graine=graine)
+    donnees_pret, results = score_employees(employes, cache=None)
+    return build_audit_records("/predict", employes, donnees_pret, results, duration_ms=1.0)
+
+
+def test_lots_ecrits_en_une_transaction():
+    init_db()
+    sessions = []
+
+    def session_comptee():
+        sessions.append(1)
+        return SessionLocal()
+
+    with SessionLocal() as db:
+        avant = db.query(RequestLogDB).count()
+
+    # Dépôts faits avant le démarrage du thread : un seul lot, une seule transaction
+    writer = AuditWriter(session_factory=session_comptee, batch_size=100, flush_interval_ms=50)
+    for record in enregistrements(12, graine=27):
+        writer.submit(record)
+    writer.start()
+    writer.stop()
+    assert (writer.written, writer.failed, len(sessions)) == (12, 0, 1)
+
+    # Lots bornés par batch_size ; la file est vidée à l'arrêt
+    sessions.clear()
+    writer = AuditWriter(session_factory=session_comptee, batch_size=4, flush_interval_ms=50)
+    for record in enregistrements(10, graine=28):
+        writer.submit(record)
+    writer.start()
+    writer.stop()
+    assert (writer.written, len(sessions)) == (10, 3)
+
+    with SessionLocal() as db:
+        assert db.query(RequestLogDB).count() == avant + 22
+
+
+def test_file_pleine_et_echec_d_ecriture(tmp_path):
+    records = enregistrements(3, graine=29)
+
+    # File pleine : la requête n'attend pas, l'enregistrement est refusé
+    sature = AuditWriter(max_queue=2)
+    assert sature.submit_nowait(records[0])
+    assert sature.submit_nowait(records[1])
+    assert not sature.submit_nowait(records[2])
+
+    # Base indisponible : le lot est compté en échec et le thread continue
+    indisponible = sessionmaker(bind=create_engine(f"sqlite:///{tmp_path / 'absent' / 'audit.db'}"))
+    writer = AuditWriter(session_factory=indisponible, flush_interval_ms=10)
+    writer.start()
+    for record in records:
+        writer.submit(record)
+    writer.stop()
+    assert writer.written == 0
+    assert writer.failed == 3
+
+
+def test_arret_expire_compte_les_abandons():
+    def session_lente():
+        time.sleep(0.3)
+        return SessionLocal()
+
+    abandons = AUDIT_RECORDS.value(status="dropped")
+    writer = AuditWriter(session_factory=session_lente, batch_size=1, flush_interval_ms=10)
+    for record in enregistrements(6, graine=31):
+        writer.submit(record)
+    writer.start()
+    # File non vidée dans le délai : les enregistrements restants sont comptés, pas perdus en silence
+    writer.stop(timeout=0.1)
+    assert AUDIT_RECORDS.value(status="dropped") - abandons >= 4
+    writer.stop()
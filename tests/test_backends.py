@@ -0,0 +1,58 @@
+import shutil
+
+import numpy as np
+import pytest
+
+from src.artifacts import FICHIERS_ARTEFACTS, load_bundle
+from src.export_model import exporter
+from test_encoder import employes_aleatoires
+
+
+@pytest.fixture(scope="module")
+def features():
+    bundle = load_bundle(backend="sklearn")
+    return bundle, bundle.encoder.encode(employes_aleatoires(5000))
+
+
+@pytest.fixture
+def models_exportes(tmp_path):
+    for nom in FICHIERS_ARTEFACTS:
+        shutil.copy(f"models/{nom}", tmp_path / nom)
+    exporter(str(tmp_path))
+    return str(tmp_path)
+
+
+def verifier_parite(reference, bundle, matrice, tolerance):
+    """Probabilités à `tolerance` près ; décisions identiques hors de cette marge autour du seuil."""
+    attendues = reference.backend.predict_proba(matrice)
+    obtenues = bundle.backend.predict_proba(matrice)
+    np.testing.assert_allclose(obtenues, attendues, rtol=0, atol=tolerance)
+
+    loin_du_seuil = np.abs(attendues - reference.threshold) > tolerance
+    assert np.array_equal(
+        (obtenues >= bundle.threshold)[loin_du_seuil], (attendues >= reference.threshold)[loin_du_seuil]
+    )
+
+
+def test_backend_natif(features):
+    reference, matrice = features
+    verifier_parite(reference, load_bundle(backend="native"), matrice, 1e-9)
+
+
+def test_backend_onnx(features, models_exportes):
+    pytest.importorskip("onnxruntime")
+    reference, matrice = features
+    verifier_parite(reference, load_bundle(models_exportes, backend="onnx"), matrice, 1e-5)
+
+
+def test_export_perime(models_exportes):
+    pytest.importorskip("onnxruntime")
+    with open(f"{models_exportes}/final_model.pkl", "ab") as f:
+        f.write(b"\0")
+    with pytest.raises(RuntimeError, match="export_model"):
+        load_bundle(models_exportes, backend="onnx")
+
+
+def test_backend_inconnu():
+    with pytest.raises(ValueError, match="MODEL_BACKEND"):
+        load_bundle(backend="tensorrt")
@@ -0,0 +1,59 @@
+import pandas as pd
+
+from conftest import EMPLOYE_EXEMPLE
+from src.batch_score import scorer_fichier
+from src.service import score_employees
+
+
+def test_scoring_csv_par_morceaux(tmp_path):
+    employes = [{**EMPLOYE_EXEMPLE, "age": age} for age in range(20, 45)]
+    entree, sortie = tmp_path / "entree.csv", tmp_path / "sortie.csv"
+    pd.DataFrame(employes).to_csv(entree, index=False)
+
+    assert scorer_fichier(str(entree), str(sortie), chunksize=10, workers=2) == len(employes)
+
+    resultat = pd.read_csv(sortie)
+    _, attendus = score_employees(employes, cache=None)
+    assert resultat["age"].tolist() == list(range(20, 45))
+    assert resultat["prediction"].tolist() == [a["prediction"] for a in attendus]
+    assert resultat["probability"].tolist() == [a["probability"] for a in attendus]
+
+
+def test_chargement_en_base_sans_doublons(tmp_path):
+    from app import EmployeeInput
+    from database.create_db import EmployeeInputDB, PredictionResultDB, SessionLocal
+    from src.batch_score import _saisies_typees
+    from src.cache import input_hash
+
+    employes = [{**EMPLOYE_EXEMPLE, "age": age, "poste": "SeniorManager"} for age in range(30, 40)]
+    entree = tmp_path / "entree.csv"
+    pd.DataFrame(employes + employes[:3]).to_csv(entree, index=False)
+
+    # Même empreinte que la saisie validée par l'API, malgré les entiers du CSV
+    saisie = _saisies_typees(pd.read_csv(entree))[0]
+    assert input_hash(saisie) == input_hash(EmployeeInput(**employes[0]).dict())
+
+    def compter():
+        with SessionLocal() as db:
+            return db.query(EmployeeInputDB).count(), db.query(PredictionResultDB).count()
+
+    avant = compter()
+    scorer_fichier(str(entree), str(tmp_path / "sortie.csv"), chunksize=5, workers=1, load_db=True)
+    apres = compter()
+    scorer_fichier(str(entree), str(tmp_path / "sortie.csv"), chunksize=5, workers=1, load_db=True)
+
+    # Saisies dédoublonnées ; chaque ligne scorée garde son résultat (repassage nocturne compris)
+    assert [b - a for a, b in zip(avant, apres)] == [10, 13]
+    assert [b - a for a, b in zip(apres, compter())] == [0, 13]
+
+
+def test_categorie_inconnue_dans_le_fichier(tmp_path):
+    import pytest
+    from src.preprocessing_schema import CategorieInconnue
+
+    employes = [EMPLOYE_EXEMPLE, {**EMPLOYE_EXEMPLE, "domaine_etude": "Droit"}]
+    entree = tmp_path / "entree.csv"
+    pd.DataFrame(employes).to_csv(entree, index=False)
+
+    with pytest.raises(CategorieInconnue, match="domaine_etude"):
+        scorer_fichier(str(entree), str(tmp_path / "sortie.csv"), workers=1)
@@ -0,0 +1,23 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from conftest import EMPLOYE_EXEMPLE
+from src.artifacts import get_bundle
+from src.batching import MicroBatcher
+from src.prediction import predict_batch
+
+
+def test_regroupement_des_appels_concurrents():
+    bundle = get_bundle()
+    employes = [{**EMPLOYE_EXEMPLE, "age": age, "revenu_mensuel": 2000.0 + 300 * age} for age in range(20, 52)]
+    matrices = [bundle.encoder.encode([employe]) for employe in employes]
+    batcher = MicroBatcher(max_wait_ms=50, max_rows=64, enabled=True)
+
+    with ThreadPoolExecutor(max_workers=len(matrices)) as pool:
+        results = list(pool.map(lambda matrice: batcher.predict(matrice, bundle), matrices))
+
+    attendus = [predict_batch(matrice, bundle) for matrice in matrices]
+    assert results == attendus
+
+    stats = batcher.stats()
+    assert stats["requests"] == len(matrices)
+    assert stats["batches"] < len(matrices)
@@ -0,0 +1,49 @@
+from conftest import EMPLOYE_EXEMPLE
+from src.artifacts import get_bundle
+from src.cache import PredictionCache, input_hash
+from src.service import score_employees
+
+
+def test_empreinte_stable():
+    inverse = dict(reversed(list(EMPLOYE_EXEMPLE.items())))
+    assert input_hash(EMPLOYE_EXEMPLE) == input_hash(inverse)
+    assert input_hash(EMPLOYE_EXEMPLE) != input_hash({**EMPLOYE_EXEMPLE, "age": 36})
+
+
+def test_succes_et_resultat_identique():
+    cache = PredictionCache(max_size=10, ttl=60)
+    features, results = score_employees([EMPLOYE_EXEMPLE], cache=cache)
+    features_cache, results_cache = score_employees([EMPLOYE_EXEMPLE], cache=cache)
+
+    assert results_cache == results
+    assert (features_cache == features).all()
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_eviction_lru():
+    cache = PredictionCache(max_size=2, ttl=60)
+    employes = [{**EMPLOYE_EXEMPLE, "age": age} for age in (30, 31, 32)]
+    score_employees(employes, cache=cache)
+
+    stats = cache.stats()
+    assert stats["size"] == 2
+    assert stats["evictions"] == 1
+
+
+def test_invalidation_au_changement_de_version():
+    cache = PredictionCache(max_size=10, ttl=60)
+    cle = input_hash(EMPLOYE_EXEMPLE)
+    cache.put(cle, get_bundle().version, "valeur")
+
+    assert cache.get(cle, "autre-version") is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_expiration():
+    cache = PredictionCache(max_size=10, ttl=-1)
+    cle = input_hash(EMPLOYE_EXEMPLE)
+    cache.put(cle, "v1", "valeur")
+
+    assert cache.get(cle, "v1") is None
+    assert cache.stats()["expirations"] == 1
@@ -0,0 +1,103 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import EMPLOYE_EXEMPLE
+from src.artifacts import get_bundle
+from src.encoder import FeatureEncoder
+from src.feature_codec import feature_columns
+from src.preprocessing_schema import CategorieInconnue, charger_schema, construire_schema
+from src.preprocessing import data_engineering
+from src.scaling import data_scaling
+
+
+@pytest.fixture(scope="module")
+def encoder():
+    return FeatureEncoder(get_bundle().scaler, charger_schema("models"))
+
+
+def pipeline_pandas(lignes):
+    donnees_pret = data_scaling(data_engineering(pd.DataFrame(lignes)), get_bundle().scaler)
+    return donnees_pret[feature_columns()].to_numpy(dtype=np.float64)
+
+
+def employes_aleatoires(n, graine=0):
+    """Profils aléatoires couvrant toutes les catégories et des valeurs hors bornes."""
+    rng = np.random.default_rng(graine)
+    choix = {
+        "genre": ["M", "F"],
+        "statut_marital": ["Celibataire", "Marie", "Divorce"],
+        "departement": ["Commercial", "Consulting", "RessourcesHumaines"],
+        "poste": ["AssistantdeDirection", "CadreCommercial", "Consultant", "DirecteurTechnique",
+                  "Manager", "ReprésentantCommercial", "RessourcesHumaines", "SeniorManager", "TechLead"],
+        "heure_supplementaires": ["Oui", "Non"],
+        "domaine_etude": ["Autre", "Entrepreunariat", "InfraCloud", "Marketing",
+                          "RessourcesHumaines", "TransformationDigitale"],
+        "frequence_deplacement": ["Aucun", "Occasionnel", "Frequent"],
+    }
+    employes = []
+    for _ in range(n):
+        employe = dict(EMPLOYE_EXEMPLE)
+        for champ, valeurs in choix.items():
+            employe[champ] = valeurs[rng.integers(len(valeurs))]
+        employe["age"] = int(rng.integers(16, 65))
+        employe["revenu_mensuel"] = float(rng.uniform(1000, 20000))
+        employe["annee_experience_totale"] = int(rng.integers(0, 41))
+        employe["annees_dans_l_entreprise"] = int(rng.integers(0, 41))
+        employe["nb_formations_suivies"] = int(rng.integers(0, 7))
+        employe["nombre_participation_pee"] = int(rng.integers(0, 4))
+        employe["annees_depuis_la_derniere_promotion"] = int(rng.integers(0, 16))
+        employe["augmentation_salaire_precedente_pourcent"] = float(rng.uniform(0.11, 0.25))
+        employe["distance_domicile_travail"] = float(rng.integers(1, 30))
+        for champ in ["satisfaction_employee_environnement", "satisfaction_employee_nature_travail",
+                      "satisfaction_employee_equipe", "satisfaction_employee_equilibre_pro_perso",
+                      "note_evaluation_precedente"]:
+            employe[champ] = float(rng.integers(1, 5))
+        employes.append(employe)
+    return employes
+
+
+def test_parite_ligne_unique(encoder):
+    np.testing.assert_array_equal(encoder.encode([EMPLOYE_EXEMPLE]), pipeline_pandas([EMPLOYE_EXEMPLE]))
+
+
+def test_parite_lot_aleatoire(encoder):
+    employes = employes_aleatoires(500)
+    np.testing.assert_array_equal(encoder.encode(employes), pipeline_pandas(employes))
+
+
+@pytest.mark.parametrize("age", [16, 17, 18, 30, 31, 36, 37, 43, 44, 60, 61])
+def test_parite_bornes_age(encoder, age):
+    employe = {**EMPLOYE_EXEMPLE, "age": age}
+    np.testing.assert_array_equal(encoder.encode([employe]), pipeline_pandas([employe]))
+
+
+def test_categories_inconnues(encoder):
+    """Valeur hors vocabulaire : erreur structurée plutôt qu'un NaN ou un one-hot vide."""
+    employes = [EMPLOYE_EXEMPLE, {**EMPLOYE_EXEMPLE, "poste": "Stagiaire"}]
+    with pytest.raises(CategorieInconnue) as erreur:
+        encoder.encode(employes)
+    assert erreur.value.detail()["champ"] == "poste"
+    assert erreur.value.detail()["valeur"] == "Stagiaire"
+    assert erreur.value.detail()["ligne"] == 1
+    assert "TechLead" in erreur.value.detail()["attendues"]
+
+    with pytest.raises(CategorieInconnue, match="genre"):
+        encoder.encode([{**EMPLOYE_EXEMPLE, "genre": "X"}])
+
+
+def test_schema_enregistre_a_jour():
+    """models/preprocessing.json correspond aux définitions de l'entraînement."""
+    assert charger_schema("models") == construire_schema()
+
+
+def test_parite_toutes_combinaisons_one_hot(encoder):
+    employes = [
+        {**EMPLOYE_EXEMPLE, "statut_marital": statut, "departement": departement}
+        for statut, departement in itertools.product(
+            ["Celibataire", "Marie", "Divorce"], ["Commercial", "Consulting", "RessourcesHumaines"]
+        )
+    ]
+    np.testing.assert_array_equal(encoder.encode(employes), pipeline_pandas(employes))
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+from database.create_db import ExplanationDB, SessionLocal, init_db
+from src.artifacts import get_bundle, load_bundle
+from src.batch_score import _saisies_typees, scorer_fichier
+from src.cache import PredictionCache, input_hash
+from src.explanation import contributions, explications_enregistrees, expliquer, resumer
+from src.service import score_employees
+from test_encoder import employes_aleatoires
+
+
+def test_contributions_du_modele():
+    bundle = get_bundle()
+    employes = employes_aleatoires(40, graine=24)
+    donnees_pret, results = score_employees(employes, bundle, cache=None)
+    valeurs = contributions(donnees_pret, bundle)
+    assert valeurs.shape == (40, len(bundle.encoder.colonnes) + 1)
+
+    # Somme des contributions et de la valeur de base : logit de la probabilité
+    probabilites = 1 / (1 + np.exp(-valeurs.astype(np.float64).sum(axis=1)))
+    assert np.allclose(probabilites, [r["probability"] for r in results], atol=1e-3)
+
+    # Mêmes valeurs avec le moteur natif (modèle fusionné déjà construit)
+    natif = load_bundle(backend="native")
+    assert np.allclose(contributions(donnees_pret, natif), valeurs, atol=1e-5)
+
+    resume = resumer(valeurs[0], donnees_pret[0], bundle, top_k=3)
+    assert len(resume["contributions"]) == 3
+    forces = [abs(c["contribution"]) for c in resume["contributions"]]
+    assert forces == sorted(forces, reverse=True)
+    revenu = resumer(valeurs[0], donnees_pret[0], bundle, top_k=len(bundle.encoder.colonnes))
+    assert next(c["value"] for c in revenu["contributions"] if c["feature"] == "revenu_mensuel") \
+        == round(employes[0]["revenu_mensuel"], 4)
+
+
+def test_explications_precalculees_par_le_scoring_de_masse(tmp_path, monkeypatch):
+    import src.explanation as explanation
+
+    init_db()
+    bundle = get_bundle()
+    entree = tmp_path / "entree.csv"
+    pd.DataFrame(employes_aleatoires(12, graine=25)).to_csv(entree, index=False)
+    # Saisies telles que validées par l'API : même empreinte que celle du chargement
+    employes = _saisies_typees(pd.read_csv(entree))
+
+    scorer_fichier(str(entree), str(tmp_path / "sortie.csv"), chunksize=5, workers=1, load_db=True, explain=True)
+    assert pd.read_csv(tmp_path / "sortie.csv")["top_contributions"].notna().all()
+
+    cles = [input_hash(saisie) for saisie in employes]
+    with SessionLocal() as db:
+        assert set(explications_enregistrees(db, bundle.version, cles)) == set(cles)
+        avant = db.query(ExplanationDB).count()
+
+    # Un second chargement n'ajoute pas de lignes
+    scorer_fichier(str(entree), str(tmp_path / "sortie.csv"), chunksize=5, workers=1, load_db=True, explain=True)
+    with SessionLocal() as db:
+        assert db.query(ExplanationDB).count() == avant
+
+    # Relues en base, sans aucun calcul, puis servies par le cache
+    appels = []
+    monkeypatch.setattr(explanation, "contributions", lambda *args: appels.append(args))
+    cache = PredictionCache(max_size=100)
+    donnees_pret, _ = score_employees(employes, bundle, cache=None)
+    with SessionLocal() as db:
+        en_base = expliquer(employes, donnees_pret, bundle, db, cache)
+    assert not appels
+    assert all(vecteur is not None for vecteur in en_base)
+    assert cache.stats()["size"] == 12
+
+    en_cache = expliquer(employes, donnees_pret, bundle, None, cache)
+    assert all(np.array_equal(a, b) for a, b in zip(en_cache, en_base))
+    assert cache.stats()["hits"] == 12
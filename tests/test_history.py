@@ -0,0 +1,93 @@
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from database.create_db import EmployeeInputDB, PredictionResultDB
+from database.history import historique, mettre_a_jour_synthese, taux_attrition
+from database.migrations import upgrade
+
+
+def ajouter(engine, debut_id, lignes):
+    """lignes : (jour, departement, poste, prediction, probabilite)."""
+    with engine.begin() as connexion:
+        for i, (jour, departement, poste, prediction, probabilite) in enumerate(lignes, start=debut_id):
+            instant = datetime.combine(jour, datetime.min.time()) + timedelta(hours=9)
+            connexion.execute(insert(EmployeeInputDB.__table__).values(
+                id=i, departement=departement, poste=poste, created_at=instant
+            ))
+            connexion.execute(insert(PredictionResultDB.__table__).values(
+                id=i, employee_input_id=i, prediction=prediction, probability=probabilite, created_at=instant
+            ))
+
+
+def test_synthese_incrementale(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'historique.db'}")
+    upgrade(engine)
+    lundi, mardi = date(2026, 3, 2), date(2026, 3, 3)
+
+    ajouter(engine, 1, [
+        (lundi, "Commercial", "Manager", 1, 0.8),
+        (lundi, "Commercial", "Manager", 0, 0.2),
+        (lundi, "Consulting", "Consultant", 0, 0.1),
+    ])
+    assert mettre_a_jour_synthese(engine, delai_s=0) == 3
+    assert mettre_a_jour_synthese(engine, delai_s=0) == 0
+
+    # Les nouvelles prédictions s'ajoutent aux compteurs existants
+    ajouter(engine, 4, [
+        (lundi, "Commercial", "Manager", 1, 0.6),
+        (mardi, "Commercial", "Manager", 0, 0.3),
+    ])
+    assert mettre_a_jour_synthese(engine, delai_s=0, paquet=1) == 2
+
+    with Session(engine) as db:
+        lignes = taux_attrition(db, departement="Commercial")
+        assert [(l["jour"], l["predictions"], l["departs"]) for l in lignes] == [
+            ("2026-03-02", 3, 2), ("2026-03-03", 1, 0)
+        ]
+        assert lignes[0]["taux_risque"] == round(2 / 3, 4)
+        assert lignes[0]["probabilite_moyenne"] == round(1.6 / 3, 4)
+        assert len(taux_attrition(db, debut=mardi)) == 1
+
+
+def test_synthese_attend_les_predictions_recentes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'historique.db'}")
+    upgrade(engine)
+    lundi = date(2026, 3, 2)
+    ajouter(engine, 1, [(lundi, "Commercial", "Manager", 1, 0.8)])
+
+    # Identifiant 2 encore récent, identifiant 3 plus ancien (transaction validée avant lui)
+    with engine.begin() as connexion:
+        connexion.execute(insert(PredictionResultDB.__table__).values(
+            id=2, prediction=0, probability=0.2, created_at=datetime.utcnow() - timedelta(seconds=5)
+        ))
+    ajouter(engine, 3, [(lundi, "Commercial", "Manager", 1, 0.7)])
+
+    # La lecture s'arrête avant la première prédiction récente : le filigrane ne la dépasse pas
+    assert mettre_a_jour_synthese(engine, delai_s=3600) == 1
+    assert mettre_a_jour_synthese(engine, delai_s=0) == 2
+    with Session(engine) as db:
+        assert sum(l["predictions"] for l in taux_attrition(db)) == 3
+
+
+def test_historique_pagination_par_curseur(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'historique.db'}")
+    upgrade(engine)
+    lundi = date(2026, 3, 2)
+    ajouter(engine, 1, [(lundi, "Commercial", "Manager", i % 2, 0.5) for i in range(5)])
+
+    with Session(engine) as db:
+        identifiants, curseur = [], None
+        while True:
+            page = historique(db, departement="Commercial", limite=2, curseur=curseur)
+            identifiants += [ligne["id"] for ligne in page["items"]]
+            curseur = page["next_cursor"]
+            if curseur is None:
+                break
+        assert identifiants == [5, 4, 3, 2, 1]
+
+        risques = historique(db, prediction=1)["items"]
+        assert [ligne["id"] for ligne in risques] == [4, 2]
+        assert historique(db, poste="Consultant")["items"] == []
+        assert historique(db, fin=datetime(2026, 3, 2))["items"] == []
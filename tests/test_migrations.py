@@ -0,0 +1,43 @@
+from sqlalchemy import create_engine, inspect, text
+
+from database.migrations import MIGRATIONS, upgrade, versions_appliquees
+
+
+def test_base_neuve(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'neuve.db'}")
+    assert upgrade(engine) == [version for version, _, _ in MIGRATIONS]
+    assert upgrade(engine) == []
+
+    index = {i["name"] for i in inspect(engine).get_indexes("features")}
+    assert {"ix_features_employee_input_id", "ix_features_created_at"} <= index
+
+
+def test_base_existante(tmp_path):
+    """Base créée avant les colonnes binaires, la durée, l'empreinte et les index : tout est ajouté, rien n'est perdu."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'ancienne.db'}")
+    with engine.begin() as connexion:
+        connexion.execute(text(
+            "CREATE TABLE features (id INTEGER PRIMARY KEY, employee_input_id INTEGER, "
+            "feature_data TEXT, created_at DATETIME DEFAULT CURRENT_TIMESTAMP)"
+        ))
+        connexion.execute(text(
+            "CREATE TABLE api_responses (id INTEGER PRIMARY KEY, request_id INTEGER, prediction_id INTEGER, "
+            "status_code INTEGER, message VARCHAR, timestamp DATETIME DEFAULT CURRENT_TIMESTAMP)"
+        ))
+        connexion.execute(text(
+            "CREATE TABLE employee_inputs (id INTEGER PRIMARY KEY, age INTEGER, "
+            "created_at DATETIME DEFAULT CURRENT_TIMESTAMP)"
+        ))
+        connexion.execute(text("INSERT INTO features (employee_input_id, feature_data) VALUES (1, '{}')"))
+
+    upgrade(engine)
+
+    inspecteur = inspect(engine)
+    assert {"feature_vector", "feature_schema"} <= {c["name"] for c in inspecteur.get_columns("features")}
+    assert "duration_ms" in {c["name"] for c in inspecteur.get_columns("api_responses")}
+    assert "ix_api_responses_request_id" in {i["name"] for i in inspecteur.get_indexes("api_responses")}
+    index_saisies = {i["name"]: i for i in inspecteur.get_indexes("employee_inputs")}
+    assert index_saisies["ix_employee_inputs_input_hash"]["unique"]
+    assert versions_appliquees(engine) == {version for version, _, _ in MIGRATIONS}
+    with engine.connect() as connexion:
+        assert connexion.execute(text("SELECT feature_data FROM features")).scalar() == "{}"
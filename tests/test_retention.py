@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+
+import pyarrow.parquet as pq
+from sqlalchemy import create_engine, func, insert, select
+
+from database.create_db import ApiResponseDB, EmployeeInputDB, FeatureDB, RequestLogDB
+from database.migrations import upgrade
+from database.retention import appliquer_retention
+
+
+def test_archivage_et_suppression(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}")
+    upgrade(engine)
+    ancien = datetime.utcnow() - timedelta(days=400)
+    recent = datetime.utcnow()
+
+    with engine.begin() as connexion:
+        connexion.execute(insert(EmployeeInputDB.__table__), [
+            {"id": 1, "age": 30, "created_at": ancien},
+            {"id": 2, "age": 40, "created_at": ancien},  # ancien mais encore référencé
+            {"id": 3, "age": 50, "created_at": recent},
+        ])
+        connexion.execute(insert(FeatureDB.__table__), [
+            {"id": 1, "employee_input_id": 1, "feature_vector": b"\x00" * 4, "created_at": ancien},
+        ])
+        connexion.execute(insert(RequestLogDB.__table__), [
+            {"id": 1, "endpoint": "/predict", "employee_input_id": 1, "timestamp": ancien},
+            {"id": 2, "endpoint": "/predict", "employee_input_id": 2, "timestamp": recent},
+        ])
+        connexion.execute(insert(ApiResponseDB.__table__), [
+            {"id": 1, "request_id": 1, "status_code": 200, "timestamp": ancien},
+        ])
+
+    assert appliquer_retention(engine, jours=365, dossier=str(tmp_path), dry_run=True)["api_responses"] == 1
+
+    resultats = appliquer_retention(engine, jours=365, dossier=str(tmp_path))
+    assert resultats["api_responses"] == 1
+    assert resultats["features"] == 1
+    assert resultats["requests"] == 1
+    assert resultats["employee_inputs"] == 1
+
+    with engine.connect() as connexion:
+        restants = connexion.execute(select(EmployeeInputDB.__table__.c.id).order_by("id")).scalars().all()
+        assert restants == [2, 3]
+        assert connexion.execute(select(func.count()).select_from(RequestLogDB.__table__)).scalar() == 1
+
+    archive = pq.read_table(next((tmp_path / "features").glob("*.parquet")))
+    assert archive.column("feature_vector").to_pylist() == [b"\x00" * 4]
+    assert pq.ParquetFile(next((tmp_path / "employee_inputs").glob("*.parquet"))).metadata.num_rows == 1
+
+
+def test_interruption_sans_perte(tmp_path, monkeypatch):
+    import pytest
+    import database.retention as retention
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}")
+    upgrade(engine)
+    ancien = datetime.utcnow() - timedelta(days=400)
+    with engine.begin() as connexion:
+        connexion.execute(insert(EmployeeInputDB.__table__), [
+            {"id": i, "age": 30, "created_at": ancien} for i in range(1, 6)
+        ])
+
+    # Arrêt brutal pendant l'écriture du troisième paquet
+    ecrire = retention._ecrire_paquet
+    appels = []
+
+    def ecrire_puis_tomber(chemin, donnees):
+        appels.append(chemin)
+        if len(appels) == 3:
+            raise KeyboardInterrupt
+        ecrire(chemin, donnees)
+
+    monkeypatch.setattr(retention, "_ecrire_paquet", ecrire_puis_tomber)
+    with pytest.raises(KeyboardInterrupt):
+        retention.archiver_table(engine, EmployeeInputDB.__table__, datetime.utcnow(), str(tmp_path), paquet=2)
+
+    # Les paquets supprimés sont tous dans des fichiers complets et lisibles ; les autres restent en base
+    fichiers = sorted((tmp_path / "employee_inputs").glob("*.parquet"))
+    archives = [i for f in fichiers for i in pq.read_table(f).column("id").to_pylist()]
+    with engine.connect() as connexion:
+        restants = connexion.execute(select(EmployeeInputDB.__table__.c.id)).scalars().all()
+    assert len(fichiers) == 2
+    assert sorted(archives + restants) == [1, 2, 3, 4, 5]
+    assert restants == [5]
@@ -0,0 +1,89 @@
+from database.create_db import SessionLocal, ShadowResultDB, init_db
+from src.cache import input_hash
+from src.service import score_employees
+from src.shadow import ShadowScorer, comparaison
+from test_encoder import employes_aleatoires
+
+
+def test_candidat_evalue_en_arriere_plan():
+    init_db()
+    employes = employes_aleatoires(20, graine=22)
+    _, results = score_employees(employes, cache=None)
+
+    # Le modèle courant comme candidat : décisions identiques
+    scorer = ShadowScorer(models_dir="models", fraction=1)
+    # 5 lignes servies par le cache : 30 ms de scoring répartis sur les 15 calculées
+    depuis_cache = [i < 5 for i in range(20)]
+    scorer.submit(employes, results, scoring_ms=30.0, depuis_cache=depuis_cache)
+    scorer.stop()
+
+    assert scorer.stats()["scored"] == 20
+    assert scorer.stats()["agreement_rate"] == 1.0
+    with SessionLocal() as db:
+        lignes = db.query(ShadowResultDB).filter(
+            ShadowResultDB.input_hash.in_([input_hash(employe) for employe in employes])
+        ).all()
+        assert len(lignes) == 20
+        assert all(ligne.latency_ms > 0 for ligne in lignes)
+        assert sorted((ligne.primary_cached, ligne.primary_latency_ms) for ligne in lignes) \
+            == [(False, 2.0)] * 15 + [(True, None)] * 5
+        resume = next(r for r in comparaison(db) if r["model_version"] == scorer.bundle.version)
+        assert resume["agreement_rate"] == 1.0
+        assert resume["mean_probability_gap"] == 0
+        assert resume["primary_cached"] >= 5
+
+
+def test_fraction_et_contre_pression():
+    employes = employes_aleatoires(400, graine=3)
+    cles = [input_hash(employe) for employe in employes]
+
+    moitie = ShadowScorer(models_dir="models", fraction=0.5)
+    choisies = [cle for cle in cles if moitie.selectionnee(cle)]
+    assert 150 < len(choisies) < 250
+    assert choisies == [cle for cle in cles if moitie.selectionnee(cle)]
+
+    assert not ShadowScorer(models_dir="models", fraction=0).enabled
+    assert not ShadowScorer(models_dir=None).enabled
+
+    # File pleine : les saisies en trop sont ignorées, la requête n'attend pas
+    sature = ShadowScorer(models_dir="models", fraction=1, max_queue=2, flush_interval_ms=60_000)
+    sature.submit(employes[:5], [{"prediction": 0, "probability": 0.1}] * 5)
+    assert sature.stats()["submitted"] >= 2
+    assert sature.stats()["submitted"] + sature.stats()["dropped"] == 5
+
+
+def test_candidat_introuvable_desactive_seulement_le_shadow(tmp_path):
+    """Candidat absent : l'API reste disponible et l'audit sur fichier est écrit jusqu'à l'arrêt."""
+    import json
+    import os
+    import subprocess
+    import sys
+
+    import pytest
+
+    from conftest import EMPLOYE_EXEMPLE
+
+    introuvable = ShadowScorer(models_dir=str(tmp_path / "absent"), fraction=1)
+    assert introuvable.configured and introuvable.enabled
+    with pytest.raises(FileNotFoundError):
+        introuvable.load()
+    assert introuvable.configured and not introuvable.enabled
+    assert introuvable.stats()["load_error"]
+
+    code = (
+        "from fastapi.testclient import TestClient; import app, json, sys\n"
+        "from src.artifacts import warm_up\n"
+        "with TestClient(app.app) as client:\n"
+        "    warm_up()\n"
+        "    assert client.get('/ready').status_code == 200\n"
+        f"    assert client.post('/predict', json=json.loads({json.dumps(json.dumps(EMPLOYE_EXEMPLE))})).status_code == 200\n"
+    )
+    resultat = subprocess.run(
+        [sys.executable, "-c", code],
+        env={**os.environ, "UI_ENABLED": "false", "CANDIDATE_MODELS_DIR": str(tmp_path / "absent"),
+             "AUDIT_SINK": "file", "AUDIT_DIR": str(tmp_path / "audit")},
+        capture_output=True, text=True,
+    )
+    assert resultat.returncode == 0, resultat.stderr
+    assert "évaluation shadow désactivée" in resultat.stdout
+    assert len(list((tmp_path / "audit").glob("audit-*.jsonl"))) == 1